@@ -0,0 +1,261 @@
+"""
+Vektorisierte Achsen-Verarbeitung für die MA3 Controller Bridge.
+
+Alle Stick-Achsen aller Controller liegen in einem NumPy-Array
+(eine Zeile pro Bank: links X/Y, rechts X/Y) und werden pro Tick in
+einem Rutsch verarbeitet:
+- Deadzone radial (pro Stick, keine "Kerben" in den Diagonalen) oder axial
+- Response-Kurve als vorab berechnete Lookup-Tabelle (linear, expo,
+  s_curve oder eigene Stützpunkte aus config.json)
+- Sensitivity pro Spalte
+- Zeitbasierte Glättung (siehe filters.py) für Sticks und Trigger
+
+Jeder ufunc-Aufruf kostet einen festen Betrag, egal wie viele Achsen er
+rechnet - bei wenigen Controllern ist reines Python schneller (siehe
+benchmarks/bench_axis_pipeline.py). Bis SCALAR_MAX_BANKS Bänke rechnet die
+Pipeline daher skalar und nur die Bänke, die sich bewegen. Beide Wege liefern
+dieselben Werte.
+"""
+import math
+
+import numpy as np
+
+from filters import make_filter
+
+STICK_AXES = 4          # links X, links Y, rechts X, rechts Y
+LUT_SIZE = 1025         # Stützstellen der Response-Kurve auf [0, 1]
+
+# Unterhalb dieser Differenz gilt ein geglätteter Wert als eingeschwungen
+SETTLE_EPSILON = 1e-4
+
+# Bis zu so vielen Bänken skalar rechnen, darüber als Array (Übergang laut Benchmark)
+SCALAR_MAX_BANKS = 8
+
+
+def build_response_curve(curve, size=LUT_SIZE):
+    """
+    Berechnet die Lookup-Tabelle einer Response-Kurve (Eingang und Ausgang 0..1).
+
+    curve: {"type": "linear"}
+           {"type": "expo", "amount": 0.4}      -> (1-a)*x + a*x³
+           {"type": "s_curve", "amount": 2.0}   -> x^a / (x^a + (1-x)^a)
+           {"type": "points", "points": [[0, 0], [0.5, 0.2], [1, 1]]}
+    """
+    x = np.linspace(0.0, 1.0, size)
+    curve_type = curve.get('type', 'linear')
+
+    if curve_type == 'linear':
+        y = x.copy()
+    elif curve_type == 'expo':
+        amount = float(curve.get('amount', 0.4))
+        y = (1.0 - amount) * x + amount * x ** 3
+    elif curve_type == 's_curve':
+        amount = float(curve.get('amount', 2.0))
+        rising = x ** amount
+        y = rising / (rising + (1.0 - x) ** amount)
+    elif curve_type == 'points':
+        points = sorted(curve.get('points', []))
+        if len(points) < 2:
+            raise ValueError("Response-Kurve 'points' braucht mindestens zwei Stützpunkte")
+        xp, fp = zip(*points)
+        y = np.interp(x, xp, fp)
+    else:
+        raise ValueError(f"Unbekannte Response-Kurve: {curve_type}")
+
+    # Jede Kurve beginnt bei 0, sonst gäbe es am Rand der Deadzone einen Sprung
+    y = np.clip(y, 0.0, 1.0)
+    y[0] = 0.0
+    return x, y
+
+
+class AxisPipeline:
+    """Deadzone, Response-Kurve, Sensitivity und Glättung für alle Sticks aller Bänke"""
+
+    def __init__(self, count, deadzone, mode='axial', sensitivity=1.0, fine_sensitivity=1.0,
+                 curve=None, filter_config=None, smoothing=0.0, rate=50, scalar=None):
+        self.count = count
+        # None = nach Bank-Anzahl, True/False erzwingt einen Weg (Benchmark, Tests)
+        self.scalar = count <= SCALAR_MAX_BANKS if scalar is None else scalar
+
+        # Eingang (wird von den Joystick-Events direkt beschrieben) und Ergebnisse
+        self.input = np.zeros((count, STICK_AXES))
+        self.output = np.zeros((count, STICK_AXES))     # nach Deadzone/Kurve/Sensitivity
+        self.trigger = np.zeros(count)                  # Trigger 0..1 (direkt aus den Events)
+        self.settling = np.zeros(count, dtype=bool)
+        self._input_flat = self.input.reshape(-1)       # Views für den skalaren Weg
+        self._output_flat = self.output.reshape(-1)
+
+        self.stick_filter = None
+        self.trigger_filter = None
+        self._filter_key = None
+        self._delta = np.zeros((count, STICK_AXES))
+        self._max_delta = np.zeros(count)
+        self._snap = np.zeros((count, STICK_AXES), dtype=bool)
+        self._trigger_delta = np.zeros(count)
+        self._trigger_snap = np.zeros(count, dtype=bool)
+        self.configure(deadzone, mode, sensitivity, fine_sensitivity, curve, filter_config, smoothing, rate)
+
+    def configure(self, deadzone, mode='axial', sensitivity=1.0, fine_sensitivity=1.0,
+                  curve=None, filter_config=None, smoothing=0.0, rate=50):
+        """
+        Setzt Deadzone, Kurve, Sensitivity und Glättung (beim Start und beim
+        Live-Reload der Config, zwischen zwei Ticks). Die Filter werden nur bei
+        geänderter Glättung neu gebaut und übernehmen dann den aktuellen Stand,
+        die Fader springen also nicht.
+        """
+        if mode not in ('radial', 'axial'):
+            raise ValueError(f"Unbekannter Deadzone-Modus: {mode}")
+        count = self.count
+        self.deadzone = float(deadzone)
+        self.mode = mode
+        self.lut_x, self.lut_y = build_response_curve(curve or {'type': 'linear'})
+        self._lut = self.lut_y.tolist()
+        self._inv_range = 1.0 / (1.0 - self.deadzone)
+
+        # Glättung nach echter Zeit; smoothed ist das Ergebnis-Array des Filters
+        filter_key = (dict(filter_config or {}), smoothing, rate)
+        if filter_key != self._filter_key:
+            stick_filter = make_filter(filter_config, (count, STICK_AXES), smoothing, rate)
+            trigger_filter = make_filter(filter_config, count, smoothing, rate)
+            if self.stick_filter is not None:
+                stick_filter.take_state(self.stick_filter)
+                trigger_filter.take_state(self.trigger_filter)
+            self.stick_filter = stick_filter
+            self.trigger_filter = trigger_filter
+            self.smoothed = stick_filter.value
+            self.trigger_smoothed = trigger_filter.value
+            self._filter_key = filter_key
+
+        # Wiederverwendete Views und Zwischenpuffer - pro Tick werden nur ufuncs mit out= aufgerufen
+        if mode == 'radial':
+            sticks = self.input.reshape(count, 2, 2)
+            self._x = sticks[..., 0]
+            self._y = sticks[..., 1]
+            self._sticks = sticks
+            self._sticks_out = self.output.reshape(count, 2, 2)
+            self._gain = np.array([sensitivity, fine_sensitivity])
+            self._level = np.zeros((count, 2))
+            self._magnitude = np.zeros((count, 2))
+            self._scale = np.zeros((count, 2))
+            self._scale_view = self._scale[..., np.newaxis]
+        else:
+            self._gain = np.array([sensitivity, sensitivity, fine_sensitivity, fine_sensitivity])
+            self._level = np.zeros((count, STICK_AXES))
+        self._gains = self._gain.tolist()
+
+    def process(self, rows=None):
+        """
+        Berechnet self.output aus self.input. Als Array für alle Bänke auf einmal,
+        skalar nur für die Bänke in rows (None = alle).
+        """
+        if self.scalar:
+            return self._process_scalar(range(self.count) if rows is None else rows)
+        level = self._level
+
+        if self.mode == 'radial':
+            # Pro Stick: Betrag -> Deadzone -> Kurve, Richtung bleibt erhalten
+            magnitude = np.hypot(self._x, self._y, out=self._magnitude)
+            np.subtract(magnitude, self.deadzone, out=level)
+        else:
+            np.abs(self.input, out=level)
+            np.subtract(level, self.deadzone, out=level)
+
+        np.multiply(level, self._inv_range, out=level)
+        np.maximum(level, 0.0, out=level)
+        np.minimum(level, 1.0, out=level)
+        curved = np.interp(level, self.lut_x, self.lut_y)
+        np.multiply(curved, self._gain, out=curved)
+
+        if self.mode == 'radial':
+            # Faktor, der den Stick-Vektor auf die Kurvenlänge skaliert
+            # (in der Deadzone ist curved 0, der Mindestbetrag verhindert nur 0/0)
+            np.maximum(magnitude, 1e-12, out=magnitude)
+            np.divide(curved, magnitude, out=self._scale)
+            np.multiply(self._sticks, self._scale_view, out=self._sticks_out)
+        else:
+            np.sign(self.input, out=self.output)
+            np.multiply(self.output, curved, out=self.output)
+
+        return self.output
+
+    def _process_scalar(self, rows):
+        values = self._input_flat.tolist()
+        output = self._output_flat.tolist()
+        deadzone = self.deadzone
+        inv_range = self._inv_range
+        lut = self._lut
+        last = LUT_SIZE - 1
+        gains = self._gains
+        radial = self.mode == 'radial'
+        for row in rows:
+            base = row * STICK_AXES
+            for k in ((0, 2) if radial else range(STICK_AXES)):
+                i = base + k
+                value = values[i]
+                if radial:
+                    y = values[i + 1]
+                    magnitude = math.hypot(value, y)
+                else:
+                    magnitude = abs(value)
+                # Deadzone, Kurve (wie np.interp auf der Lookup-Tabelle), Sensitivity
+                position = (magnitude - deadzone) * inv_range * last
+                if position <= 0.0:
+                    curved = lut[0]
+                elif position >= last:
+                    curved = lut[last]
+                else:
+                    index = int(position)
+                    low = lut[index]
+                    curved = low + (lut[index + 1] - low) * (position - index)
+                curved *= gains[k >> 1] if radial else gains[k]
+                if radial:
+                    scale = curved / (magnitude if magnitude > 1e-12 else 1e-12)
+                    output[i] = value * scale
+                    output[i + 1] = y * scale
+                else:
+                    output[i] = curved if value > 0.0 else -curved if value < 0.0 else 0.0
+        self._output_flat[:] = output
+        return self.output
+
+    def smooth(self, dt, rows=None):
+        """
+        Führt self.smoothed und self.trigger_smoothed um dt Sekunden Richtung
+        self.output bzw. self.trigger. Aktualisiert self.settling: True für Bänke,
+        die ihr Ziel noch nicht erreicht haben. Skalar nur für die Bänke in rows.
+        """
+        if self.scalar:
+            return self._smooth_scalar(dt, range(self.count) if rows is None else rows)
+        self.stick_filter(self.output, dt)
+        self.trigger_filter(self.trigger, dt)
+
+        # Auf das Ziel einrasten, sobald die Differenz vernachlässigbar ist
+        delta = self._delta
+        np.subtract(self.output, self.smoothed, out=delta)
+        np.abs(delta, out=delta)
+        np.less(delta, SETTLE_EPSILON, out=self._snap)
+        np.copyto(self.smoothed, self.output, where=self._snap)
+        np.maximum.reduce(delta, axis=1, out=self._max_delta)
+
+        trigger_delta = self._trigger_delta
+        np.subtract(self.trigger, self.trigger_smoothed, out=trigger_delta)
+        np.abs(trigger_delta, out=trigger_delta)
+        np.less(trigger_delta, SETTLE_EPSILON, out=self._trigger_snap)
+        np.copyto(self.trigger_smoothed, self.trigger, where=self._trigger_snap)
+        np.maximum(self._max_delta, trigger_delta, out=self._max_delta)
+
+        np.greater_equal(self._max_delta, SETTLE_EPSILON, out=self.settling)
+        return self.smoothed
+
+    def _smooth_scalar(self, dt, rows):
+        targets = self._output_flat.tolist()
+        indices = [row * STICK_AXES + axis for row in rows for axis in range(STICK_AXES)]
+        values = self.stick_filter.step_flat(targets, indices, dt, SETTLE_EPSILON)
+        trigger_targets = self.trigger.tolist()
+        trigger_values = self.trigger_filter.step_flat(trigger_targets, rows, dt, SETTLE_EPSILON)
+        # Eingerastete Werte sind gleich dem Ziel, alle anderen schwingen noch ein
+        settling = self.settling
+        for row in rows:
+            base = row * STICK_AXES
+            settling[row] = (values[base:base + STICK_AXES] != targets[base:base + STICK_AXES]
+                             or trigger_values[row] != trigger_targets[row])
+        return self.smoothed
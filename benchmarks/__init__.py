@@ -0,0 +1 @@
+"""Benchmarks für die MA3 Controller Bridge (Aufruf: python -m benchmarks.<name>)"""
@@ -0,0 +1,99 @@
+"""
+Micro-Benchmark: skalare Achsen-Verarbeitung vs. AxisPipeline.
+
+"Alt" ist der frühere Pfad aus update_values(): pro Achse und Tick
+apply_deadzone() * sensitivity und smooth_value(). Die AxisPipeline rechnet
+zusätzlich Deadzone radial, Response-Kurve und zeitbasierte Glättung, und zwar
+auf zwei Wegen:
+
+- skalar: reines Python pro Achse (Standard bis SCALAR_MAX_BANKS Bänke)
+- Array: ein NumPy-Durchlauf für alle Achsen. Jeder ufunc-Aufruf kostet einen
+  festen Betrag, das lohnt sich erst bei vielen Controllern
+
+"1 aktiv" rechnet wie im Betrieb nur die Bank, die sich bewegt (der Array-Weg
+rechnet immer alle). Aus dem Übergang ergibt sich SCALAR_MAX_BANKS.
+
+    python -m benchmarks.bench_axis_pipeline [--ticks 20000] [--axes 4 8 16 32 64 128]
+"""
+import argparse
+import random
+import time
+
+from axis_pipeline import SCALAR_MAX_BANKS, STICK_AXES, AxisPipeline
+
+DEADZONE = 0.15
+SMOOTHING = 0.3
+SENSITIVITY = 1.0
+RATE = 250
+SETTLE_EPSILON = 1e-4
+
+
+def apply_deadzone(value, deadzone):
+    """Frühere xbox_to_ma3.apply_deadzone"""
+    if abs(value) < deadzone:
+        return 0.0
+    sign = 1 if value > 0 else -1
+    scaled = (abs(value) - deadzone) / (1.0 - deadzone)
+    return sign * scaled
+
+
+def smooth_value(current, target, smoothing):
+    """Frühere xbox_to_ma3.smooth_value"""
+    value = current + (target - current) * (1.0 - smoothing)
+    if abs(target - value) < SETTLE_EPSILON:
+        return target
+    return value
+
+
+def make_inputs(ticks, axes):
+    """Zufällige, aber reproduzierbare Stick-Stellungen pro Tick"""
+    rng = random.Random(42)
+    return [[rng.uniform(-1.0, 1.0) for _ in range(axes)] for _ in range(min(ticks, 1000))]
+
+
+def measure_scalar(inputs, ticks, axes):
+    smoothed = [0.0] * axes
+    start = time.perf_counter()
+    for tick in range(ticks):
+        values = inputs[tick % len(inputs)]
+        for i in range(axes):
+            raw = apply_deadzone(values[i], DEADZONE) * SENSITIVITY
+            smoothed[i] = smooth_value(smoothed[i], raw, SMOOTHING)
+    return (time.perf_counter() - start) / ticks * 1e6
+
+
+def measure_pipeline(inputs, ticks, axes, scalar, rows=None):
+    pipeline = AxisPipeline(axes // STICK_AXES, DEADZONE, 'radial', SENSITIVITY, SENSITIVITY,
+                            {'type': 'expo', 'amount': 0.4}, {'type': 'lowpass'}, SMOOTHING, RATE,
+                            scalar=scalar)
+    flat = pipeline.input.reshape(-1)
+    start = time.perf_counter()
+    for tick in range(ticks):
+        flat[:] = inputs[tick % len(inputs)]
+        pipeline.process(rows)
+        pipeline.smooth(1.0 / RATE, rows)
+    return (time.perf_counter() - start) / ticks * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--ticks', type=int, default=20000)
+    parser.add_argument('--axes', type=int, nargs='+', default=[4, 8, 16, 32, 64, 128])
+    args = parser.parse_args()
+
+    print(f"µs/Tick, Pipeline skalar bis {SCALAR_MAX_BANKS} Bänke")
+    print(f"{'Achsen':>7} {'Controller':>11} {'Alt':>8} {'Skalar':>8} {'Array':>8} {'Skalar 1 aktiv':>15}")
+    for axes in args.axes:
+        axes -= axes % STICK_AXES
+        if axes <= 0:
+            continue
+        inputs = make_inputs(args.ticks, axes)
+        old = measure_scalar(inputs, args.ticks, axes)
+        scalar = measure_pipeline(inputs, args.ticks, axes, True)
+        array = measure_pipeline(inputs, args.ticks, axes, False)
+        one_active = measure_pipeline(inputs, args.ticks, axes, True, [0])
+        print(f"{axes:>7} {axes // STICK_AXES:>11} {old:>8.2f} {scalar:>8.2f} {array:>8.2f} {one_active:>15.2f}")
+
+
+if __name__ == "__main__":
+    main()
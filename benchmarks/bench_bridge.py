@@ -0,0 +1,428 @@
+"""
+Benchmark-Suite für den kompletten Pfad Controller -> update_values() -> OSC.
+
+Treibt MA3ControllerUI.update_values() mit einem Fake-Joystick (Events über
+joystick_events, wie sie der Haupt-Thread beim Pumpen weiterreicht) und sendet
+an einen UDP-Sink auf Loopback. Pro Szenario:
+
+- µs/Tick (Mittel, p99) und CPU-µs/Tick (nur update_values, ohne Event-Erzeugung)
+- maximal mögliche Ticks/s und Nachrichten/s ohne Takt
+- Allokationen pro Tick (Peak-Bytes per tracemalloc, netto verbliebene Blöcke)
+
+Dazu ein Echtzeit-Lauf mit der Engine (Standard 1000 Hz: erreichte Rate,
+Overruns, Jitter) und die Kosten von draw_ui() mit dem SDL-Dummy-Treiber.
+
+Mit --save wird das Ergebnis als JSON-Baseline gespeichert, mit --compare
+gegen eine Baseline verglichen: Verschlechterungen über --tolerance werden
+markiert und der Exit-Code ist 1 (z.B. vor jeder Tour auf dem FOH-Laptop).
+
+    python -m benchmarks.bench_bridge [--ticks 20000] [--rate 1000] [--save baseline.json]
+    python -m benchmarks.bench_bridge --compare baseline.json [--tolerance 0.15]
+"""
+import argparse
+import copy
+import json
+import math
+import os
+import platform
+import socket
+import sys
+import threading
+import time
+import tracemalloc
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+import numpy as np
+import pygame
+
+import xbox_to_ma3
+from metrics import LatencyHistogram, Metrics
+
+# Kennzahl -> True, wenn kleiner besser ist (für --compare)
+LOWER_IS_BETTER = {
+    'us_per_tick': True,
+    'p99_us_per_tick': True,
+    'cpu_us_per_tick': True,
+    'ticks_per_sec': False,
+    'messages_per_sec': False,
+    'alloc_bytes_per_tick': True,
+    'net_blocks_per_tick': True,
+    'achieved_hz': False,
+    'overrun_pct': True,
+    'jitter_p99_ms': True,
+    'tick_p99_ms': True,
+    'us_per_frame': True,
+    'p99_us_per_frame': True,
+}
+
+# Absolute Änderungen bis zu diesen Werten gelten als Rauschen - Ausreißer-Kennzahlen
+# (p99, Overruns) schwanken zwischen zwei Läufen stark, ohne dass sich etwas geändert hat
+ABSOLUTE_FLOOR = {
+    'p99_us_per_tick': 20.0,
+    'alloc_bytes_per_tick': 64,
+    'net_blocks_per_tick': 0.05,
+    'overrun_pct': 1.0,
+    'jitter_p99_ms': 0.25,
+    'tick_p99_ms': 0.1,
+    'p99_us_per_frame': 1000.0,
+}
+
+
+class FakeJoystick:
+    """Verhält sich für ControllerBank.attach() wie ein pygame-Joystick"""
+
+    def __init__(self, instance_id, name="Xbox Wireless Controller"):
+        self.instance_id = instance_id
+        self.name = name
+
+    def get_name(self):
+        return self.name
+
+    def get_guid(self):
+        return f"bench{self.instance_id:04d}"
+
+    def get_instance_id(self):
+        return self.instance_id
+
+    def get_numaxes(self):
+        return 6
+
+    def get_numbuttons(self):
+        return 11
+
+    def get_axis(self, index):
+        return -1.0 if index == 5 else 0.0
+
+    def get_button(self, index):
+        return 0
+
+    def quit(self):
+        pass
+
+
+def no_input(tick, joysticks):
+    return []
+
+
+def one_stick(tick, joysticks):
+    """Ein Stick-Event pro Tick (typischer Operator)"""
+    value = math.sin(tick * 0.01)
+    return [pygame.event.Event(pygame.JOYAXISMOTION, instance_id=joysticks[0], axis=tick % 2, value=value, joy=0)]
+
+
+def everything(tick, joysticks):
+    """Alle Achsen aller Controller jeden Tick, dazu Button A im Wechsel"""
+    value = math.sin(tick * 0.01)
+    events = []
+    for instance_id in joysticks:
+        for axis in range(6):
+            events.append(pygame.event.Event(pygame.JOYAXISMOTION, instance_id=instance_id, axis=axis,
+                                              value=value if axis != 5 else abs(value), joy=0))
+        button_type = pygame.JOYBUTTONDOWN if tick % 50 < 25 else pygame.JOYBUTTONUP
+        events.append(pygame.event.Event(button_type, instance_id=instance_id, button=0, joy=0))
+    return events
+
+
+# Name -> (Bänke, Bundle, Metrics-Hooks, Event-Erzeuger)
+SCENARIOS = {
+    'idle': (1, False, False, no_input),
+    'one_stick': (1, False, False, one_stick),
+    'one_stick_bundle': (1, True, False, one_stick),
+    'one_stick_metrics': (1, False, True, one_stick),
+    'all_axes': (1, False, False, everything),
+    'four_banks_bundle': (4, True, False, everything),
+}
+
+
+def make_sink():
+    """UDP-Sink auf Loopback mit großem Puffer (Pakete werden zwischendurch verworfen)"""
+    sink = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sink.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 8 * 1024 * 1024)
+    sink.bind(('127.0.0.1', 0))
+    sink.setblocking(False)
+    return sink
+
+
+def drain(sink):
+    count = 0
+    try:
+        while True:
+            sink.recv(65535)
+            count += 1
+    except BlockingIOError:
+        return count
+
+
+def configure(base_config, port, banks, bundle, metrics, headless=True, console_rate=0):
+    """Setzt CONFIG für ein Szenario und baut die App mit angesteckten Fake-Controllern"""
+    config = xbox_to_ma3.CONFIG
+    config.clear()
+    config.update(copy.deepcopy(base_config))
+    config['osc']['port'] = port
+    config['osc']['bundle'] = bundle
+    # Ohne Sendetakt, damit jeder Tick den vollen Sendepfad misst
+    config['osc']['console_rate'] = console_rate
+    config['metrics']['enabled'] = metrics
+    config['controllers'] = [
+        {'name': f"Bank {i + 1}", **{f"fader_{name}": 201 + i * 10 + offset
+                                    for offset, name in enumerate(xbox_to_ma3.FADER_NAMES)}}
+        for i in range(banks)
+    ] if banks > 1 else []
+
+    app = xbox_to_ma3.MA3ControllerUI(headless=headless)
+    app.start_sdl()
+    joysticks = []
+    for i, bank in enumerate(app.banks):
+        joystick = FakeJoystick(1000 + i)
+        bank.attach(joystick)
+        app.banks_by_id[joystick.instance_id] = bank
+        joysticks.append(joystick.instance_id)
+    pygame.event.clear()
+    return app, joysticks
+
+
+def measure_scenario(name, base_config, sink, ticks):
+    banks, bundle, metrics, make_events = SCENARIOS[name]
+    app, joysticks = configure(base_config, sink.getsockname()[1], banks, bundle, metrics)
+    update = app.update_values
+    post = app.joystick_events.append
+
+    # Aufwärmen (Caches, erste Pakete, Filter eingeschwungen)
+    for tick in range(500):
+        for event in make_events(tick, joysticks):
+            post(event)
+        update()
+    drain(sink)
+
+    histogram = LatencyHistogram()
+    sent_before = app.output.sent_count
+    wall_total = 0.0
+    cpu_total = 0.0
+    perf_counter = time.perf_counter
+    thread_time = time.thread_time
+    for tick in range(ticks):
+        for event in make_events(tick, joysticks):
+            post(event)
+        cpu_start = thread_time()
+        start = perf_counter()
+        update()
+        elapsed = perf_counter() - start
+        cpu_total += thread_time() - cpu_start
+        wall_total += elapsed
+        histogram.record(elapsed)
+        if tick % 1000 == 999:
+            drain(sink)
+    sent = app.output.sent_count - sent_before
+    drain(sink)
+
+    # Allokationen getrennt messen - tracemalloc verfälscht die Laufzeit
+    samples = min(ticks, 2000)
+    tracemalloc.start()
+    peak_total = 0
+    blocks_before = sys.getallocatedblocks()
+    for tick in range(samples):
+        for event in make_events(tick, joysticks):
+            post(event)
+        baseline = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        update()
+        peak_total += tracemalloc.get_traced_memory()[1] - baseline
+    blocks_after = sys.getallocatedblocks()
+    tracemalloc.stop()
+    drain(sink)
+    app.client.close()
+
+    return {
+        'us_per_tick': wall_total / ticks * 1e6,
+        'p99_us_per_tick': histogram.percentiles()[0.99] * 1000,
+        'cpu_us_per_tick': cpu_total / ticks * 1e6,
+        'ticks_per_sec': ticks / wall_total,
+        'messages_per_sec': sent / wall_total,
+        'messages_per_tick': sent / ticks,
+        'alloc_bytes_per_tick': peak_total / samples,
+        'net_blocks_per_tick': (blocks_after - blocks_before) / samples,
+    }
+
+
+def measure_realtime(base_config, sink, rate, seconds):
+    """Engine-Thread mit fester Rate, Stick-Events kommen parallel aus diesem Thread"""
+    app, joysticks = configure(base_config, sink.getsockname()[1], 1, False, False)
+    app.metrics = Metrics()     # Hooks für tick/jitter an, unabhängig von CONFIG
+    engine = xbox_to_ma3.ControllerEngine(app.update_values, rate, app.metrics)
+    app.engine = engine
+
+    stop = threading.Event()
+
+    def drain_loop():
+        while not stop.is_set():
+            drain(sink)
+            time.sleep(0.01)
+
+    drainer = threading.Thread(target=drain_loop, daemon=True)
+    drainer.start()
+    engine.start()
+    start = time.perf_counter()
+    tick = 0
+    while time.perf_counter() - start < seconds:
+        for event in one_stick(tick, joysticks):
+            app.joystick_events.append(event)
+        tick += 1
+        time.sleep(0.002)   # ~500 Stick-Events/s, wie ein schnell bewegter Stick
+    ticks = engine.tick_count
+    elapsed = time.perf_counter() - start
+    overruns = engine.scheduler.overruns
+    engine.stop()
+    stop.set()
+    drainer.join()
+    app.client.close()
+
+    tick_stats = app.metrics.histograms['tick'].summary()
+    jitter_stats = app.metrics.histograms['jitter'].summary()
+    return {
+        'target_hz': rate,
+        'achieved_hz': ticks / elapsed,
+        'overrun_pct': overruns / max(ticks, 1) * 100,
+        'tick_p99_ms': tick_stats['p99_ms'],
+        'jitter_p99_ms': jitter_stats['p99_ms'],
+    }
+
+
+def measure_draw_ui(base_config, sink, frames):
+    """draw_ui() mit SDL-Dummy-Treiber: Rendern und Dirty-Rects, ohne echtes Display"""
+    app, joysticks = configure(base_config, sink.getsockname()[1], 1, False, False, headless=False)
+    app.open_window()
+    app.engine = xbox_to_ma3.ControllerEngine(app.update_values, 1000)    # nur für measured_rate
+    app.build_background()
+
+    histogram = LatencyHistogram()
+    total = 0.0
+    warmup = 30     # erste Frames rendern Glyphen und Texte zum ersten Mal
+    for frame in range(warmup + frames):
+        # Jeder Frame mit neuen Werten - sonst zeichnet draw_ui fast nichts
+        for tick in range(frame * 5, frame * 5 + 5):
+            for event in everything(tick, joysticks):
+                app.joystick_events.append(event)
+            app.update_values()
+        start = time.perf_counter()
+        app.draw_ui()
+        elapsed = time.perf_counter() - start
+        if frame >= warmup:
+            total += elapsed
+            histogram.record(elapsed)
+        drain(sink)
+    app.client.close()
+    return {
+        'us_per_frame': total / frames * 1e6,
+        'p99_us_per_frame': histogram.percentiles()[0.99] * 1000,
+    }
+
+
+def compare(results, baseline, tolerance):
+    """Gibt [(Szenario, Kennzahl, alt, neu, Änderung, Regression)] zurück"""
+    rows = []
+    for scenario, metrics in results.items():
+        old_metrics = baseline.get('results', {}).get(scenario)
+        if old_metrics is None:
+            continue
+        for metric, new in metrics.items():
+            old = old_metrics.get(metric)
+            if old is None or metric not in LOWER_IS_BETTER:
+                continue
+            change = (new - old) / abs(old) if old else (0.0 if new == old else math.inf)
+            worse = change if LOWER_IS_BETTER[metric] else -change
+            regression = worse > tolerance and abs(new - old) > ABSOLUTE_FLOOR.get(metric, 0.0)
+            rows.append((scenario, metric, old, new, change, regression))
+    return rows
+
+
+def environment():
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'processor': platform.processor(),
+        'cpu_count': os.cpu_count(),
+        'numpy': np.__version__,
+        'pygame': pygame.version.ver,
+        'sdl': ".".join(map(str, pygame.get_sdl_version())),
+        'timestamp': time.strftime('%Y-%m-%d %H:%M:%S'),
+    }
+
+
+def print_results(results):
+    print(f"{'Szenario':<20} {'µs/Tick':>8} {'p99':>8} {'CPU µs':>8} {'Ticks/s':>10} {'Msgs/s':>10} {'Msgs/Tick':>9} "
+          f"{'Alloc B':>8} {'Blöcke':>7}")
+    for name in SCENARIOS:
+        r = results.get(name)
+        if r is None:
+            continue
+        print(f"{name:<20} {r['us_per_tick']:>8.1f} {r['p99_us_per_tick']:>8.1f} {r['cpu_us_per_tick']:>8.1f} "
+              f"{r['ticks_per_sec']:>10,.0f} {r['messages_per_sec']:>10,.0f} {r['messages_per_tick']:>9.2f} "
+              f"{r['alloc_bytes_per_tick']:>8.0f} {r['net_blocks_per_tick']:>7.2f}")
+
+    realtime = results.get('realtime')
+    if realtime is not None:
+        ok = realtime['achieved_hz'] >= realtime['target_hz'] * 0.99 and realtime['overrun_pct'] < 1.0
+        print(f"\nEchtzeit {realtime['target_hz']} Hz: erreicht {realtime['achieved_hz']:.0f} Hz, "
+              f"Overruns {realtime['overrun_pct']:.2f} %, Tick p99 {realtime['tick_p99_ms']:.3f} ms, "
+              f"Jitter p99 {realtime['jitter_p99_ms']:.3f} ms -> {'OK' if ok else 'NICHT gehalten'}")
+
+    draw = results.get('draw_ui')
+    if draw is not None:
+        print(f"draw_ui (SDL dummy): {draw['us_per_frame']:.0f} µs/Frame, p99 {draw['p99_us_per_frame']:.0f} µs")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--ticks', type=int, default=20000)
+    parser.add_argument('--rate', type=int, default=1000, help="Ziel-Rate für den Echtzeit-Lauf (Hz)")
+    parser.add_argument('--seconds', type=float, default=3.0, help="Dauer des Echtzeit-Laufs")
+    parser.add_argument('--frames', type=int, default=300, help="Frames für draw_ui()")
+    parser.add_argument('--scenario', nargs='+', choices=list(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument('--save', metavar='DATEI', help="Ergebnis als JSON-Baseline speichern")
+    parser.add_argument('--compare', metavar='DATEI', help="Mit einer gespeicherten Baseline vergleichen")
+    parser.add_argument('--tolerance', type=float, default=0.15,
+                        help="Erlaubte Verschlechterung beim Vergleich (0.15 = 15 %%)")
+    args = parser.parse_args()
+
+    base_config = copy.deepcopy(xbox_to_ma3.CONFIG)
+    sink = make_sink()
+    results = {}
+    try:
+        for name in args.scenario:
+            results[name] = measure_scenario(name, base_config, sink, args.ticks)
+        if args.seconds > 0:
+            results['realtime'] = measure_realtime(base_config, sink, args.rate, args.seconds)
+        if args.frames > 0:
+            results['draw_ui'] = measure_draw_ui(base_config, sink, args.frames)
+    finally:
+        sink.close()
+        pygame.quit()
+
+    print_results(results)
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump({'environment': environment(), 'results': results}, f, indent=2)
+        print(f"\nBaseline gespeichert: {args.save}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        rows = compare(results, baseline, args.tolerance)
+        print(f"\nVergleich mit {args.compare} ({baseline.get('environment', {}).get('timestamp', '?')}, "
+              f"Toleranz {args.tolerance * 100:.0f} %):")
+        for scenario, metric, old, new, change, regression in rows:
+            marker = "⚠ REGRESSION" if regression else ""
+            print(f"  {scenario:<20} {metric:<22} {old:>12.2f} -> {new:>12.2f} {change * 100:>+7.1f} % {marker}")
+        regressions = [row for row in rows if row[5]]
+        if regressions:
+            print(f"\n{len(regressions)} Regression(en) gegenüber der Baseline")
+            sys.exit(1)
+        print("\nKeine Regressionen")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Sendetakt an die Konsole (osc.console_rate) vs. Last und Aktualität.
+
+Die Bridge läuft mit fester Engine-Rate und einem Fake-Stick, der Pan/Tilt
+gleichmäßig bewegt, und sendet an ma3_standin (eigener Prozess), das wie
+XboxControl.lua alle 50 ms die Fader liest. Pro Sendetakt:
+
+- Pakete/s und Nachrichten/s an der Konsole (OSC-Last)
+- überschrieben: Fader-Werte, die die Konsole nie gelesen hat (verschwendete Last)
+- Wertalter: Empfang -> Lesen durch updateLoop() (p50/p99)
+- Wartezeit: wie lange die älteste Änderung in der Bridge auf ein Token gewartet hat
+
+    python -m benchmarks.bench_console_rate [--rates 0 20 40 60] [--engine-rate 250] [--seconds 6]
+"""
+import argparse
+import json
+import math
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import pygame
+
+import xbox_to_ma3
+from benchmarks.bench_bridge import configure
+from metrics import Metrics
+
+STANDIN = Path(__file__).resolve().parent.parent / "ma3_standin.py"
+
+
+def free_port():
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.bind(('127.0.0.1', 0))
+    port = sock.getsockname()[1]
+    sock.close()
+    return port
+
+
+def measure_rate(base_config, console_rate, engine_rate, seconds):
+    port = free_port()
+    with tempfile.TemporaryDirectory() as tmp:
+        json_path = os.path.join(tmp, "standin.json")
+        standin = subprocess.Popen([sys.executable, str(STANDIN), '--port', str(port),
+                                    '--duration', str(seconds + 1.0), '--json', json_path,
+                                    '--status-interval', str(seconds * 10)],
+                                   stdout=subprocess.DEVNULL)
+        time.sleep(0.5)     # Stand-in muss lauschen, bevor das erste Paket kommt
+
+        app, joysticks = configure(base_config, port, 1, True, False, console_rate=console_rate)
+        app.metrics = Metrics()
+        post = app.joystick_events.append
+        start = time.perf_counter()
+        tick = 0
+        while True:
+            elapsed = time.perf_counter() - start
+            if elapsed >= seconds:
+                break
+            post(pygame.event.Event(pygame.JOYAXISMOTION, instance_id=joysticks[0], axis=0,
+                                    value=0.8 * math.sin(elapsed * 2.0), joy=0))
+            post(pygame.event.Event(pygame.JOYAXISMOTION, instance_id=joysticks[0], axis=1,
+                                    value=0.6 * math.cos(elapsed * 1.3), joy=0))
+            app.update_values()
+            tick += 1
+            time.sleep(max(0.0, tick / engine_rate - (time.perf_counter() - start)))
+        hold = app.metrics.histograms['hold'].summary()
+        app.client.close()
+
+        standin.wait()
+        with open(json_path) as f:
+            data = json.load(f)
+
+    source = data['sources'][0] if data['sources'] else {'packets_per_sec': 0.0, 'messages_per_sec': 0.0}
+    return {
+        'packets_per_sec': source['packets_per_sec'],
+        'messages_per_sec': source['messages_per_sec'],
+        'overwritten': sum(plugin['coalesced'] for plugin in data['plugins']),
+        'age_p50_ms': data['value_age_p50_ms'],
+        'age_p99_ms': data['value_age_p99_ms'],
+        'hold_p50_ms': hold['p50_ms'],
+        'hold_p99_ms': hold['p99_ms'],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rates', type=float, nargs='+', default=[0, 20, 40, 60],
+                        help="osc.console_rate-Werte (0 = jeder Tick)")
+    parser.add_argument('--engine-rate', type=float, default=250)
+    parser.add_argument('--seconds', type=float, default=6.0)
+    args = parser.parse_args()
+
+    base_config = json.loads(json.dumps(xbox_to_ma3.CONFIG))
+
+    print(f"Engine {args.engine_rate:g} Hz, Bundle, {args.seconds:g} s pro Takt")
+    print("| Takt | Pakete/s | Nachrichten/s | überschrieben | Wertalter p50/p99 (ms) | Wartezeit p50/p99 (ms) |")
+    print("|---|---:|---:|---:|---:|---:|")
+    for rate in args.rates:
+        result = measure_rate(base_config, rate, args.engine_rate, args.seconds)
+        label = f"{rate:g} Hz" if rate else "jeder Tick"
+        print(f"| {label} | {result['packets_per_sec']:.1f} | {result['messages_per_sec']:.1f} | "
+              f"{result['overwritten']} | {result['age_p50_ms']:.1f} / {result['age_p99_ms']:.1f} | "
+              f"{result['hold_p50_ms']:.1f} / {result['hold_p99_ms']:.1f} |")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+Latenz Befehlsmodus vs. Fader-Umweg (Bridge -> Fader -> Plugin-Poll -> Cmd).
+
+Die Bridge läuft mit fester Engine-Rate gegen ma3_standin (im selben Prozess,
+eigener Thread). Ein Fake-Stick springt wiederholt aus der Ruhe auf einen
+Ausschlag. Gemessen wird die Zeit vom Stick-Event bis zur ersten Bewegung
+des simulierten Fixtures:
+
+- fader:  Fader-Werte an /PageX/FaderY, XboxControlPlugin liest alle 50 ms
+          und bewegt das Fixture (wie XboxControl.lua)
+- direct: Attribute-Befehle an /cmd, die der Ersatz beim Empfang ausführt
+
+Beide Pfade nutzen dieselbe Bridge-Glättung. Die Befehle/s an der Konsole
+stehen mit dabei. Die Ausführungszeit eines Befehls in der echten Konsole
+ist nicht enthalten - sie fällt in beiden Pfaden an (Cmd() im Plugin).
+
+    python -m benchmarks.bench_direct_commands [--modes relative absolute] [--steps 20] [--engine-rate 250]
+"""
+import argparse
+import json
+import random
+import threading
+import time
+
+import numpy as np
+import pygame
+
+import ma3_standin
+import xbox_to_ma3
+from benchmarks.bench_bridge import configure
+from benchmarks.bench_console_rate import free_port
+
+
+def run_path(base_config, path, mode, steps, engine_rate, direct_rate, seed=1):
+    port = free_port()
+    osc_config = base_config['osc']
+    faders = {name: osc_config['fader_' + name] for name in ma3_standin.FADER_NAMES}
+    plugin = ma3_standin.XboxControlPlugin("Plugin", osc_config['target_page'], faders, mode)
+    standin = ma3_standin.StandIn([port], [plugin])
+    move_log = []
+    plugin.move_log = move_log
+    standin.commands.move_log = move_log
+
+    base_config = json.loads(json.dumps(base_config))
+    base_config['direct'].update(enabled=path == 'direct', mode=mode, rate=direct_rate, fixture=None)
+    app, joysticks = configure(base_config, port, 1, False, False)
+
+    rest, hold = 0.5, 0.3
+    duration = steps * (rest + hold) + 1.0
+    thread = threading.Thread(target=standin.run, args=(duration + 0.5, 0), daemon=True)
+    thread.start()
+
+    rng = random.Random(seed)
+    post = app.joystick_events.append
+    step_times = []
+    start = time.perf_counter()
+    tick = 0
+    # Ruhe, Sprung, halten - der Sprung liegt zufällig zum 50-ms-Loop des Plugins
+    schedule = []
+    t = rest
+    for _ in range(steps):
+        t += rng.uniform(0.0, 0.05)
+        schedule.append((t, 0.8))
+        schedule.append((t + hold, 0.0))
+        t += hold + rest
+    position = 0
+    while time.perf_counter() - start < duration:
+        elapsed = time.perf_counter() - start
+        while position < len(schedule) and elapsed >= schedule[position][0]:
+            value = schedule[position][1]
+            post(pygame.event.Event(pygame.JOYAXISMOTION, instance_id=joysticks[0], axis=0, value=value, joy=0))
+            if value:
+                step_times.append(time.time())
+            position += 1
+        app.update_values()
+        tick += 1
+        time.sleep(max(0.0, tick / engine_rate - (time.perf_counter() - start)))
+    app.client.close()
+    thread.join()
+    standin.close()
+
+    # Erste Pan-Bewegung nach jedem Sprung
+    pan_moves = [(t, value) for t, attribute, value in move_log if attribute == 'pan']
+    times = np.array([t for t, _ in pan_moves])
+    latencies = []
+    for step_time in step_times:
+        index = int(np.searchsorted(times, step_time))
+        if index < len(times) and times[index] - step_time < hold:
+            latencies.append(times[index] - step_time)
+    data = standin.summary()
+    source = data['sources'][0] if data['sources'] else {'messages_per_sec': 0.0}
+    return {
+        'latencies_ms': np.array(latencies) * 1000.0,
+        'missed': len(step_times) - len(latencies),
+        'messages_per_sec': source['messages_per_sec'],
+        'console_commands_per_sec': (plugin.command_count + data['commands']['received']) / duration,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--modes', nargs='+', choices=('relative', 'absolute'), default=['relative', 'absolute'])
+    parser.add_argument('--steps', type=int, default=20)
+    parser.add_argument('--engine-rate', type=float, default=250)
+    parser.add_argument('--direct-rate', type=float, default=20, help="direct.rate (Schritte/s)")
+    args = parser.parse_args()
+
+    base_config = json.loads(json.dumps(xbox_to_ma3.CONFIG))
+
+    print(f"Engine {args.engine_rate:g} Hz, {args.steps} Sprünge pro Lauf, Befehlsmodus {args.direct_rate:g} Schritte/s")
+    print("| Modus | Pfad | Latenz p50 (ms) | p90 | max | verpasst | OSC-Nachr./s | Cmds/s an der Konsole |")
+    print("|---|---|---:|---:|---:|---:|---:|---:|")
+    for mode in args.modes:
+        for path in ('fader', 'direct'):
+            result = run_path(base_config, path, mode, args.steps, args.engine_rate, args.direct_rate)
+            latencies = result['latencies_ms']
+            if len(latencies):
+                p50, p90 = np.percentile(latencies, [50, 90])
+                stats = f"{p50:.1f} | {p90:.1f} | {latencies.max():.1f}"
+            else:
+                stats = "- | - | -"
+            print(f"| {mode} | {path} | {stats} | {result['missed']} | "
+                  f"{result['messages_per_sec']:.0f} | {result['console_commands_per_sec']:.0f} |")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+"""
+Lag vs. Jitter der Glättungsfilter bei verschiedenen Engine-Raten.
+
+Ein Stick-Trace (Zeit, Wert) wird mit der jeweiligen Tick-Rate abgetastet -
+optional mit verworfenen Ticks - und durch jeden Filter geschickt:
+
+- jitter:     Standardabweichung in Haltephasen (Fader-%), d.h. Sensorrauschen,
+              das bis zu MA3 durchkommt
+- throw lag:  Zeit, bis 90 % eines schnellen Stick-Wurfs erreicht sind (ms,
+              zusätzlich zum Eingang selbst)
+- ramp lag:   mittlere Verzögerung beim langsamen Nachführen (ms)
+
+Ohne --trace wird ein synthetischer Trace verwendet: Haltephasen mit
+Sensorrauschen und int16-Quantisierung wie bei SDL, schnelle Würfe (60 ms)
+und langsame Rampen. Ein eigener Trace ist eine JSON-Liste [[t_sekunden, wert], ...].
+
+    python -m benchmarks.bench_filters [--rates 50 250 1000] [--drop 0.02] [--trace datei.json]
+"""
+import argparse
+import json
+import random
+
+import numpy as np
+
+from filters import LowPassFilter, OneEuroFilter, time_constant_from_smoothing
+
+NOISE = 0.004           # Sensorrauschen (1 Sigma, Stick-Einheiten)
+QUANT = 1.0 / 32768     # SDL liefert int16
+SETTLE_TIME = 0.3       # Haltephasen erst nach dieser Zeit für Jitter werten
+
+# (Dauer s, Art, Zielwert): hold = halten, throw = 60 ms Wurf, ramp = langsam nachführen
+SEGMENTS = [
+    (1.5, 'hold', 0.6), (0.06, 'throw', -0.8), (1.5, 'hold', -0.8),
+    (1.5, 'ramp', -0.2), (1.0, 'hold', -0.2), (0.06, 'throw', 0.9),
+    (1.5, 'hold', 0.9), (2.0, 'ramp', 0.3), (1.0, 'hold', 0.3),
+    (0.06, 'throw', -0.5), (1.5, 'hold', -0.5), (0.06, 'throw', 0.5), (1.5, 'hold', 0.5),
+]
+
+
+def synthetic_trace(seed=1, sample_rate=2000):
+    """Gibt (t, clean, noisy, segments) zurück; segments = [(start, ende, art, von, nach)]"""
+    rng = random.Random(seed)
+    times, clean, segments = [], [], []
+    t, value = 0.0, 0.0
+    step = 1.0 / sample_rate
+    for duration, kind, target in SEGMENTS:
+        start_value = value if segments else target
+        if not segments:
+            value = target
+        segments.append((t, t + duration, kind, start_value, target))
+        n = int(round(duration * sample_rate))
+        for i in range(n):
+            if kind == 'hold':
+                value = target
+            else:
+                value = start_value + (target - start_value) * (i + 1) / n
+            times.append(t)
+            clean.append(value)
+            t += step
+    noisy = [round((v + rng.gauss(0.0, NOISE)) / QUANT) * QUANT for v in clean]
+    return np.array(times), np.array(clean), np.array(noisy), segments
+
+
+def load_trace(path):
+    with open(path) as f:
+        samples = json.load(f)
+    times = np.array([s[0] for s in samples])
+    values = np.array([s[1] for s in samples])
+    return times - times[0], values, values, None
+
+
+def run_filter(make, times, noisy, rate, drop, seed=2):
+    """Tastet den Trace mit rate ab (verworfene Ticks -> größeres dt) und filtert"""
+    rng = random.Random(seed)
+    filt = make(rate)
+    target = np.zeros(1)
+    tick_times, outputs = [], []
+    last = None
+    t = 0.0
+    while t <= times[-1]:
+        if last is None or rng.random() >= drop:
+            index = min(np.searchsorted(times, t), len(times) - 1)
+            target[0] = noisy[index]
+            if last is None:
+                filt.value[:] = target
+                if hasattr(filt, 'previous'):
+                    filt.previous[:] = target
+            dt = t - last if last is not None else 1.0 / rate
+            outputs.append(float(filt(target, dt)[0]))
+            tick_times.append(t)
+            last = t
+        t += 1.0 / rate
+    return np.array(tick_times), np.array(outputs)
+
+
+def legacy_filter(smoothing):
+    """Alter Pfad: fester Faktor pro Tick, dt wird ignoriert"""
+    class Legacy:
+        def __init__(self, rate):
+            self.value = np.zeros(1)
+
+        def __call__(self, target, dt):
+            self.value += (target - self.value) * (1.0 - smoothing)
+            return self.value
+    return Legacy
+
+
+def measure(tick_times, outputs, times, clean, segments):
+    """Gibt (jitter Fader-%, throw lag ms, ramp lag ms) zurück"""
+    jitter, throw_lags, ramp_lags = [], [], []
+    for start, end, kind, start_value, target in segments:
+        mask = (tick_times >= start) & (tick_times < end)
+        if kind == 'hold':
+            settled = mask & (tick_times >= start + SETTLE_TIME)
+            if settled.any():
+                jitter.append(np.std(outputs[settled] - target) * 50)
+        elif kind == 'throw':
+            # Ab Wurfbeginn: wann erreicht der Ausgang 90 %, verglichen mit dem Eingang selbst
+            threshold = start_value + 0.9 * (target - start_value)
+            after = tick_times >= start
+            reached = np.nonzero(after & ((outputs - threshold) * np.sign(target - start_value) >= 0))[0]
+            ideal = start + 0.9 * (end - start)
+            if len(reached):
+                throw_lags.append((tick_times[reached[0]] - ideal) * 1000)
+        elif kind == 'ramp':
+            slope = (target - start_value) / (end - start)
+            inner = mask & (tick_times >= start + 0.2)
+            if inner.any() and slope:
+                expected = start_value + slope * (tick_times[inner] - start)
+                ramp_lags.append(np.mean((expected - outputs[inner]) / slope) * 1000)
+    return (float(np.mean(jitter)) if jitter else float('nan'),
+            float(np.mean(throw_lags)) if throw_lags else float('nan'),
+            float(np.mean(ramp_lags)) if ramp_lags else float('nan'))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rates', type=int, nargs='+', default=[50, 250, 1000])
+    parser.add_argument('--drop', type=float, default=0.0, help="Anteil verworfener Ticks (0-1)")
+    parser.add_argument('--trace', help="Eigener Trace als JSON [[t, wert], ...] (nur Abweichung zum Eingang)")
+    parser.add_argument('--smoothing', type=float, default=0.3, help="Alter smoothing-Faktor zum Vergleich")
+    parser.add_argument('--min-cutoff-ms', type=float, default=50.0)
+    parser.add_argument('--beta', type=float, default=10.0)
+    parser.add_argument('--derivative-ms', type=float, default=30.0)
+    args = parser.parse_args()
+
+    if args.trace:
+        times, clean, noisy, segments = load_trace(args.trace)
+    else:
+        times, clean, noisy, segments = synthetic_trace()
+
+    equivalent_ms = time_constant_from_smoothing(args.smoothing, 50)
+    filters = [
+        (f"smoothing {args.smoothing} / Tick (alt)", legacy_filter(args.smoothing)),
+        (f"lowpass {equivalent_ms:.1f} ms", lambda rate: LowPassFilter(1, equivalent_ms)),
+        (f"one_euro {args.min_cutoff_ms:g} ms, beta {args.beta:g}",
+         lambda rate: OneEuroFilter(1, args.min_cutoff_ms, args.beta, args.derivative_ms)),
+    ]
+
+    print(f"| Filter | Rate | Jitter (Fader-%) | Wurf-Lag (ms) | Rampen-Lag (ms) |")
+    print(f"|---|---:|---:|---:|---:|")
+    for rate in args.rates:
+        for name, make in filters:
+            tick_times, outputs = run_filter(make, times, noisy, rate, args.drop)
+            if segments is None:
+                # Eigener Trace: ohne bekannte Segmente nur Abweichung zum Eingang
+                reference = np.interp(tick_times, times, clean)
+                print(f"| {name} | {rate} Hz | {np.std(outputs - reference) * 50:.3f} | - | - |")
+                continue
+            jitter, throw_lag, ramp_lag = measure(tick_times, outputs, times, clean, segments)
+            print(f"| {name} | {rate} Hz | {jitter:.3f} | {throw_lag:.1f} | {ramp_lag:.1f} |")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Micro-Benchmark: python-osc SimpleUDPClient vs. vorkodierter Encoder + Raw-Socket.
+
+Ein "Tick" entspricht dem, was update_values() pro Durchlauf sendet:
+5 Fader (float) + 1 Key (int), an einen lokalen UDP-Sink.
+
+    python -m benchmarks.bench_osc_encoder [--ticks 20000]
+"""
+import argparse
+import socket
+import time
+import tracemalloc
+
+from pythonosc import udp_client
+
+from osc_encoder import OscMessageEncoder, RawOscSender
+
+OSC_CONFIG = {
+    "target_page": 1,
+    "fader_pan": 201,
+    "fader_tilt": 202,
+    "fader_dimmer": 203,
+    "fader_fine_pan": 204,
+    "fader_fine_tilt": 205,
+}
+FADERS = ('fader_pan', 'fader_tilt', 'fader_dimmer', 'fader_fine_pan', 'fader_fine_tilt')
+MESSAGES_PER_TICK = len(FADERS) + 1
+
+
+def make_sink():
+    """UDP-Socket auf Loopback, der die Pakete annimmt (und verwirft)"""
+    sink = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sink.bind(('127.0.0.1', 0))
+    return sink
+
+
+def make_simple_client_tick(port):
+    """Bisheriger Pfad: f-String-Adresse + Dict-Lookups + send_message()"""
+    client = udp_client.SimpleUDPClient('127.0.0.1', port)
+    config = {'osc': OSC_CONFIG}
+
+    def tick(value):
+        osc_config = config['osc']
+        for fader in FADERS:
+            client.send_message(f"/Page{osc_config['target_page']}/Fader{osc_config[fader]}", value)
+        client.send_message(f"/Page{osc_config['target_page']}/Key{osc_config['fader_pan']}", 1)
+
+    return tick
+
+
+def make_encoder_tick(port):
+    """Neuer Pfad: vorkodierte Nachrichten + nicht-blockierender Raw-Socket"""
+    sender = RawOscSender('127.0.0.1', port)
+    encoders = [OscMessageEncoder(f"/Page{OSC_CONFIG['target_page']}/Fader{OSC_CONFIG[f]}") for f in FADERS]
+    key = OscMessageEncoder(f"/Page{OSC_CONFIG['target_page']}/Key{OSC_CONFIG['fader_pan']}", 'i')
+    send = sender.send
+
+    def tick(value):
+        for encoder in encoders:
+            send(encoder.encode(value))
+        send(key.encode(1))
+
+    return tick
+
+
+def measure(tick, ticks):
+    """Gibt (Nachrichten/s, µs/Tick, Peak-Bytes/Tick) zurück"""
+    # Aufwärmen
+    for i in range(200):
+        tick(float(i % 100))
+
+    start = time.perf_counter()
+    for i in range(ticks):
+        tick(float(i % 100))
+    elapsed = time.perf_counter() - start
+
+    # Allokationen getrennt messen - tracemalloc verfälscht die Laufzeit
+    samples = min(ticks, 2000)
+    tracemalloc.start()
+    peak_total = 0
+    for i in range(samples):
+        value = float(i % 100)
+        baseline = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        tick(value)
+        peak_total += tracemalloc.get_traced_memory()[1] - baseline
+    tracemalloc.stop()
+
+    return ticks * MESSAGES_PER_TICK / elapsed, elapsed / ticks * 1e6, peak_total / samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--ticks', type=int, default=20000)
+    args = parser.parse_args()
+
+    sink = make_sink()
+    port = sink.getsockname()[1]
+
+    print(f"{'Pfad':<22} {'Msgs/s':>12} {'µs/Tick':>10} {'Alloc-Bytes/Tick':>18}")
+    for name, factory in (("SimpleUDPClient", make_simple_client_tick), ("Encoder + Raw-Socket", make_encoder_tick)):
+        msgs_per_sec, us_per_tick, alloc_bytes = measure(factory(port), args.ticks)
+        print(f"{name:<22} {msgs_per_sec:>12,.0f} {us_per_tick:>10.1f} {alloc_bytes:>18.0f}")
+
+    sink.close()
+
+
+if __name__ == "__main__":
+    main()
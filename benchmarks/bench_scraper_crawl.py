@@ -0,0 +1,160 @@
+"""
+Kompletter Scraper-Lauf gegen wlt_standin.py - offline und reproduzierbar.
+
+Der Ersatz spielt einen Mitschnitt (--corpus, von scraper.py --capture) oder
+synthetische Stücke (--synthetic) ab und läuft als eigener Prozess, der
+Scraper ebenfalls (wie python scraper.py --base-url ...). Szenarien, alle auf
+demselben Port (gleiche URLs und ETags):
+
+- kalt:     leerer Cache, jede Seite wird geladen und geparst
+- warm:     mit dem Cache aus "kalt" - der Ersatz antwortet 304
+- gestört:  ohne Cache, mit 503-Fehlern (--error-rate) und Rate-Limit (--rate-limit),
+            der Scraper muss wiederholen
+
+Pro Szenario:
+- Laufzeit von main() (ohne Interpreter-Start und Imports) und Seiten/s
+- Anfragen am Ersatz nach Status (inkl. Wiederholungen und 304)
+- Spitzen-Speicher (max. RSS) des Scrapers und des größten Parser-Prozesses (Linux/macOS)
+- ob die Daten dem kalten Lauf entsprechen (ohne Zeitstempel)
+
+    python -m benchmarks.bench_scraper_crawl [--corpus DIR | --synthetic 60] [--latency 20] [--workers 2]
+                                             [--error-rate 0.05] [--rate-limit 50] [--json crawl.json]
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from pathlib import Path
+
+try:
+    import resource
+except ImportError:     # Windows: kein max. RSS
+    resource = None
+
+ROOT = Path(__file__).resolve().parent.parent
+STANDIN = ROOT / "wlt_standin.py"
+
+
+def free_port():
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.bind(('127.0.0.1', 0))
+    port = sock.getsockname()[1]
+    sock.close()
+    return port
+
+
+def start_standin(source_args, port, extra_args):
+    process = subprocess.Popen([sys.executable, str(STANDIN), *source_args, '--port', str(port), *extra_args],
+                               stdout=subprocess.PIPE, text=True, cwd=ROOT)
+    line = process.stdout.readline()    # "✓ WLT-Ersatz auf ...", sobald er lauscht
+    if not line.startswith("✓"):
+        process.kill()
+        raise SystemExit(f"wlt_standin.py startet nicht: {line.strip()}")
+    return process
+
+
+def standin_stats(base_url):
+    with urllib.request.urlopen(f"{base_url}/_standin/stats") as response:
+        return json.load(response)
+
+
+def run_scraper(base_url, data_file, cache_file, workers):
+    """Startet einen Scraper-Prozess (--run-scraper) und liefert dessen Messwerte"""
+    command = [sys.executable, '-m', 'benchmarks.bench_scraper_crawl', '--run-scraper',
+               json.dumps({"base_url": base_url, "data_file": data_file, "cache_file": cache_file, "workers": workers})]
+    output = subprocess.run(command, capture_output=True, text=True, cwd=ROOT, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def run_scraper_here(spec):
+    """Im Scraper-Prozess: ein Lauf von main(), danach Laufzeit und Speicher als JSON-Zeile"""
+    import scraper
+    scraper.set_base_url(spec["base_url"])
+    if spec["workers"] is not None:
+        scraper.PARSER_WORKERS = spec["workers"]
+    start = time.perf_counter()
+    result = asyncio.run(scraper.main(spec["data_file"], spec["cache_file"]))
+    result["seconds"] = time.perf_counter() - start
+    if resource is not None:
+        # ru_maxrss: Linux KB, macOS Bytes
+        scale = 1024 * 1024 if sys.platform == 'darwin' else 1024
+        result["rss_mb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale
+        result["worker_rss_mb"] = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / scale
+    print(json.dumps(result))
+
+
+def load_data(path):
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)["daten"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument('--corpus', help="Mitschnitt von scraper.py --capture")
+    source.add_argument('--synthetic', type=int, default=60, metavar='N', help="N synthetische Stücke (Standard ohne --corpus)")
+    parser.add_argument('--latency', type=float, default=20.0, help="ms pro Antwort des Ersatzes")
+    parser.add_argument('--jitter', type=float, default=5.0)
+    parser.add_argument('--error-rate', type=float, default=0.05, help="503-Anteil im Szenario gestört")
+    parser.add_argument('--rate-limit', type=float, default=50.0, help="Anfragen/s im Szenario gestört")
+    parser.add_argument('--workers', type=int, default=None, help="scraper.PARSER_WORKERS (Standard: Kernzahl)")
+    parser.add_argument('--json', help="Ergebnisse als JSON speichern")
+    parser.add_argument('--run-scraper', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_scraper:
+        run_scraper_here(json.loads(args.run_scraper))
+        return
+
+    source_args = ['--corpus', args.corpus] if args.corpus else ['--synthetic', str(args.synthetic)]
+    timing = ['--latency', str(args.latency), '--jitter', str(args.jitter)]
+    scenarios = [
+        ("kalt", timing, True),
+        ("warm", timing, True),
+        ("gestört", timing + ['--error-rate', str(args.error_rate), '--rate-limit', str(args.rate_limit)], False),
+    ]
+
+    port = free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    results = []
+    print(f"Korpus: {args.corpus or f'{args.synthetic} synthetische Stücke'}, Latenz {args.latency:g}±{args.jitter:g} ms")
+    print("| Szenario | Laufzeit (s) | Seiten/s | Anfragen | Status | RSS Scraper (MB) | RSS Parser (MB) | Daten gleich |")
+    print("|---|---:|---:|---:|---|---:|---:|---|")
+    with tempfile.TemporaryDirectory() as tmp:
+        cache_file = os.path.join(tmp, "cache.json")
+        reference = None
+        for name, standin_args, use_cache in scenarios:
+            data_file = os.path.join(tmp, f"data_{len(results)}.json")
+            standin = start_standin(source_args, port, standin_args)
+            try:
+                result = run_scraper(base_url, data_file, cache_file if use_cache else None, args.workers)
+                stats = standin_stats(base_url)
+            finally:
+                standin.terminate()
+                standin.wait()
+            data = load_data(data_file)
+            if reference is None:
+                reference = data
+            status = " ".join(f"{code}:{count}" for code, count in sorted(stats["status"].items()))
+            rss = f"{result['rss_mb']:.0f}" if "rss_mb" in result else "-"
+            worker_rss = f"{result['worker_rss_mb']:.0f}" if result.get("worker_rss_mb") else "-"
+            rate = result["seiten"] / result["seconds"]
+            print(f"| {name} | {result['seconds']:.2f} | {rate:.1f} | {stats['requests']} | {status} | "
+                  f"{rss} | {worker_rss} | {'ja' if data == reference else '✗ nein'} |")
+            results.append(dict(result, scenario=name, pages_per_sec=rate, standin=stats, same_data=data == reference))
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+    if not all(result["same_data"] for result in results):
+        raise SystemExit("✗ Daten weichen vom kalten Lauf ab")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+"""
+Parsen der Stück-Seiten: Parser-Backends und Event-Loop vs. Prozess-Pool.
+
+Liest die Detail-Seiten eines Korpus (--corpus, Mitschnitt von scraper.py
+--capture oder ein Verzeichnis mit *.html) oder erzeugt synthetische Seiten im
+Aufbau der WLT-Seiten (wlt_standin.synthetic_page).
+
+Backends (scraper.PARSER_BACKEND/PARSE_TARGETED, ein Prozess): Seiten/s und
+Speed-up gegenüber html.parser mit ganzer Seite (dem bisherigen Parsing).
+Die Datensätze jedes Backends müssen Byte für Byte (als JSON) dieser Referenz
+entsprechen. Mit --save-golden werden die Referenz-Datensätze gespeichert, mit
+--golden gegen eine frühere Referenz geprüft (z.B. vor einer Parser-Änderung
+speichern). Bei Abweichungen ist der Exit-Code 1. Verbindlich geprüft gegen das
+ursprüngliche scrape_detail_page() wird in tests/test_scraper_golden.py.
+
+Worker (scraper.PARSER_WORKERS, Standard-Backend): pro Worker-Zahl
+
+- Seiten/s und Speed-up gegenüber dem Parsen im Event-Loop
+- max. Verzögerung des Event-Loops (ein 1-ms-Takt läuft nebenher - so lange
+  würden Abrufe stehen, während geparst wird)
+
+Geparst wird wie im Scraper über parse_html(), mit --check zusätzlich
+verglichen, ob alle Worker-Zahlen dieselben Datensätze liefern.
+
+    python -m benchmarks.bench_scraper_parse [--corpus DIR] [--pages 200] [--workers 0 1 2 4]
+    python -m benchmarks.bench_scraper_parse --corpus DIR --save-golden golden.json --workers
+    python -m benchmarks.bench_scraper_parse --corpus DIR --golden golden.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import scraper
+from wlt_standin import synthetic_page
+
+
+def load_corpus(corpus, pages):
+    if corpus:
+        # Mitschnitt von scraper.py --capture: nur die Detail-Seiten
+        root = Path(corpus) / "detail" if (Path(corpus) / "detail").is_dir() else Path(corpus)
+        files = sorted(root.rglob("*.html"))
+        if not files:
+            raise SystemExit(f"Keine *.html in {corpus}")
+        htmls = [f.read_text(encoding='utf-8') for f in files]
+        return [htmls[i % len(htmls)] for i in range(max(pages, len(htmls)))]
+    return [synthetic_page(i) for i in range(pages)]
+
+
+BACKENDS = [('html.parser', False), ('html.parser', True), ('lxml', False), ('lxml', True)]
+
+
+def encode_records(records):
+    return [json.dumps(record, ensure_ascii=False) for record in records]
+
+
+def compare_backends(htmls, golden=None):
+    """Seiten/s je Backend, Datensätze gegen die Referenz (html.parser, ganze Seite). False bei Abweichung"""
+    print("| Backend | gezielt | Seiten/s | Speed-up | identisch |")
+    print("|---|---|---:|---:|---|")
+    reference = golden
+    baseline = None
+    ok = True
+    for backend, targeted in BACKENDS:
+        if backend != 'html.parser' and scraper.parser_features(backend) == 'html.parser':
+            print(f"| {backend} | {'ja' if targeted else 'nein'} | - | - | nicht installiert |")
+            continue
+        start = time.perf_counter()
+        records = encode_records(scraper.parse_detail_page(html, backend, targeted) for html in htmls)
+        rate = len(htmls) / (time.perf_counter() - start)
+        if baseline is None:
+            baseline = rate
+        if reference is None:
+            reference = records
+        mismatches = [i for i, (expected, record) in enumerate(zip(reference, records)) if expected != record]
+        if len(records) != len(reference):
+            mismatches.append(len(records))
+        ok = ok and not mismatches
+        same = "ja" if not mismatches else f"✗ {len(mismatches)} Seiten (erste: {mismatches[0]})"
+        print(f"| {backend} | {'ja' if targeted else 'nein'} | {rate:.1f} | {rate / baseline:.2f}x | {same} |")
+    return ok, reference
+
+
+async def parse_all(htmls, workers):
+    """Parst alle Seiten wie der Scraper und misst nebenher die Verzögerung des Event-Loops"""
+    pool = ProcessPoolExecutor(max_workers=workers) if workers else None
+    if pool:
+        # Worker vorab starten - im Scraper laufen sie, während die Index-Seiten laden
+        await asyncio.gather(*(asyncio.get_running_loop().run_in_executor(pool, len, "") for _ in range(workers)))
+    lag = 0.0
+    done = False
+
+    async def heartbeat():
+        nonlocal lag
+        while not done:
+            start = time.perf_counter()
+            await asyncio.sleep(0.001)
+            lag = max(lag, time.perf_counter() - start - 0.001)
+
+    beat = asyncio.create_task(heartbeat())
+    await asyncio.sleep(0)
+    start = time.perf_counter()
+    records = await asyncio.gather(*(scraper.parse_html(pool, scraper.parse_detail_page, html) for html in htmls))
+    elapsed = time.perf_counter() - start
+    done = True
+    await beat
+    if pool:
+        pool.shutdown()
+    return records, elapsed, lag
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--corpus', help="Verzeichnis mit gespeicherten Detail-Seiten (*.html)")
+    parser.add_argument('--pages', type=int, default=200, help="Seitenzahl (Korpus wird wiederholt/ergänzt)")
+    parser.add_argument('--workers', type=int, nargs='*', default=None,
+                        help="Worker-Zahlen, 0 = im Event-Loop (Standard: 0 1 2 4 ... bis Kernzahl, leer = keine)")
+    parser.add_argument('--check', action='store_true', help="Datensätze aller Worker-Läufe vergleichen")
+    parser.add_argument('--save-golden', help="Referenz-Datensätze (html.parser, ganze Seite) als JSON speichern")
+    parser.add_argument('--golden', help="Backends gegen gespeicherte Referenz-Datensätze prüfen")
+    args = parser.parse_args()
+
+    cpus = os.cpu_count() or 1
+    workers = args.workers
+    if workers is None:
+        workers = [0, 1] + [n for n in (2, 4, 8, 16) if n <= cpus]
+    htmls = load_corpus(args.corpus, args.pages)
+    size = sum(len(html.encode('utf-8')) for html in htmls) / len(htmls) / 1024
+
+    print(f"{len(htmls)} Seiten, ∅ {size:.0f} KB, {cpus} Kerne\n")
+    golden = None
+    if args.golden:
+        with open(args.golden, encoding='utf-8') as f:
+            golden = json.load(f)
+    ok, reference = compare_backends(htmls, golden)
+    if args.save_golden:
+        with open(args.save_golden, 'w', encoding='utf-8') as f:
+            json.dump(reference, f, ensure_ascii=False, indent=0)
+        print(f"✓ Referenz gespeichert: {args.save_golden}")
+    if not ok:
+        raise SystemExit("✗ Backends liefern andere Datensätze als die Referenz")
+    if not workers:
+        return
+
+    print(f"\nWorker (Backend {scraper.PARSER_BACKEND}, gezielt: {'ja' if scraper.PARSE_TARGETED else 'nein'})")
+    print("| Worker | Seiten/s | Speed-up | max. Loop-Verzögerung (ms) |")
+    print("|---|---:|---:|---:|")
+    baseline = None
+    reference = None
+    for count in workers:
+        records, elapsed, lag = asyncio.run(parse_all(htmls, count))
+        rate = len(htmls) / elapsed
+        if baseline is None:
+            baseline = rate
+        label = f"{count}" if count else "Event-Loop"
+        print(f"| {label} | {rate:.1f} | {rate / baseline:.2f}x | {lag * 1000:.1f} |")
+        if args.check:
+            if reference is None:
+                reference = records
+            elif records != reference:
+                raise SystemExit(f"✗ {label}: Datensätze weichen ab")
+    if args.check:
+        print("✓ Alle Läufe liefern dieselben Datensätze")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,405 @@
+"""
+Konfiguration als unveränderlicher Snapshot mit Live-Reload.
+
+config.json wird nicht mehr pro Tick als verschachteltes Dict gelesen:
+- merge_config: tiefe Kopie der Defaults plus geladene Werte (die Defaults
+  selbst bleiben unverändert)
+- validate_config: prüft Typen und Wertebereiche und sammelt alle Fehler
+- ConfigSnapshot: was Engine und UI brauchen, kompiliert in __slots__-Objekte
+  ohne Setter. Pro Bank liegen die OSC-Kanäle (Name, Adresse, Deadband)
+  fertig vor.
+- ConfigWatcher: beobachtet config.json. Eine Änderung wird geladen,
+  geprüft und kompiliert, erst dann kommt sie beim Engine-Thread an. Ein
+  ungültiger Stand wird abgelehnt, der alte Snapshot bleibt aktiv.
+
+Live übernommen werden Deadzone, Kurve, Sensitivity, Glättung, Features,
+Deadband, Keepalive, Bundle, Sendetakt und die Fader/Pages der Bänke.
+RESTART_KEYS brauchen einen Neustart (Sockets, Engine-Rate, Fenster, ...).
+"""
+import copy
+import json
+import math
+import os
+import threading
+from types import MappingProxyType
+
+import numpy as np
+
+from axis_pipeline import build_response_curve
+from filters import make_filter
+
+FADER_NAMES = ('pan', 'tilt', 'dimmer', 'fine_pan', 'fine_tilt')
+
+WATCH_INTERVAL = 0.5    # Sekunden zwischen zwei Blicken auf config.json
+
+# Geänderte Schlüssel mit diesen Präfixen gelten erst nach einem Neustart
+RESTART_KEYS = ('osc.host', 'osc.port', 'osc.targets', 'controller.update_rate',
+                'features.live_reload', 'direct', 'metrics', 'shared_state', 'ui')
+
+
+class ConfigError(ValueError):
+    """Ungültige Konfiguration, errors enthält alle gefundenen Fehler"""
+
+    def __init__(self, errors):
+        super().__init__("; ".join(errors))
+        self.errors = errors
+
+
+def merge_config(defaults, loaded):
+    """Defaults + geladene Werte (eine Ebene tief), ohne defaults zu verändern"""
+    config = copy.deepcopy(defaults)
+    for key, value in loaded.items():
+        if isinstance(value, dict) and isinstance(config.get(key), dict):
+            config[key].update(copy.deepcopy(value))
+        else:
+            config[key] = copy.deepcopy(value)
+    return config
+
+
+def load_config_file(path, defaults):
+    """Liest, mischt und prüft config.json. Wirft OSError, ValueError (JSON) oder ConfigError"""
+    with open(path, 'r') as f:
+        loaded = json.load(f)
+    if not isinstance(loaded, dict):
+        raise ConfigError(["config.json muss ein JSON-Objekt sein"])
+    config = merge_config(defaults, loaded)
+    validate_config(config)
+    return config
+
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool) and math.isfinite(value)
+
+
+def _check_number(errors, section, config, key, low=None, high=None, integer=False, low_open=False):
+    value = config.get(key)
+    name = f"{section}.{key}"
+    if not _is_number(value) or (integer and not isinstance(value, int)):
+        errors.append(f"{name} muss eine {'ganze ' if integer else ''}Zahl sein, nicht {value!r}")
+    elif low is not None and (value <= low if low_open else value < low):
+        errors.append(f"{name} muss {'größer als' if low_open else 'mindestens'} {low} sein, nicht {value!r}")
+    elif high is not None and value > high:
+        errors.append(f"{name} darf höchstens {high} sein, nicht {value!r}")
+
+
+def _check_bool(errors, section, config, key):
+    if not isinstance(config.get(key), bool):
+        errors.append(f"{section}.{key} muss true oder false sein, nicht {config.get(key)!r}")
+
+
+def _check_faders(errors, section, config):
+    for name in FADER_NAMES:
+        if 'fader_' + name in config:
+            _check_number(errors, section, config, 'fader_' + name, 1, integer=True)
+    if 'target_page' in config:
+        _check_number(errors, section, config, 'target_page', 1, integer=True)
+
+
+def validate_config(config):
+    """Prüft eine gemischte Konfiguration, wirft ConfigError mit allen Fehlern"""
+    errors = []
+    for section in ('osc', 'controller', 'features', 'metrics', 'direct', 'shared_state', 'ui'):
+        if not isinstance(config.get(section), dict):
+            errors.append(f"{section} muss ein Objekt sein")
+    if errors:
+        raise ConfigError(errors)
+
+    osc = config['osc']
+    if not isinstance(osc.get('host'), str) or not osc['host']:
+        errors.append(f"osc.host muss ein Hostname sein, nicht {osc.get('host')!r}")
+    _check_number(errors, 'osc', osc, 'port', 1, 65535, integer=True)
+    _check_faders(errors, 'osc', osc)
+    deadband = osc.get('deadband')
+    if not isinstance(deadband, dict):
+        errors.append("osc.deadband muss ein Objekt sein")
+    else:
+        for name in deadband:
+            if name not in FADER_NAMES:
+                errors.append(f"osc.deadband.{name}: unbekannter Fader")
+            else:
+                _check_number(errors, 'osc.deadband', deadband, name, 0)
+    _check_number(errors, 'osc', osc, 'keepalive_interval', 0)
+    _check_bool(errors, 'osc', osc, 'bundle')
+    _check_number(errors, 'osc', osc, 'console_rate', 0)
+    _check_number(errors, 'osc', osc, 'console_burst', 1)
+    targets = osc.get('targets')
+    if not isinstance(targets, list):
+        errors.append("osc.targets muss eine Liste sein")
+    else:
+        for i, target in enumerate(targets):
+            if not isinstance(target, dict) or not isinstance(target.get('host'), str):
+                errors.append(f"osc.targets[{i}] braucht host und port")
+            else:
+                _check_number(errors, f"osc.targets[{i}]", target, 'port', 1, 65535, integer=True)
+
+    controller = config['controller']
+    _check_number(errors, 'controller', controller, 'deadzone', 0, 0.95)
+    if controller.get('deadzone_mode', 'axial') not in ('radial', 'axial'):
+        errors.append(f"controller.deadzone_mode muss radial oder axial sein, nicht {controller['deadzone_mode']!r}")
+    _check_number(errors, 'controller', controller, 'sensitivity')
+    _check_number(errors, 'controller', controller, 'fine_sensitivity')
+    _check_number(errors, 'controller', controller, 'update_rate', 1, 2000)
+    _check_number(errors, 'controller', controller, 'smoothing', 0, 0.99)
+    try:
+        curve = controller.get('response_curve') or {'type': 'linear'}
+        if not np.all(np.isfinite(build_response_curve(curve, 17)[1])):
+            errors.append("controller.response_curve liefert keine gültigen Werte")
+    except (ValueError, TypeError, AttributeError) as e:
+        errors.append(f"controller.response_curve: {e}")
+    filter_config = controller.get('filter')
+    if filter_config is not None and not isinstance(filter_config, dict):
+        errors.append(f"controller.filter muss ein Objekt sein, nicht {filter_config!r}")
+    elif filter_config:
+        # Zeitkonstanten > 0 (sonst Division durch 0 im ersten Tick), beta >= 0
+        for key in ('time_constant_ms', 'min_cutoff_ms', 'derivative_ms'):
+            if key in filter_config:
+                _check_number(errors, 'controller.filter', filter_config, key, 0, low_open=True)
+        if 'beta' in filter_config:
+            _check_number(errors, 'controller.filter', filter_config, 'beta', 0)
+    if not errors:
+        # Filter zur Probe bauen und einmal rechnen (braucht eine gültige update_rate/smoothing)
+        try:
+            probe = make_filter(filter_config, 1, controller['smoothing'], controller['update_rate'])
+            if not np.all(np.isfinite(probe(np.zeros(1), 0.02))):
+                errors.append("controller.filter liefert keine gültigen Werte")
+        except (ValueError, TypeError, AttributeError, ArithmeticError) as e:
+            errors.append(f"controller.filter: {e}")
+
+    features = config['features']
+    for key in features:
+        _check_bool(errors, 'features', features, key)
+
+    metrics = config['metrics']
+    _check_bool(errors, 'metrics', metrics, 'enabled')
+    _check_number(errors, 'metrics', metrics, 'json_interval', 0, low_open=True)
+    _check_number(errors, 'metrics', metrics, 'prometheus_port', 0, 65535, integer=True)
+
+    direct = config['direct']
+    _check_bool(errors, 'direct', direct, 'enabled')
+    if direct.get('mode') not in ('relative', 'absolute'):
+        errors.append(f"direct.mode muss relative oder absolute sein, nicht {direct.get('mode')!r}")
+    _check_number(errors, 'direct', direct, 'rate', 0, low_open=True)
+    if not isinstance(direct.get('address'), str) or not direct['address'].startswith('/'):
+        errors.append(f"direct.address muss mit / beginnen, nicht {direct.get('address')!r}")
+
+    shared_state = config['shared_state']
+    _check_bool(errors, 'shared_state', shared_state, 'enabled')
+    if not isinstance(shared_state.get('name'), str) or not shared_state['name'] or '/' in shared_state['name']:
+        errors.append(f"shared_state.name muss ein Name ohne / sein, nicht {shared_state.get('name')!r}")
+    _check_number(errors, 'shared_state', shared_state, 'ring_size', 1, integer=True)
+
+    controllers = config.get('controllers')
+    if not isinstance(controllers, list):
+        errors.append("controllers muss eine Liste sein")
+    else:
+        for i, bank_config in enumerate(controllers):
+            if not isinstance(bank_config, dict):
+                errors.append(f"controllers[{i}] muss ein Objekt sein")
+            else:
+                _check_faders(errors, f"controllers[{i}]", bank_config)
+
+    ui = config['ui']
+    _check_number(errors, 'ui', ui, 'window_width', 1, integer=True)
+    _check_number(errors, 'ui', ui, 'window_height', 1, integer=True)
+    _check_number(errors, 'ui', ui, 'refresh_rate', 0, low_open=True)
+
+    if errors:
+        raise ConfigError(errors)
+
+
+def changed_keys(old, new):
+    """Geänderte Schlüssel als "abschnitt.key" (Listen und Nicht-Dicts als Ganzes)"""
+    changed = []
+    for section in sorted(set(old) | set(new)):
+        old_value, new_value = old.get(section), new.get(section)
+        if isinstance(old_value, dict) and isinstance(new_value, dict):
+            changed.extend(f"{section}.{key}" for key in sorted(set(old_value) | set(new_value))
+                           if old_value.get(key) != new_value.get(key))
+        elif old_value != new_value:
+            changed.append(section)
+    return changed
+
+
+def restart_keys(old, new):
+    """Geänderte Schlüssel, die erst nach einem Neustart wirken"""
+    keys = [key for key in changed_keys(old, new)
+            if any(key == prefix or key.startswith(prefix + '.') for prefix in RESTART_KEYS)]
+    # Bänke: Anzahl und Zuordnung stehen fest, Pages und Fader sind live änderbar
+    old_banks = [bank.identity for bank in compile_banks(old)]
+    new_banks = [bank.identity for bank in compile_banks(new)]
+    if old_banks != new_banks:
+        keys.append('controllers')
+    return keys
+
+
+class Frozen:
+    """Basis der Snapshot-Klassen: Attribute werden nur im Konstruktor gesetzt"""
+    __slots__ = ()
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} ist unveränderlich")
+
+    def _set(self, **values):
+        for name, value in values.items():
+            object.__setattr__(self, name, value)
+
+
+class ControllerSettings(Frozen):
+    __slots__ = ('deadzone', 'deadzone_mode', 'sensitivity', 'fine_sensitivity', 'response_curve',
+                 'filter', 'smoothing', 'update_rate')
+
+    def __init__(self, config):
+        self._set(deadzone=float(config['deadzone']),
+                  deadzone_mode=config.get('deadzone_mode', 'axial'),
+                  sensitivity=float(config['sensitivity']),
+                  fine_sensitivity=float(config['fine_sensitivity']),
+                  response_curve=MappingProxyType(copy.deepcopy(config.get('response_curve') or {'type': 'linear'})),
+                  filter=MappingProxyType(copy.deepcopy(config.get('filter') or {})),
+                  smoothing=float(config['smoothing']),
+                  update_rate=config['update_rate'])
+
+    def pipeline_args(self):
+        """Argumente für AxisPipeline(...)/configure(...) ohne Bank-Anzahl und Engine-Rate"""
+        return (self.deadzone, self.deadzone_mode, self.sensitivity, self.fine_sensitivity,
+                self.response_curve, self.filter, self.smoothing)
+
+
+class OutputSettings(Frozen):
+    __slots__ = ('host', 'port', 'deadband', 'keepalive_interval', 'bundle', 'console_rate', 'console_burst')
+
+    def __init__(self, config, default_deadband):
+        deadband = dict(default_deadband)
+        deadband.update(config.get('deadband', {}))
+        self._set(host=config['host'], port=config['port'],
+                  deadband=MappingProxyType(deadband),
+                  keepalive_interval=config.get('keepalive_interval', 1.0),
+                  bundle=config.get('bundle', False),
+                  console_rate=config.get('console_rate', 0),
+                  console_burst=config.get('console_burst', 2))
+
+
+class FeatureSettings(Frozen):
+    __slots__ = ('use_fine', 'show_debug_info', 'auto_reconnect')
+
+    def __init__(self, config):
+        self._set(use_fine=config['use_right_stick_fine_control'],
+                  show_debug_info=config['show_debug_info'],
+                  auto_reconnect=config['auto_reconnect'])
+
+
+class BankLayout(Frozen):
+    """
+    Fader-Block einer Bank. channels: (Kanalname, OSC-Adresse, Deadband, Type-Tag)
+    pro Fader plus Key, Kanalnamen wie im gemeinsamen OscOutput ("<Index>.<Fader>").
+    """
+    __slots__ = ('index', 'name', 'match', 'mapping', 'fixture', 'page', 'faders', 'channels')
+
+    def __init__(self, index, bank_config, osc_config, deadband, default_fixture=None):
+        page = bank_config.get('target_page', osc_config['target_page'])
+        faders = {name: bank_config.get('fader_' + name, osc_config['fader_' + name]) for name in FADER_NAMES}
+        channels = tuple((f"{index}.{name}", f"/Page{page}/Fader{faders[name]}", deadband.get(name, 0.0), 'f')
+                         for name in FADER_NAMES)
+        channels += ((f"{index}.key", f"/Page{page}/Key{faders['pan']}", 0.0, 'i'),)
+        self._set(index=index,
+                  name=bank_config.get('name', f"Bank {index + 1}"),
+                  match=bank_config.get('match'),
+                  mapping=bank_config.get('mapping'),
+                  fixture=bank_config.get('fixture', default_fixture),
+                  page=page,
+                  faders=MappingProxyType(faders),
+                  channels=channels)
+
+    @property
+    def identity(self):
+        """Was eine Bank ausmacht (Änderung = Neustart), Page und Fader gehören nicht dazu"""
+        return self.name, self.match, self.mapping, self.fixture
+
+
+def compile_banks(config, deadband=None):
+    """Eine BankLayout pro Eintrag in controllers, ohne Eintrag eine Bank aus osc"""
+    osc_config = config['osc']
+    if deadband is None:
+        deadband = osc_config.get('deadband', {})
+    default_fixture = config.get('direct', {}).get('fixture')
+    return tuple(BankLayout(index, bank_config, osc_config, deadband, default_fixture)
+                 for index, bank_config in enumerate(config.get('controllers') or [{}]))
+
+
+class ConfigSnapshot(Frozen):
+    """
+    Kompilierter Stand einer geprüften Konfiguration. Wird nie verändert, nur
+    als Ganzes ersetzt - ein Engine-Tick sieht also immer einen konsistenten Stand.
+    raw ist das zugrunde liegende Dict (nur lesen).
+    """
+    __slots__ = ('controller', 'osc', 'features', 'banks', 'raw', 'version')
+
+    def __init__(self, config, default_deadband, version=0):
+        validate_config(config)
+        osc = OutputSettings(config['osc'], default_deadband)
+        self._set(controller=ControllerSettings(config['controller']),
+                  osc=osc,
+                  features=FeatureSettings(config['features']),
+                  banks=compile_banks(config, osc.deadband),
+                  raw=copy.deepcopy(config),
+                  version=version)
+
+
+class ConfigWatcher(threading.Thread):
+    """
+    Beobachtet config.json (Änderungszeit, Größe, Inode) und meldet jeden
+    gültigen neuen Stand an on_change(snapshot, restart) - restart sind die
+    geänderten Schlüssel, die erst nach einem Neustart wirken. Ungültige Stände
+    (halb geschriebene Datei, JSON-Fehler, Werte außerhalb der Grenzen) gehen
+    an on_reject(error), der bisherige Snapshot bleibt dann aktiv.
+    """
+
+    def __init__(self, path, defaults, on_change, on_reject, interval=WATCH_INTERVAL):
+        super().__init__(name="ConfigWatcher", daemon=True)
+        self.path = path
+        self.defaults = defaults
+        self.on_change = on_change
+        self.on_reject = on_reject
+        self.interval = interval
+        self.version = 0
+        self._stop_event = threading.Event()
+        self._file_state = self._stat()
+        # Vergleichsbasis ist der Dateistand, nicht die laufende Config
+        # (Kommandozeilen-Optionen sollen keinen Neustart-Hinweis auslösen)
+        try:
+            self.config = load_config_file(path, defaults)
+        except (OSError, ValueError):
+            self.config = copy.deepcopy(defaults)
+
+    def _stat(self):
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size, stat.st_ino
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            self.check()
+
+    def check(self):
+        """Lädt config.json, wenn sich die Datei seit dem letzten Blick geändert hat"""
+        file_state = self._stat()
+        if file_state is None or file_state == self._file_state:
+            return False    # Datei fehlt kurz (z.B. beim Speichern per Umbenennen) oder unverändert
+        self._file_state = file_state
+        try:
+            config = load_config_file(self.path, self.defaults)
+            snapshot = ConfigSnapshot(config, self.defaults['osc']['deadband'], self.version + 1)
+        except (OSError, ValueError) as e:
+            self.on_reject(e)
+            return False
+        restart = restart_keys(self.config, config)
+        self.config = config
+        self.version = snapshot.version
+        self.on_change(snapshot, restart)
+        return True
+
+    def stop(self):
+        self._stop_event.set()
+        if self.is_alive():
+            self.join(timeout=1.0)
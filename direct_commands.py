@@ -0,0 +1,223 @@
+"""
+Befehlsmodus: Pan/Tilt/Dimmer als MA3-Befehle statt über Fader.
+
+Bisher: Bridge -> Fader 201-205 -> XboxControl.lua fragt alle 50 ms
+getFaderValue() ab -> Cmd("Attribute 'Pan' At ..."). Im Befehlsmodus rechnet
+die Bridge dieselbe Logik (relativ/absolut, Fine Control, Dimmer, Follow-Mode
+wie AssignFixture) selbst und schickt die Befehle per OSC an den
+Befehlseingang der Konsole (Standard /cmd). Der Poll-Takt des Plugins fällt
+weg, das Plugin muss dafür nicht laufen.
+
+Unterschiede zum Plugin:
+- Geschwindigkeit und Velocity-Glättung laufen nach echter Zeit - bei jeder
+  Schrittrate bewegt sich das Fixture so schnell wie im Plugin bei 20 Hz
+- Grob- und Fein-Stick gehen im relativen Modus als ein Befehl pro Attribut raus
+- Absolutwerte und Dimmer nur bei Änderung
+- Relative Schritte in MA-Syntax mit Leerzeichen ("At + 0.500" / "At - 0.500"),
+  damit ein negativer Schritt nicht als Absolutwert gelesen wird
+- Schritte über einen Token-Bucket: die erste Bewegung nach Stillstand geht
+  sofort raus, danach höchstens rate Schritte pro Sekunde
+"""
+import time
+
+from osc_encoder import OscStringEncoder
+from osc_output import OscOutput, TokenBucket
+
+PLUGIN_INTERVAL = 0.05      # update_interval des Plugins, Bezug für Geschwindigkeit und Glättung
+VELOCITY_SMOOTHING = 0.2    # smoothVelocity(..., 0.2) pro Plugin-Loop
+MAX_STEP = 0.25             # längster Schritt nach einer Pause (wie MAX_TICK_DT)
+MOVE_THRESHOLD = 0.01       # wie im Plugin: darunter kein Befehl
+FINE_THRESHOLD = 0.005
+DIMMER_THRESHOLD = 5.0      # Dimmer erst ab 5 %
+DIMMER_STEP = 0.1           # kleinere Änderungen erzeugen keinen Befehl
+
+
+class CommandBank:
+    """Zuletzt gemeldete Fader-Werte (0-100) und Velocity einer Bank"""
+    __slots__ = ('prefix', 'values', 'velocity', 'last_absolute', 'last_dimmer', 'changed', 'moving')
+
+    def __init__(self, fixture=None):
+        self.prefix = f"Fixture {fixture} " if fixture else ""
+        self.values = {}
+        self.velocity = [0.0, 0.0, 0.0, 0.0]   # pan, tilt, pan_fine, tilt_fine
+        self.last_absolute = {}
+        self.last_dimmer = None
+        self.changed = False
+        self.moving = False
+
+
+class CommandOutput(OscOutput):
+    """
+    Gleiche Schnittstelle wie OscOutput, die Bänke senden weiter ihre
+    Fader-Werte. Statt Fader-Nachrichten entstehen daraus pro Schritt die
+    Attribute-Befehle des Plugins.
+    """
+
+    def __init__(self, sender, mode='relative', rate=20.0, burst=2.0, address='/cmd', fixtures=None,
+                 speed_multiplier=2.0, fine_multiplier=0.3, deadzone=5.0, bundle=False):
+        if mode not in ('relative', 'absolute'):
+            raise ValueError(f"Unbekannter Befehlsmodus: {mode}")
+        super().__init__(sender, keepalive_interval=0, bundle=bundle)
+        self.mode = mode
+        self.rate = rate
+        self.address = address
+        self.speed_multiplier = speed_multiplier
+        self.fine_multiplier = fine_multiplier
+        self.deadzone = deadzone
+        self.fixtures = fixtures or {}
+        self.encoder = OscStringEncoder(address)
+        self.step_bucket = TokenBucket(rate, burst)
+        self.banks = {}             # Bank-Index -> CommandBank
+        self.channel_map = {}       # Kanalname -> (CommandBank, Fader-Name)
+        self.commands = []
+        self.changed_since = None
+        self.last_step = None
+        self.step_count = 0
+
+    def add_channel(self, name, address, deadband=0.0, typetag='f'):
+        # Kanalnamen der Bänke sind "<Bank-Index>.<Fader>"
+        index, fader = name.split('.', 1)
+        index = int(index)
+        bank = self.banks.get(index)
+        if bank is None:
+            bank = self.banks[index] = CommandBank(self.fixtures.get(index))
+        self.channel_map[name] = (bank, fader)
+
+    def update_channel(self, name, address, deadband=0.0, typetag='f', release=None):
+        pass    # Befehle hängen nicht an Fader-Adressen
+
+    def send(self, name, value):
+        bank, fader = self.channel_map[name]
+        if fader == 'key' or bank.values.get(fader) == value:
+            self.suppressed_count += 1
+            return False
+        bank.values[fader] = value
+        if bank.changed:
+            self.coalesced_count += 1
+        elif self.changed_since is None:
+            self.changed_since = time.perf_counter()
+        bank.changed = True
+        return True
+
+    def keepalive(self, now=None):
+        pass    # relative Befehle zu wiederholen hieße das Fixture zu bewegen
+
+    def resync(self):
+        """Absolutwerte und Dimmer beim nächsten Schritt erneut senden"""
+        for bank in self.banks.values():
+            bank.last_absolute.clear()
+            bank.last_dimmer = None
+            bank.changed = True
+
+    def flush(self, now=None):
+        """Rechnet einen Schritt, wenn sich etwas geändert hat oder ein Fixture noch fährt"""
+        if now is None:
+            now = time.monotonic()
+        active = [bank for bank in self.banks.values() if bank.changed or bank.moving]
+        if not active:
+            self.last_step = now    # Stillstand zählt nicht als Bewegungszeit
+            self._update_rates()
+            return
+        if not self.step_bucket.take(now):
+            self.held_count += 1
+            self._update_rates()
+            return
+
+        dt = now - self.last_step if self.last_step is not None else PLUGIN_INTERVAL
+        self.last_step = now
+        dt = min(dt, MAX_STEP)
+        for bank in active:
+            self._step(bank, dt)
+        self.step_count += 1
+        if self.changed_since is not None:
+            self.last_hold = time.perf_counter() - self.changed_since
+            self.changed_since = None
+        self._send_commands()
+        self._update_rates()
+
+    def _deadzone(self, value):
+        return 50.0 if abs(value - 50.0) < self.deadzone else value
+
+    def _step(self, bank, dt):
+        """updateLoop() des Plugins für eine Bank, auf dt statt 50 ms skaliert"""
+        values = bank.values
+        bank.changed = False
+        pan_raw = values.get('pan')
+        tilt_raw = values.get('tilt')
+        if pan_raw is None or tilt_raw is None:
+            return
+
+        scale = dt / PLUGIN_INTERVAL
+        alpha = 1.0 - VELOCITY_SMOOTHING ** scale
+        velocity = bank.velocity
+        pan_val = self._deadzone(pan_raw)
+        tilt_val = self._deadzone(tilt_raw)
+        pan_move = 0.0
+        tilt_move = 0.0
+
+        if self.mode == 'relative':
+            speed = self.speed_multiplier
+            velocity[0] += ((pan_val - 50) / 50 * speed - velocity[0]) * alpha
+            velocity[1] += ((tilt_val - 50) / 50 * speed - velocity[1]) * alpha
+            if abs(velocity[0]) > MOVE_THRESHOLD:
+                pan_move = velocity[0]
+            if abs(velocity[1]) > MOVE_THRESHOLD:
+                tilt_move = velocity[1]
+        else:
+            self._absolute(bank, 'Pan', (pan_val - 50) * 2)
+            self._absolute(bank, 'Tilt', (tilt_val - 50) * 2)
+
+        # Fine Control (rechter Stick), nur wenn beide Fader Werte haben
+        pan_fine_raw = values.get('fine_pan')
+        tilt_fine_raw = values.get('fine_tilt')
+        if pan_fine_raw is not None and tilt_fine_raw is not None:
+            fine = self.speed_multiplier * self.fine_multiplier
+            velocity[2] += ((self._deadzone(pan_fine_raw) - 50) / 50 * fine - velocity[2]) * alpha
+            velocity[3] += ((self._deadzone(tilt_fine_raw) - 50) / 50 * fine - velocity[3]) * alpha
+            if abs(velocity[2]) > FINE_THRESHOLD:
+                pan_move += velocity[2]
+            if abs(velocity[3]) > FINE_THRESHOLD:
+                tilt_move += velocity[3]
+
+        if pan_move:
+            self._relative(bank, 'Pan', pan_move * scale)
+        if tilt_move:
+            self._relative(bank, 'Tilt', tilt_move * scale)
+        bank.moving = bool(pan_move or tilt_move)
+
+        dimmer = values.get('dimmer')
+        if (dimmer is not None and dimmer > DIMMER_THRESHOLD
+                and (bank.last_dimmer is None or abs(dimmer - bank.last_dimmer) >= DIMMER_STEP)):
+            bank.last_dimmer = dimmer
+            self.commands.append(f"{bank.prefix}Attribute 'Dimmer' At {dimmer:.1f}")
+
+    def _relative(self, bank, attribute, amount):
+        sign = '+' if amount >= 0 else '-'
+        self.commands.append(f"{bank.prefix}Attribute '{attribute}' At {sign} {abs(amount):.3f}")
+
+    def _absolute(self, bank, attribute, value):
+        text = f"{value:.2f}"
+        if bank.last_absolute.get(attribute) != text:
+            bank.last_absolute[attribute] = text
+            self.commands.append(f"{bank.prefix}Attribute '{attribute}' At {text}")
+
+    def _send_commands(self):
+        commands = self.commands
+        if not commands:
+            return
+        encode = self.encoder.encode
+        if self.bundle and len(commands) > 1:
+            bundle = self.bundle_encoder
+            bundle.begin()
+            for command in commands:
+                message = encode(command)
+                if not bundle.fits(message):
+                    self._send_packet(bundle.finish())
+                    bundle.begin()
+                bundle.add(message)
+            self._send_packet(bundle.finish())
+        else:
+            for command in commands:
+                self._send_packet(encode(command))
+        self.sent_count += len(commands)
+        commands.clear()
@@ -0,0 +1,192 @@
+"""
+Zeitbasierte Glättungsfilter für die MA3 Controller Bridge.
+
+Die Filter rechnen mit der echten Zeit seit dem letzten Tick (dt) statt
+mit einem festen Faktor pro Tick. Wie stark geglättet wird und wie viel
+Verzögerung entsteht, hängt damit nicht mehr von controller.update_rate
+ab, und ein verspäteter Tick holt einfach weiter auf statt zu springen.
+
+- LowPassFilter: exponentielle Glättung mit Zeitkonstante in ms
+- OneEuroFilter: Zeitkonstante sinkt mit der Stick-Geschwindigkeit
+  (in Ruhe stark geglättet, bei schnellen Würfen kaum Verzögerung)
+
+Alle Filter arbeiten elementweise auf NumPy-Arrays fester Form. step_flat()
+rechnet dasselbe für einzelne Elemente in reinem Python - bei wenigen Achsen
+schneller als die Fixkosten der ufunc-Aufrufe.
+"""
+import math
+
+import numpy as np
+
+TWO_PI = 2.0 * math.pi
+
+
+def time_constant_from_smoothing(smoothing, rate):
+    """
+    Rechnet den alten smoothing-Faktor (pro Tick) in eine Zeitkonstante (ms) um,
+    die bei der angegebenen Tick-Rate genau gleich glättet.
+    """
+    if smoothing <= 0.0:
+        return 0.0
+    return -1000.0 / (rate * math.log(smoothing))
+
+
+class LowPassFilter:
+    """Exponentielle Glättung: nach time_constant_ms sind 63 % eines Sprungs erreicht"""
+
+    def __init__(self, shape, time_constant_ms):
+        self.time_constant = time_constant_ms / 1000.0
+        self.value = np.zeros(shape)
+        self.flat = self.value.reshape(-1)     # View, für step_flat()
+        self._delta = np.zeros(shape)
+
+    def describe(self):
+        return f"Tiefpass {self.time_constant * 1000:.0f} ms"
+
+    def take_state(self, other):
+        """Übernimmt den geglätteten Stand eines anderen Filters (Live-Reload)"""
+        np.copyto(self.value, other.value)
+
+    def __call__(self, target, dt):
+        """Führt value um dt Sekunden Richtung target und gibt value zurück"""
+        if self.time_constant <= 0.0:
+            np.copyto(self.value, target)
+            return self.value
+        alpha = 1.0 - math.exp(-dt / self.time_constant)
+        np.subtract(target, self.value, out=self._delta)
+        np.multiply(self._delta, alpha, out=self._delta)
+        np.add(self.value, self._delta, out=self.value)
+        return self.value
+
+    def step_flat(self, targets, indices, dt, snap=0.0):
+        """
+        Wie __call__, aber nur für die flachen Indizes indices (targets ist eine
+        Liste wie value.ravel()). Werte, die näher als snap am Ziel liegen, rasten
+        dort ein. Gibt alle Werte als Liste zurück.
+        """
+        values = self.flat.tolist()
+        alpha = 1.0 - math.exp(-dt / self.time_constant) if self.time_constant > 0.0 else 1.0
+        for i in indices:
+            target = targets[i]
+            value = values[i]
+            value += (target - value) * alpha
+            values[i] = target if abs(target - value) < snap else value
+        self.flat[:] = values
+        return values
+
+
+class OneEuroFilter:
+    """
+    One Euro Filter (Casiez et al., CHI 2012) mit Zeitkonstanten in ms.
+
+    min_cutoff_ms: Zeitkonstante in Ruhe (groß = ruhiger, aber träger)
+    beta:          wie stark die Zeitkonstante mit der Geschwindigkeit
+                   (Einheiten/s) sinkt (groß = weniger Lag bei schnellen Würfen)
+    derivative_ms: Glättung der geschätzten Geschwindigkeit
+    """
+
+    def __init__(self, shape, min_cutoff_ms, beta, derivative_ms=30.0):
+        self.min_cutoff_ms = min_cutoff_ms
+        self.min_cutoff = 1000.0 / (TWO_PI * min_cutoff_ms) if min_cutoff_ms > 0.0 else math.inf
+        self.beta = beta
+        self.derivative_time_constant = derivative_ms / 1000.0
+
+        self.value = np.zeros(shape)
+        self.derivative = np.zeros(shape)
+        self.previous = np.zeros(shape)    # letzter Eingangswert (für die Geschwindigkeit)
+        self.flat = self.value.reshape(-1)     # Views, für step_flat()
+        self._derivative_flat = self.derivative.reshape(-1)
+        self._previous_flat = self.previous.reshape(-1)
+        self._delta = np.zeros(shape)
+        self._alpha = np.zeros(shape)
+
+    def describe(self):
+        return f"One Euro {self.min_cutoff_ms:g} ms, beta {self.beta:g}"
+
+    def take_state(self, other):
+        """Übernimmt den geglätteten Stand eines anderen Filters (Live-Reload)"""
+        np.copyto(self.value, other.value)
+        if isinstance(other, OneEuroFilter):
+            np.copyto(self.previous, other.previous)
+            np.copyto(self.derivative, other.derivative)
+        else:
+            np.copyto(self.previous, other.value)   # sonst sähe der erste Tick einen Sprung
+
+    def __call__(self, target, dt):
+        """Führt value um dt Sekunden Richtung target und gibt value zurück"""
+        delta = self._delta
+        alpha = self._alpha
+
+        # Geschwindigkeit des Eingangs, selbst tiefpassgefiltert
+        np.subtract(target, self.previous, out=delta)
+        np.multiply(delta, 1.0 / dt, out=delta)
+        np.subtract(delta, self.derivative, out=delta)
+        np.multiply(delta, 1.0 - math.exp(-dt / self.derivative_time_constant), out=delta)
+        np.add(self.derivative, delta, out=self.derivative)
+        np.copyto(self.previous, target)
+
+        # Grenzfrequenz = min_cutoff + beta * |Geschwindigkeit|, alpha = 1 - e^(-2π·fc·dt)
+        np.abs(self.derivative, out=alpha)
+        np.multiply(alpha, self.beta, out=alpha)
+        np.add(alpha, self.min_cutoff, out=alpha)
+        np.multiply(alpha, -TWO_PI * dt, out=alpha)
+        np.exp(alpha, out=alpha)
+        np.subtract(1.0, alpha, out=alpha)
+
+        np.subtract(target, self.value, out=delta)
+        np.multiply(delta, alpha, out=delta)
+        np.add(self.value, delta, out=self.value)
+        return self.value
+
+    def step_flat(self, targets, indices, dt, snap=0.0):
+        """
+        Wie __call__, aber nur für die flachen Indizes indices (targets ist eine
+        Liste wie value.ravel()). Werte, die näher als snap am Ziel liegen, rasten
+        dort ein. Gibt alle Werte als Liste zurück.
+        """
+        values = self.flat.tolist()
+        derivatives = self._derivative_flat.tolist()
+        previous = self._previous_flat.tolist()
+        rate = 1.0 / dt
+        derivative_alpha = 1.0 - math.exp(-dt / self.derivative_time_constant)
+        beta = self.beta
+        min_cutoff = self.min_cutoff
+        step = -TWO_PI * dt
+        for i in indices:
+            target = targets[i]
+            derivative = derivatives[i]
+            derivative += ((target - previous[i]) * rate - derivative) * derivative_alpha
+            derivatives[i] = derivative
+            previous[i] = target
+            alpha = 1.0 - math.exp((abs(derivative) * beta + min_cutoff) * step)
+            value = values[i]
+            value += (target - value) * alpha
+            values[i] = target if abs(target - value) < snap else value
+        self.flat[:] = values
+        self._derivative_flat[:] = derivatives
+        self._previous_flat[:] = previous
+        return values
+
+
+def make_filter(filter_config, shape, smoothing=0.0, rate=50):
+    """
+    Baut den Filter aus controller.filter. Ohne time_constant_ms übernimmt der
+    Tiefpass den alten smoothing-Faktor, umgerechnet für controller.update_rate.
+
+    {"type": "lowpass", "time_constant_ms": 20}
+    {"type": "one_euro", "min_cutoff_ms": 50, "beta": 10.0, "derivative_ms": 30}
+    """
+    filter_config = filter_config or {}
+    filter_type = filter_config.get('type', 'lowpass')
+
+    if filter_type == 'lowpass':
+        time_constant = filter_config.get('time_constant_ms')
+        if time_constant is None:
+            time_constant = time_constant_from_smoothing(smoothing, rate)
+        return LowPassFilter(shape, time_constant)
+    if filter_type == 'one_euro':
+        return OneEuroFilter(shape, filter_config.get('min_cutoff_ms', 50.0),
+                             filter_config.get('beta', 10.0),
+                             filter_config.get('derivative_ms', 30.0))
+    raise ValueError(f"Unbekannter Filter: {filter_type}")
+
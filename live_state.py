@@ -0,0 +1,313 @@
+"""
+Live-Zustand der Bridge im Shared Memory für andere Prozesse auf demselben Rechner.
+
+Show-Control-Skripte und Visualizer lesen die geglätteten und rohen Werte
+aller Bänke direkt aus einem multiprocessing.shared_memory-Block, statt den
+OSC-Verkehr mitzuschneiden. Die Bridge schreibt, wenn eine Bank gerechnet wurde
+(nicht bei jedem Leerlauf-Tick). Leser greifen per NumPy-View ohne Kopie zu.
+
+Layout (Little Endian, alle Blöcke 64 Byte):
+
+    Header     HEADER_DTYPE          Magic b"MA3L", Version, Anzahl Bänke, Ring-Größe,
+                                     PID der Bridge, head = geschriebene Samples gesamt
+    Bank-Info  INFO_DTYPE  x Bänke   Name, Page, Fader (ändert sich nur beim Config-Reload)
+    Bänke      BANK_DTYPE  x Bänke   letzter Stand pro Bank, seq ungerade = wird geschrieben
+    Ring       SAMPLE_DTYPE x ring   letzte Samples aller Bänke, Slot = Nummer % ring_size
+
+Sticks -1..1 (wie im UI), trigger_val 0..100, buttons als Bitmaske (Bit = Button-ID),
+time = time.monotonic() der Bridge (auf demselben Rechner prozessübergreifend vergleichbar).
+
+Lesen (anderer Prozess):
+
+    reader = LiveStateReader("ma3_bridge")
+    reader.banks['pan_val']          # View auf alle Bänke, ohne Kopie
+    reader.latest(0)                 # konsistente Kopie einer Bank (Seqlock)
+    samples, position = reader.since(position)   # neue Ring-Samples
+
+    python live_state.py [--name ma3_bridge] [--ring]
+"""
+import argparse
+import os
+import struct
+import time
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+
+MAGIC = b"MA3L"
+LAYOUT_VERSION = 1
+BLOCK_SIZE = 64
+FADER_COUNT = 5
+
+HEADER_DTYPE = np.dtype([
+    ('magic', 'S4'), ('version', '<u4'), ('bank_count', '<u4'), ('ring_size', '<u4'),
+    ('pid', '<u4'), ('block_size', '<u4'), ('head', '<u8'), ('updated', '<f8'),
+    ('_pad', 'V24'),
+])
+INFO_DTYPE = np.dtype([
+    ('name', 'S40'), ('page', '<u4'), ('faders', '<u4', (FADER_COUNT,)),
+])
+VALUE_FIELDS = ('pan_val', 'tilt_val', 'pan_fine_val', 'tilt_fine_val', 'trigger_val',
+                'pan_raw', 'tilt_raw', 'pan_fine_raw', 'tilt_fine_raw')
+BANK_DTYPE = np.dtype([
+    ('seq', '<u4'), ('generation', '<u4'), ('time', '<f8')]
+    + [(name, '<f4') for name in VALUE_FIELDS]
+    + [('buttons', '<u4'), ('connected', '<u4'), ('_pad', 'V4')])
+SAMPLE_DTYPE = np.dtype([
+    ('seq', '<u8'), ('time', '<f8'), ('bank', '<u4'), ('buttons', '<u4')]
+    + [(name, '<f4') for name in VALUE_FIELDS]
+    + [('_pad', 'V4')])
+
+# Schreibseite mit struct.pack_into (ein Aufruf pro Block statt ein NumPy-Zugriff pro Feld)
+U32 = struct.Struct('<I')
+U64 = struct.Struct('<Q')
+HEAD = struct.Struct('<Qd')                     # head, updated (Offset 24)
+BANK_DATA = struct.Struct('<Id9fII')            # ab generation (Offset 4)
+SAMPLE_DATA = struct.Struct('<dII9f')           # ab time (Offset 8)
+
+HEAD_OFFSET = HEADER_DTYPE.fields['head'][1]
+assert all(dtype.itemsize == BLOCK_SIZE for dtype in (HEADER_DTYPE, INFO_DTYPE, BANK_DTYPE, SAMPLE_DTYPE))
+assert BANK_DATA.size == BANK_DTYPE.fields['_pad'][1] - 4
+assert SAMPLE_DATA.size == SAMPLE_DTYPE.fields['_pad'][1] - 8
+
+
+def layout_size(bank_count, ring_size):
+    return BLOCK_SIZE * (1 + 2 * bank_count + ring_size)
+
+
+def _views(buf, bank_count, ring_size):
+    """NumPy-Views (ohne Kopie) auf Header, Bank-Infos, Bänke und Ring"""
+    header = np.ndarray((), HEADER_DTYPE, buf, 0)
+    offset = BLOCK_SIZE
+    info = np.ndarray((bank_count,), INFO_DTYPE, buf, offset)
+    offset += BLOCK_SIZE * bank_count
+    banks = np.ndarray((bank_count,), BANK_DTYPE, buf, offset)
+    offset += BLOCK_SIZE * bank_count
+    ring = np.ndarray((ring_size,), SAMPLE_DTYPE, buf, offset)
+    return header, info, banks, ring
+
+
+class LiveStatePublisher:
+    """Schreibseite (Bridge, Engine-Thread). Legt den Block an und entfernt ihn bei close()"""
+
+    def __init__(self, name, bank_count, ring_size=256):
+        if ring_size < 1:
+            raise ValueError("ring_size muss mindestens 1 sein")
+        size = layout_size(bank_count, ring_size)
+        try:
+            self.shm = shared_memory.SharedMemory(name, create=True, size=size)
+        except FileExistsError:
+            # Nur den Rest einer abgestürzten Bridge ersetzen (neu anlegen, damit das
+            # Layout sicher passt) - nie den Block einer laufenden Bridge
+            _remove_stale(name)
+            self.shm = shared_memory.SharedMemory(name, create=True, size=size)
+        self.name = name
+        self.bank_count = bank_count
+        self.ring_size = ring_size
+        self.buf = self.shm.buf
+        self.buf[:size] = bytes(size)
+        self.header, self.info, self.banks, self.ring = _views(self.buf, bank_count, ring_size)
+        self._bank_offset = BLOCK_SIZE * (1 + bank_count)
+        self._ring_offset = BLOCK_SIZE * (1 + 2 * bank_count)
+        self.head = 0
+        self.seqs = [0] * bank_count
+
+        header = self.header
+        header['version'] = LAYOUT_VERSION
+        header['bank_count'] = bank_count
+        header['ring_size'] = ring_size
+        header['pid'] = os.getpid()
+        header['block_size'] = BLOCK_SIZE
+        header['magic'] = MAGIC     # zuletzt: erst jetzt ist der Block gültig
+
+    def describe(self, banks):
+        """Name, Page und Fader jeder Bank (Start und Config-Reload)"""
+        for bank in banks:
+            info = self.info[bank.index]
+            info['name'] = bank.name.encode('utf-8')[:40]
+            info['page'] = bank.page
+            info['faders'] = [bank.faders[name] for name in ('pan', 'tilt', 'dimmer', 'fine_pan', 'fine_tilt')]
+
+    def publish(self, banks):
+        """Schreibt den aktuellen Stand der übergebenen Bänke und je ein Ring-Sample"""
+        buf = self.buf
+        now = time.monotonic()
+        pack_u32 = U32.pack_into
+        head = self.head
+        ring_size = self.ring_size
+        for bank in banks:
+            index = bank.index
+            values = (bank.pan_val, bank.tilt_val, bank.pan_fine_val, bank.tilt_fine_val, bank.trigger_val,
+                      bank.pan_raw, bank.tilt_raw, bank.pan_fine_raw, bank.tilt_fine_raw)
+            buttons = 0
+            for button, pressed in bank.button_states.items():
+                if pressed:
+                    buttons |= 1 << button
+
+            # Seqlock: ungerade während des Schreibens, Leser versuchen es dann erneut
+            offset = self._bank_offset + index * BLOCK_SIZE
+            seq = self.seqs[index] + 1
+            pack_u32(buf, offset, seq)
+            BANK_DATA.pack_into(buf, offset + 4, bank.generation, now, *values,
+                                buttons, bank.joystick is not None)
+            seq += 1
+            pack_u32(buf, offset, seq & 0xFFFFFFFF)
+            self.seqs[index] = seq
+
+            # Ring: Slot ungültig (0), dann die Daten, dann die neue Sample-Nummer
+            offset = self._ring_offset + (head % ring_size) * BLOCK_SIZE
+            U64.pack_into(buf, offset, 0)
+            SAMPLE_DATA.pack_into(buf, offset + 8, now, index, buttons, *values)
+            head += 1
+            U64.pack_into(buf, offset, head)
+        self.head = head
+        HEAD.pack_into(buf, HEAD_OFFSET, head, now)
+
+    def close(self):
+        self.header['magic'] = b""
+        del self.header, self.info, self.banks, self.ring
+        self.buf = None
+        self.shm.close()
+        try:
+            self.shm.unlink()
+        except FileNotFoundError:
+            pass
+
+
+class LiveStateReader:
+    """Leseseite (anderer Prozess). Der Block gehört der Bridge und wird hier nie entfernt"""
+
+    def __init__(self, name="ma3_bridge"):
+        self.shm = _attach(name)
+        header = np.ndarray((), HEADER_DTYPE, self.shm.buf, 0)
+        if bytes(header['magic']) != MAGIC or header['version'] != LAYOUT_VERSION:
+            self.shm.close()
+            raise ValueError(f"{name}: kein MA3-Live-Zustand (Layout-Version {LAYOUT_VERSION})")
+        self.bank_count = int(header['bank_count'])
+        self.ring_size = int(header['ring_size'])
+        self.header, self.info, self.banks, self.ring = _views(self.shm.buf, self.bank_count, self.ring_size)
+
+    @property
+    def head(self):
+        """Anzahl aller bisher geschriebenen Samples (steigt bei jeder Änderung)"""
+        return int(self.header['head'])
+
+    def bank_names(self):
+        return [bytes(name).rstrip(b"\0").decode('utf-8', 'replace') for name in self.info['name']]
+
+    def latest(self, index, retries=100):
+        """Konsistente Kopie einer Bank (np.void mit den Feldern aus BANK_DTYPE)"""
+        bank = self.banks[index:index + 1]
+        for _ in range(retries):
+            seq = int(bank['seq'][0])
+            if seq & 1:
+                continue
+            value = bank[0].copy()
+            if int(bank['seq'][0]) == seq:
+                return value
+        raise TimeoutError("Bank wird gerade ununterbrochen geschrieben")
+
+    def since(self, position):
+        """
+        Ring-Samples nach position (ein früherer head). Gibt (Samples, neue Position)
+        zurück. Wer zu lange nicht liest, verliert die ältesten Samples.
+        """
+        head = self.head
+        start = max(position, head - self.ring_size)
+        if start >= head:
+            return np.empty(0, SAMPLE_DTYPE), head
+        numbers = np.arange(start + 1, head + 1, dtype=np.uint64)
+        slots = (numbers - 1) % self.ring_size
+        samples = self.ring[slots]      # Kopie (fancy indexing)
+        # Gültig nur, wenn die Nummer vor und nach dem Kopieren passt: ein Schreiber
+        # setzt sie vor den Daten auf 0 und danach auf eine neue Nummer
+        valid = (samples['seq'] == numbers) & (self.ring['seq'][slots] == numbers)
+        return samples[valid], head
+
+    def close(self):
+        del self.header, self.info, self.banks, self.ring
+        self.shm.close()
+
+
+def _process_alive(pid):
+    if os.name == 'nt':
+        # Windows entfernt den Block mit dem letzten Handle - wer ihn findet, hat einen lebenden Besitzer
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True     # läuft, gehört aber einem anderen Benutzer
+    return True
+
+
+def _remove_stale(name):
+    """Entfernt einen vorhandenen Block, wenn die Bridge, die ihn angelegt hat, nicht mehr läuft"""
+    stale = shared_memory.SharedMemory(name)    # registriert ihn beim resource_tracker, unlink() meldet ab
+    try:
+        header = np.ndarray((), HEADER_DTYPE, stale.buf, 0) if stale.size >= BLOCK_SIZE else None
+        owner = int(header['pid']) if header is not None and bytes(header['magic']) == MAGIC else None
+        del header
+        if owner is not None and owner != os.getpid() and not _process_alive(owner):
+            stale.unlink()
+            return
+        # Bleibt bestehen - abmelden, sonst entfernt ihn der resource_tracker beim Beenden
+        if os.name != 'nt' and owner != os.getpid():
+            resource_tracker.unregister(stale._name, 'shared_memory')
+        if owner is None:
+            raise FileExistsError(f"{name}: Shared-Memory-Block gehört keiner MA3-Bridge - "
+                                  "anderen shared_state.name wählen")
+        raise FileExistsError(f"{name}: wird schon von einer laufenden Bridge benutzt (PID {owner}) - "
+                              "anderen shared_state.name wählen")
+    finally:
+        stale.close()
+
+
+def _attach(name):
+    """Öffnet einen bestehenden Block, ohne dass ihn der resource_tracker beim Beenden löscht"""
+    try:
+        return shared_memory.SharedMemory(name, track=False)     # ab Python 3.13
+    except TypeError:
+        pass
+    shm = shared_memory.SharedMemory(name)
+    # Bis 3.12 registriert auch das Öffnen den Block - außer im Prozess der Bridge selbst abmelden
+    if np.ndarray((), HEADER_DTYPE, shm.buf, 0)['pid'] != os.getpid():
+        resource_tracker.unregister(shm._name, 'shared_memory')
+    return shm
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Live-Werte der MA3 Controller Bridge aus dem Shared Memory anzeigen")
+    parser.add_argument('--name', default="ma3_bridge", help="shared_state.name der Bridge")
+    parser.add_argument('--ring', action='store_true', help="jedes Sample aus dem Ring statt 10x pro Sekunde den letzten Stand")
+    args = parser.parse_args()
+
+    reader = LiveStateReader(args.name)
+    names = reader.bank_names()
+    print(f"✓ {args.name}: {reader.bank_count} Bänke ({', '.join(names)}), Ring {reader.ring_size}, Bridge-PID {int(reader.header['pid'])}")
+    position = reader.head
+    try:
+        while True:
+            if args.ring:
+                samples, position = reader.since(position)
+                for sample in samples:
+                    print(f"{sample['time']:.4f} {names[sample['bank']]}: pan {sample['pan_val']:+.3f} "
+                          f"tilt {sample['tilt_val']:+.3f} dimmer {sample['trigger_val']:5.1f} buttons {sample['buttons']:#x}")
+                time.sleep(0.01)
+            else:
+                lines = []
+                for index in range(reader.bank_count):
+                    bank = reader.latest(index)
+                    lines.append(f"{names[index]}: pan {bank['pan_val']:+.3f} tilt {bank['tilt_val']:+.3f} "
+                                 f"dimmer {bank['trigger_val']:5.1f} {'●' if bank['connected'] else '○'}")
+                print(" | ".join(lines), end="\r", flush=True)
+                time.sleep(0.1)
+    except KeyboardInterrupt:
+        print()
+    finally:
+        reader.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,582 @@
+"""
+Lokaler MA3-Ersatz für Last- und Latenz-Tests der Bridge.
+
+Empfängt OSC wie grandMA3 (/PageX/FaderY 0-100, /PageX/KeyY), hält die
+Executor-Werte und führt alle 50 ms dieselbe Logik wie updateLoop() aus
+XboxControl.lua aus (relativer/absoluter Modus, Fine Control, Dimmer).
+Jede Plugin-Kopie liest ihren eigenen Fader-Block - so laufen mehrere
+Bridges bzw. Bänke gleichzeitig.
+
+Gemessen wird:
+- pro Absender (Bridge): Pakete/s, Nachrichten/s, Bytes/s, Abstand der Pakete (p50/p99/max)
+- verworfene Pakete: Überlauf des Empfangspuffers im Kernel (Linux, SO_RXQ_OVFL)
+- zusammengefasste Updates: Fader-Werte, die überschrieben wurden, bevor
+  updateLoop() sie gelesen hat (MA3 sieht nur jeden 50 ms den letzten Stand)
+- Alter eines Werts beim Lesen (Empfang -> updateLoop) und die resultierende
+  Pan/Tilt/Dimmer-Bahn pro Plugin-Kopie
+
+Befehle an den Befehlseingang (--command-address, Standard /cmd), wie sie
+der Befehlsmodus der Bridge sendet, werden sofort auf ein simuliertes
+Fixture pro "Fixture N" (bzw. die Selektion) angewendet.
+
+Ohne Argumente werden die Fader-Blöcke aus config.json übernommen (eine
+Plugin-Kopie pro Eintrag in "controllers", sonst die Fader aus "osc").
+
+    python ma3_standin.py [--port 8000] [--mode relative] [--duration 60]
+                          [--trajectory bahn.csv] [--json stats.json] [--packet-log pakete.csv]
+"""
+import argparse
+import csv
+import json
+import re
+import selectors
+import socket
+import struct
+import sys
+import time
+from pathlib import Path
+
+from metrics import LatencyHistogram
+
+UPDATE_INTERVAL = 0.05      # coroutine.yield(CONFIG.update_interval) im Plugin
+RECEIVE_BUFFER = 4 * 1024 * 1024
+
+# Linux-Socket-Optionen (in Python nicht immer als Konstante vorhanden)
+SO_RXQ_OVFL = getattr(socket, 'SO_RXQ_OVFL', 40)
+SO_TIMESTAMPNS = getattr(socket, 'SO_TIMESTAMPNS', 35)
+ANCILLARY_SIZE = socket.CMSG_SPACE(4) + socket.CMSG_SPACE(16) if hasattr(socket, 'CMSG_SPACE') else 0
+
+ADDRESS = re.compile(r'^/Page(\d+)/(Fader|Key)(\d+)$')
+COMMAND = re.compile(r"^(?:Fixture (\d+) )?Attribute '(\w+)' At ([+-] )?(-?\d+(?:\.\d*)?)$")
+OSC_INT = struct.Struct('>i')
+OSC_FLOAT = struct.Struct('>f')
+TIMESPEC = struct.Struct('@qq')
+
+FADER_NAMES = ('pan', 'tilt', 'dimmer', 'fine_pan', 'fine_tilt')
+
+# Typischer Moving Head: MA3 begrenzt Pan/Tilt auf den Bereich des Fixtures
+PAN_RANGE = (-270.0, 270.0)
+TILT_RANGE = (-135.0, 135.0)
+
+
+def decode_osc_string(data, offset):
+    end = data.index(b'\x00', offset)
+    value = bytes(data[offset:end]).decode('ascii', 'replace')
+    return value, (end + 4) & ~3
+
+
+def decode_osc_packet(data, messages):
+    """Hängt alle (Adresse, Argumente) eines Pakets an messages an (Bundles rekursiv)"""
+    if data[:8] == b'#bundle\x00':
+        offset = 16     # Header + Timetag
+        while offset + 4 <= len(data):
+            size = OSC_INT.unpack_from(data, offset)[0]
+            offset += 4
+            decode_osc_packet(data[offset:offset + size], messages)
+            offset += size
+        return
+
+    address, offset = decode_osc_string(data, 0)
+    typetags, offset = decode_osc_string(data, offset)
+    args = []
+    for tag in typetags[1:]:
+        if tag == 'f':
+            args.append(OSC_FLOAT.unpack_from(data, offset)[0])
+            offset += 4
+        elif tag == 'i':
+            args.append(OSC_INT.unpack_from(data, offset)[0])
+            offset += 4
+        elif tag == 's':
+            value, offset = decode_osc_string(data, offset)
+            args.append(value)
+        else:
+            break   # MA3 nutzt hier nur f/i/s
+    messages.append((address, args))
+
+
+class Executors:
+    """Fader-/Key-Werte wie im Pult, plus Buchhaltung, was updateLoop() davon sieht"""
+
+    def __init__(self):
+        self.values = {}        # (page, fader) -> 0..100
+        self.keys = {}          # (page, key) -> 0/1
+        self.written = {}       # (page, fader) -> Empfangszeit des noch ungelesenen Werts
+        self.coalesced = {}     # (page, fader) -> überschriebene, nie gelesene Werte
+        self.value_age = LatencyHistogram()
+
+    def write(self, page, fader, value, now):
+        key = (page, fader)
+        if key in self.written:
+            self.coalesced[key] = self.coalesced.get(key, 0) + 1
+        self.values[key] = value
+        self.written[key] = now
+
+    def read(self, page, fader, now):
+        """Wie getFaderValue(): Wert in 0..100 oder None, wenn der Executor nie beschrieben wurde"""
+        key = (page, fader)
+        written = self.written.pop(key, None)
+        if written is not None:
+            self.value_age.record(now - written)
+        return self.values.get(key)
+
+
+class XboxControlPlugin:
+    """updateLoop() aus XboxControl.lua, eine Instanz pro Fader-Block"""
+
+    def __init__(self, name, page, faders, mode='relative', speed_multiplier=2.0,
+                 fine_multiplier=0.3, deadzone=5.0):
+        self.name = name
+        self.page = page
+        self.faders = faders
+        self.mode = mode
+        self.speed_multiplier = speed_multiplier
+        self.fine_multiplier = fine_multiplier
+        self.deadzone = deadzone
+
+        self.velocity = {'pan': 0.0, 'tilt': 0.0, 'pan_fine': 0.0, 'tilt_fine': 0.0}
+        self.pan = 0.0
+        self.tilt = 0.0
+        self.dimmer = 0.0
+        self.update_count = 0
+        self.command_count = 0
+        self.skipped_count = 0
+        self.now = 0.0
+        self.move_log = None    # Liste -> jede Bewegung als (Zeit, Attribut, Wert), für Latenz-Messungen
+
+    def apply_deadzone(self, value):
+        return 50.0 if abs(value - 50.0) < self.deadzone else value
+
+    @staticmethod
+    def smooth_velocity(current, target, factor=0.2):
+        return current + (target - current) * (1.0 - factor)
+
+    def move(self, attribute, amount, relative):
+        """Cmd("Attribute 'Pan' At +x") bzw. "At x" auf das simulierte Fixture"""
+        self.command_count += 1
+        low, high = PAN_RANGE if attribute == 'pan' else TILT_RANGE
+        value = getattr(self, attribute) + amount if relative else amount
+        value = min(high, max(low, value))
+        setattr(self, attribute, value)
+        if self.move_log is not None:
+            self.move_log.append((self.now, attribute, value))
+
+    def update(self, executors, now):
+        self.update_count += 1
+        self.now = now
+        read = executors.read
+        pan_raw = read(self.page, self.faders['pan'], now)
+        tilt_raw = read(self.page, self.faders['tilt'], now)
+        dimmer_raw = read(self.page, self.faders['dimmer'], now)
+        if pan_raw is None or tilt_raw is None:
+            self.skipped_count += 1
+            return
+
+        pan_val = self.apply_deadzone(pan_raw)
+        tilt_val = self.apply_deadzone(tilt_raw)
+        velocity = self.velocity
+
+        if self.mode == 'relative':
+            pan_target = (pan_val - 50) / 50 * self.speed_multiplier
+            tilt_target = (tilt_val - 50) / 50 * self.speed_multiplier
+            velocity['pan'] = self.smooth_velocity(velocity['pan'], pan_target)
+            velocity['tilt'] = self.smooth_velocity(velocity['tilt'], tilt_target)
+            if abs(velocity['pan']) > 0.01:
+                self.move('pan', velocity['pan'], True)
+            if abs(velocity['tilt']) > 0.01:
+                self.move('tilt', velocity['tilt'], True)
+        else:
+            self.move('pan', (pan_val - 50) * 2, False)
+            self.move('tilt', (tilt_val - 50) * 2, False)
+
+        # Fine Control (rechter Stick), nur wenn beide Fader Werte haben
+        pan_fine_raw = read(self.page, self.faders['fine_pan'], now)
+        tilt_fine_raw = read(self.page, self.faders['fine_tilt'], now)
+        if pan_fine_raw is not None and tilt_fine_raw is not None:
+            fine = self.speed_multiplier * self.fine_multiplier
+            pan_fine_target = (self.apply_deadzone(pan_fine_raw) - 50) / 50 * fine
+            tilt_fine_target = (self.apply_deadzone(tilt_fine_raw) - 50) / 50 * fine
+            velocity['pan_fine'] = self.smooth_velocity(velocity['pan_fine'], pan_fine_target)
+            velocity['tilt_fine'] = self.smooth_velocity(velocity['tilt_fine'], tilt_fine_target)
+            if abs(velocity['pan_fine']) > 0.005:
+                self.move('pan', velocity['pan_fine'], True)
+            if abs(velocity['tilt_fine']) > 0.005:
+                self.move('tilt', velocity['tilt_fine'], True)
+
+        if dimmer_raw is not None and dimmer_raw > 5:
+            self.command_count += 1
+            self.dimmer = dimmer_raw
+
+    def coalesced(self, executors):
+        return sum(executors.coalesced.get((self.page, fader), 0) for fader in self.faders.values())
+
+
+class CommandFixture:
+    """Fixture (bzw. Selektion), das Attribute-Befehle direkt ausführt"""
+
+    def __init__(self, name):
+        self.name = name
+        self.pan = 0.0
+        self.tilt = 0.0
+        self.dimmer = 0.0
+        self.command_count = 0
+        self.move_log = None
+
+    def execute(self, attribute, value, relative, now):
+        self.command_count += 1
+        if attribute == 'dimmer':
+            self.dimmer = value
+            return
+        low, high = PAN_RANGE if attribute == 'pan' else TILT_RANGE
+        if relative:
+            value += getattr(self, attribute)
+        value = min(high, max(low, value))
+        setattr(self, attribute, value)
+        if self.move_log is not None:
+            self.move_log.append((now, attribute, value))
+
+
+class CommandInput:
+    """Befehlseingang der Konsole für die Befehle aus dem Befehlsmodus der Bridge"""
+
+    def __init__(self, address='/cmd'):
+        self.address = address
+        self.fixtures = {}      # Fixture-ID (None = Selektion) -> CommandFixture
+        self.received = 0
+        self.unknown = 0
+        self.move_log = None
+
+    def execute(self, text, now):
+        self.received += 1
+        match = COMMAND.match(text)
+        if match is None:
+            self.unknown += 1
+            return
+        fixture_id = int(match.group(1)) if match.group(1) else None
+        fixture = self.fixtures.get(fixture_id)
+        if fixture is None:
+            fixture = self.fixtures[fixture_id] = CommandFixture(
+                f"Fixture {fixture_id}" if fixture_id is not None else "Selektion")
+            fixture.move_log = self.move_log
+        sign = match.group(3)
+        value = float(match.group(4))
+        if sign == '- ':
+            value = -value
+        fixture.execute(match.group(2).lower(), value, sign is not None, now)
+
+
+class SourceStats:
+    """Empfangsstatistik pro Absender (eine Bridge = ein Socket = eine Adresse)"""
+
+    def __init__(self, address):
+        self.address = address
+        self.packets = 0
+        self.bundles = 0
+        self.messages = 0
+        self.bytes = 0
+        self.unknown = 0
+        self.first = None
+        self.last = None
+        self.interval = LatencyHistogram()
+
+    def packet(self, now, size):
+        if self.last is not None:
+            self.interval.record(now - self.last)
+        else:
+            self.first = now
+        self.last = now
+        self.packets += 1
+        self.bytes += size
+
+    def rates(self):
+        elapsed = (self.last - self.first) if self.packets > 1 else 0.0
+        if elapsed <= 0:
+            return 0.0, 0.0, 0.0
+        return self.packets / elapsed, self.messages / elapsed, self.bytes / elapsed
+
+    def summary(self):
+        packets_per_sec, messages_per_sec, bytes_per_sec = self.rates()
+        interval = self.interval.summary()
+        return {
+            'source': f"{self.address[0]}:{self.address[1]}",
+            'packets': self.packets,
+            'bundles': self.bundles,
+            'messages': self.messages,
+            'bytes': self.bytes,
+            'unknown_addresses': self.unknown,
+            'packets_per_sec': packets_per_sec,
+            'messages_per_sec': messages_per_sec,
+            'bytes_per_sec': bytes_per_sec,
+            'interval_p50_ms': interval['p50_ms'],
+            'interval_p99_ms': interval['p99_ms'],
+            'interval_max_ms': interval['max_ms'],
+        }
+
+
+def plugin_configs_from_bridge_config(path):
+    """Fader-Blöcke wie compile_banks() in config_snapshot (ohne NumPy-Pipeline)"""
+    osc = {'target_page': 1, 'fader_pan': 201, 'fader_tilt': 202, 'fader_dimmer': 203,
+           'fader_fine_pan': 204, 'fader_fine_tilt': 205}
+    controllers = []
+    if path.exists():
+        with open(path) as f:
+            config = json.load(f)
+        osc.update(config.get('osc', {}))
+        controllers = config.get('controllers') or []
+    result = []
+    for index, bank in enumerate(controllers or [{}]):
+        faders = {name: bank.get('fader_' + name, osc['fader_' + name]) for name in FADER_NAMES}
+        result.append((bank.get('name', f"Bank {index + 1}"), bank.get('target_page', osc['target_page']), faders))
+    return result
+
+
+def parse_plugin_spec(spec):
+    """'PAGE:PAN,TILT,DIMMER,FINE_PAN,FINE_TILT' -> (name, page, faders)"""
+    page, faders = spec.split(':')
+    numbers = [int(value) for value in faders.split(',')]
+    if len(numbers) != len(FADER_NAMES):
+        raise argparse.ArgumentTypeError(f"{spec}: erwartet PAGE:PAN,TILT,DIMMER,FINE_PAN,FINE_TILT")
+    return spec, int(page), dict(zip(FADER_NAMES, numbers))
+
+
+class StandIn:
+    """Empfang auf einem oder mehreren Ports + 50-ms-Loop aller Plugin-Kopien"""
+
+    def __init__(self, ports, plugins, host='127.0.0.1', packet_log=None, command_address='/cmd'):
+        self.executors = Executors()
+        self.plugins = plugins
+        self.commands = CommandInput(command_address)
+        self.sources = {}
+        self.kernel_drops = {}      # Port -> zuletzt gemeldeter Überlauf-Zähler
+        self.decode_errors = 0
+        self.trajectory = []
+        self.packet_log = packet_log
+        self.start = time.time()
+        self.selector = selectors.DefaultSelector()
+        self.sockets = []
+        self.ancillary = sys.platform.startswith('linux')   # Kernel-Zeitstempel + Überlauf-Zähler
+        for port in ports:
+            sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, RECEIVE_BUFFER)
+            if self.ancillary:
+                sock.setsockopt(socket.SOL_SOCKET, SO_RXQ_OVFL, 1)
+                sock.setsockopt(socket.SOL_SOCKET, SO_TIMESTAMPNS, 1)
+            sock.bind((host, port))
+            sock.setblocking(False)
+            self.selector.register(sock, selectors.EVENT_READ)
+            self.sockets.append(sock)
+            self.kernel_drops[port] = 0
+
+    def receive(self, sock):
+        """Liest alle wartenden Pakete eines Sockets"""
+        port = sock.getsockname()[1]
+        while True:
+            try:
+                if self.ancillary:
+                    data, ancdata, _, address = sock.recvmsg(65535, ANCILLARY_SIZE)
+                else:
+                    data, address = sock.recvfrom(65535)
+                    ancdata = ()
+            except BlockingIOError:
+                return
+            now = time.time()
+            for level, kind, payload in ancdata:
+                if level != socket.SOL_SOCKET:
+                    continue
+                if kind == SO_TIMESTAMPNS and len(payload) >= TIMESPEC.size:
+                    seconds, nanos = TIMESPEC.unpack_from(payload)
+                    now = seconds + nanos / 1e9     # Empfang im Kernel, nicht erst hier
+                elif kind == SO_RXQ_OVFL and len(payload) >= 4:
+                    self.kernel_drops[port] = struct.unpack('@I', payload[:4])[0]
+            self.handle_packet(data, address, now)
+
+    def handle_packet(self, data, address, now):
+        source = self.sources.get(address)
+        if source is None:
+            source = self.sources[address] = SourceStats(address)
+            print(f"+ Neue Bridge: {address[0]}:{address[1]}")
+        source.packet(now, len(data))
+        if data[:8] == b'#bundle\x00':
+            source.bundles += 1
+
+        messages = []
+        try:
+            decode_osc_packet(data, messages)
+        except (ValueError, struct.error):
+            self.decode_errors += 1
+            return
+        source.messages += len(messages)
+        if self.packet_log is not None:
+            self.packet_log.writerow((f"{now - self.start:.6f}", f"{address[0]}:{address[1]}", len(data), len(messages)))
+
+        for address_string, args in messages:
+            if address_string == self.commands.address:
+                if args and isinstance(args[0], str):
+                    self.commands.execute(args[0], now)
+                else:
+                    source.unknown += 1
+                continue
+            match = ADDRESS.match(address_string)
+            if match is None or not args:
+                source.unknown += 1
+                continue
+            page, kind, number = int(match.group(1)), match.group(2), int(match.group(3))
+            if kind == 'Fader':
+                self.executors.write(page, number, float(args[0]), now)
+            else:
+                self.executors.keys[(page, number)] = int(args[0])
+
+    def update(self, now):
+        for plugin in self.plugins:
+            plugin.update(self.executors, now)
+            self.trajectory.append((now - self.start, plugin.name, plugin.pan, plugin.tilt, plugin.dimmer,
+                                    plugin.velocity['pan'], plugin.velocity['tilt']))
+        for fixture in self.commands.fixtures.values():
+            self.trajectory.append((now - self.start, fixture.name, fixture.pan, fixture.tilt, fixture.dimmer, 0.0, 0.0))
+
+    def run(self, duration=None, status_interval=5.0):
+        next_update = time.monotonic()
+        next_status = next_update + status_interval
+        end = next_update + duration if duration else None
+        try:
+            while end is None or time.monotonic() < end:
+                timeout = max(0.0, next_update - time.monotonic())
+                for key, _ in self.selector.select(timeout):
+                    self.receive(key.fileobj)
+                now = time.monotonic()
+                if now >= next_update:
+                    self.update(time.time())
+                    # Wie coroutine.yield(0.05): feste Periode, verpasste Loops nicht nachholen
+                    next_update += UPDATE_INTERVAL
+                    if next_update < now:
+                        next_update = now + UPDATE_INTERVAL
+                if status_interval and now >= next_status:
+                    self.print_status()
+                    next_status = now + status_interval
+        except KeyboardInterrupt:
+            pass
+
+    def summary(self):
+        age = self.executors.value_age.summary()
+        return {
+            'duration_s': time.time() - self.start,
+            'kernel_drops': sum(self.kernel_drops.values()),
+            'decode_errors': self.decode_errors,
+            'value_age_p50_ms': age['p50_ms'],
+            'value_age_p99_ms': age['p99_ms'],
+            'value_age_max_ms': age['max_ms'],
+            'sources': [source.summary() for source in self.sources.values()],
+            'plugins': [{
+                'name': plugin.name,
+                'page': plugin.page,
+                'faders': plugin.faders,
+                'mode': plugin.mode,
+                'updates': plugin.update_count,
+                'skipped_updates': plugin.skipped_count,
+                'commands': plugin.command_count,
+                'coalesced': plugin.coalesced(self.executors),
+                'pan': plugin.pan,
+                'tilt': plugin.tilt,
+                'dimmer': plugin.dimmer,
+            } for plugin in self.plugins],
+            'commands': {
+                'address': self.commands.address,
+                'received': self.commands.received,
+                'unknown': self.commands.unknown,
+                'fixtures': [{
+                    'name': fixture.name,
+                    'commands': fixture.command_count,
+                    'pan': fixture.pan,
+                    'tilt': fixture.tilt,
+                    'dimmer': fixture.dimmer,
+                } for fixture in self.commands.fixtures.values()],
+            },
+        }
+
+    def print_status(self):
+        data = self.summary()
+        for source in data['sources']:
+            print(f"  {source['source']:<21} {source['packets_per_sec']:7.1f} Pakete/s {source['messages_per_sec']:7.1f} Msg/s "
+                  f"{source['bytes_per_sec']:8.0f} B/s | Abstand p50 {source['interval_p50_ms']:.2f} "
+                  f"p99 {source['interval_p99_ms']:.2f} max {source['interval_max_ms']:.2f} ms")
+        for plugin in data['plugins']:
+            print(f"  {plugin['name']:<21} Pan {plugin['pan']:8.2f} Tilt {plugin['tilt']:8.2f} Dim {plugin['dimmer']:5.1f} | "
+                  f"Cmds {plugin['commands']} zusammengefasst {plugin['coalesced']}")
+        for fixture in data['commands']['fixtures']:
+            print(f"  {fixture['name']:<21} Pan {fixture['pan']:8.2f} Tilt {fixture['tilt']:8.2f} Dim {fixture['dimmer']:5.1f} | "
+                  f"Befehle {fixture['commands']}")
+        if data['commands']['unknown']:
+            print(f"  Unbekannte Befehle: {data['commands']['unknown']}")
+        print(f"  Kernel-Drops: {data['kernel_drops']} | Wertalter p50 {data['value_age_p50_ms']:.1f} "
+              f"p99 {data['value_age_p99_ms']:.1f} ms")
+
+    def write_trajectory(self, path):
+        with open(path, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(('t', 'plugin', 'pan', 'tilt', 'dimmer', 'velocity_pan', 'velocity_tilt'))
+            for row in self.trajectory:
+                writer.writerow((f"{row[0]:.4f}", row[1]) + tuple(f"{value:.4f}" for value in row[2:]))
+
+    def close(self):
+        for sock in self.sockets:
+            self.selector.unregister(sock)
+            sock.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, nargs='+', default=None,
+                        help="Empfangs-Ports (Standard: osc.port aus config.json)")
+    parser.add_argument('--plugin', type=parse_plugin_spec, action='append', metavar='PAGE:PAN,TILT,DIM,FPAN,FTILT',
+                        help="Fader-Block einer Plugin-Kopie (mehrfach möglich, Standard: aus config.json)")
+    parser.add_argument('--config', default=str(Path(__file__).parent / "config.json"))
+    parser.add_argument('--mode', choices=('relative', 'absolute'), default='relative')
+    parser.add_argument('--speed', type=float, default=2.0, help="speed_multiplier des Plugins")
+    parser.add_argument('--duration', type=float, default=None, help="Nach N Sekunden beenden")
+    parser.add_argument('--status-interval', type=float, default=5.0)
+    parser.add_argument('--trajectory', help="Pan/Tilt/Dimmer-Bahn pro Plugin-Loop als CSV")
+    parser.add_argument('--json', help="Zusammenfassung als JSON")
+    parser.add_argument('--packet-log', help="Jedes Paket mit Empfangszeit als CSV")
+    parser.add_argument('--command-address', default='/cmd', help="OSC-Adresse des Befehlseingangs")
+    args = parser.parse_args()
+
+    config_path = Path(args.config)
+    ports = args.port
+    if ports is None:
+        port = 8000
+        if config_path.exists():
+            with open(config_path) as f:
+                port = json.load(f).get('osc', {}).get('port', port)
+        ports = [port]
+    plugin_configs = args.plugin or plugin_configs_from_bridge_config(config_path)
+    plugins = [XboxControlPlugin(name, page, faders, args.mode, args.speed) for name, page, faders in plugin_configs]
+
+    packet_file = open(args.packet_log, 'w', newline='') if args.packet_log else None
+    packet_log = None
+    if packet_file is not None:
+        packet_log = csv.writer(packet_file)
+        packet_log.writerow(('t', 'source', 'bytes', 'messages'))
+
+    standin = StandIn(ports, plugins, args.host, packet_log, args.command_address)
+    print(f"MA3-Ersatz lauscht auf {args.host}:{', '.join(map(str, ports))} | Modus: {args.mode} | "
+          f"updateLoop alle {UPDATE_INTERVAL * 1000:.0f} ms")
+    for plugin in plugins:
+        print(f"  {plugin.name}: Page {plugin.page}, Fader {plugin.faders['pan']}-{plugin.faders['fine_tilt']}")
+
+    try:
+        standin.run(args.duration, args.status_interval)
+    finally:
+        standin.close()
+        if packet_file is not None:
+            packet_file.close()
+        print("\nZusammenfassung:")
+        standin.print_status()
+        if args.trajectory:
+            standin.write_trajectory(args.trajectory)
+        if args.json:
+            with open(args.json, 'w') as f:
+                json.dump(standin.summary(), f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
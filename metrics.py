@@ -0,0 +1,229 @@
+"""
+Latenz- und Jitter-Messung für die MA3 Controller Bridge.
+
+- LatencyHistogram: HDR-artiges Histogramm in µs (log-linear, ~1.6 % Auflösung,
+  feste Größe) - Aufzeichnen kostet nur eine Indexrechnung, p50/p99/max
+  werden erst beim Auslesen berechnet
+- Metrics: Histogramme pro Stufe (Input, Pipeline, Senden, Tick, UI ...) und Zähler
+- MetricsExporter: schreibt periodisch eine JSON-Datei und beantwortet
+  GET /metrics im Prometheus-Textformat (nur lokal)
+
+Die Hooks in xbox_to_ma3 stehen alle hinter `if __debug__ and metrics:`.
+Mit metrics.enabled = false kostet das einen Vergleich pro Stufe, mit
+`python -O` entfernt der Compiler die Hooks komplett aus dem Bytecode.
+"""
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+SUB_BUCKET_BITS = 7                         # 128 exakte µs-Werte, danach 64 Stufen pro Zweierpotenz
+SUB_BUCKETS = 1 << SUB_BUCKET_BITS
+HALF_BUCKETS = SUB_BUCKETS // 2
+MAX_SHIFT = 26                              # bis ca. 2^33 µs, größere Werte landen im letzten Bucket
+BUCKET_COUNT = SUB_BUCKETS + MAX_SHIFT * HALF_BUCKETS
+
+QUANTILES = (0.5, 0.9, 0.99)
+
+
+def bucket_index(micros):
+    """Bucket für einen Wert in µs"""
+    if micros < SUB_BUCKETS:
+        return micros if micros > 0 else 0
+    shift = micros.bit_length() - SUB_BUCKET_BITS
+    if shift > MAX_SHIFT:
+        return BUCKET_COUNT - 1
+    return SUB_BUCKETS + (shift - 1) * HALF_BUCKETS + (micros >> shift) - HALF_BUCKETS
+
+
+def bucket_value(index):
+    """Repräsentativer Wert (Mitte) eines Buckets in µs"""
+    if index < SUB_BUCKETS:
+        return float(index)
+    shift = (index - SUB_BUCKETS) // HALF_BUCKETS + 1
+    top = (index - SUB_BUCKETS) % HALF_BUCKETS + HALF_BUCKETS
+    return (top << shift) + (1 << shift) / 2
+
+
+class LatencyHistogram:
+    """Zeitverteilung einer Stufe, Werte in Sekunden rein, Auswertung in ms"""
+
+    def __init__(self):
+        self.counts = [0] * BUCKET_COUNT
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds):
+        micros = int(seconds * 1e6)
+        self.counts[bucket_index(micros)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def reset(self):
+        self.counts = [0] * BUCKET_COUNT
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def percentiles(self, quantiles=QUANTILES):
+        """Gibt {quantil: ms} zurück (aus einer Kopie, der Engine-Thread schreibt weiter)"""
+        counts = list(self.counts)
+        total = sum(counts)
+        result = {}
+        if not total:
+            return {q: 0.0 for q in quantiles}
+        targets = sorted(quantiles)
+        seen = 0
+        position = 0
+        for index, count in enumerate(counts):
+            if not count:
+                continue
+            seen += count
+            while position < len(targets) and seen >= targets[position] * total:
+                result[targets[position]] = bucket_value(index) / 1000.0
+                position += 1
+            if position == len(targets):
+                break
+        return result
+
+    def summary(self):
+        """p50/p90/p99/max in ms, Anzahl und Summe in s"""
+        p = self.percentiles()
+        return {
+            'count': self.count,
+            'sum_s': self.total,
+            'p50_ms': p[0.5],
+            'p90_ms': p[0.9],
+            'p99_ms': p[0.99],
+            'max_ms': self.max * 1000.0,
+        }
+
+
+class Metrics:
+    """Histogramme pro Stufe und Zähler; Stufen entstehen beim ersten record()"""
+
+    def __init__(self):
+        self.histograms = {}
+        self.counters = {}
+        self.start_time = time.time()
+        self.gauges = None      # Funktion -> dict, liefert Zähler der übrigen Komponenten
+
+    def record(self, stage, seconds):
+        histogram = self.histograms.get(stage)
+        if histogram is None:
+            histogram = self.histograms[stage] = LatencyHistogram()
+        histogram.record(seconds)
+
+    def count(self, name, amount=1):
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def reset(self):
+        for histogram in list(self.histograms.values()):
+            histogram.reset()
+
+    def summary(self):
+        """Alle Stufen, Zähler und externen Werte als JSON-taugliches dict"""
+        data = {
+            'timestamp': time.time(),
+            'uptime_s': time.time() - self.start_time,
+            'stages': {stage: histogram.summary() for stage, histogram in list(self.histograms.items())},
+            'counters': dict(self.counters),
+        }
+        if self.gauges is not None:
+            data['counters'].update(self.gauges())
+        return data
+
+    def overlay_lines(self, stages):
+        """Kurze Textzeilen für das On-Screen-Overlay"""
+        lines = []
+        for stage in stages:
+            histogram = self.histograms.get(stage)
+            if histogram is None or not histogram.count:
+                continue
+            p = histogram.percentiles()
+            lines.append(f"{stage:<8} p50 {p[0.5]:6.3f}  p99 {p[0.99]:6.3f}  max {histogram.max * 1000:6.2f} ms")
+        return lines
+
+    def prometheus(self):
+        """Prometheus-Textformat (Version 0.0.4): Stufen als Summary, Zähler als Counter"""
+        data = self.summary()
+        lines = [
+            "# HELP ma3_stage_seconds Dauer pro Stufe der MA3 Bridge",
+            "# TYPE ma3_stage_seconds summary",
+        ]
+        for stage, histogram in sorted(list(self.histograms.items())):
+            for quantile, ms in sorted(histogram.percentiles().items()):
+                lines.append(f'ma3_stage_seconds{{stage="{stage}",quantile="{quantile}"}} {ms / 1000.0:.9f}')
+            lines.append(f'ma3_stage_seconds_sum{{stage="{stage}"}} {histogram.total:.9f}')
+            lines.append(f'ma3_stage_seconds_count{{stage="{stage}"}} {histogram.count}')
+        lines.append("# TYPE ma3_stage_max_seconds gauge")
+        for stage, histogram in sorted(list(self.histograms.items())):
+            lines.append(f'ma3_stage_max_seconds{{stage="{stage}"}} {histogram.max:.9f}')
+        for name, value in sorted(data['counters'].items()):
+            lines.append(f"# TYPE ma3_{name}_total counter")
+            lines.append(f"ma3_{name}_total {value}")
+        lines.append("# TYPE ma3_uptime_seconds gauge")
+        lines.append(f"ma3_uptime_seconds {data['uptime_s']:.1f}")
+        return "\n".join(lines) + "\n"
+
+
+class MetricsExporter(threading.Thread):
+    """Schreibt Metrics periodisch als JSON und stellt /metrics für Prometheus bereit"""
+
+    def __init__(self, metrics, json_path=None, interval=5.0, port=0, host='127.0.0.1'):
+        super().__init__(name="MetricsExporter", daemon=True)
+        self.metrics = metrics
+        self.json_path = json_path
+        self.interval = interval
+        self.running = True
+        self.server = None
+        if port:
+            self.server = ThreadingHTTPServer((host, port), self._make_handler())
+            self.server.daemon_threads = True
+            threading.Thread(target=self.server.serve_forever, name="MetricsHTTP", daemon=True).start()
+
+    def _make_handler(self):
+        metrics = self.metrics
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?')[0] != '/metrics':
+                    self.send_error(404)
+                    return
+                body = metrics.prometheus().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass    # Scrapes nicht ins Log schreiben
+
+        return Handler
+
+    def write_json(self):
+        """Schreibt atomar (temporäre Datei + rename), Leser sehen nie eine halbe Datei"""
+        if not self.json_path:
+            return
+        tmp_path = f"{self.json_path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(self.metrics.summary(), f, indent=2)
+        os.replace(tmp_path, self.json_path)
+
+    def run(self):
+        while self.running:
+            time.sleep(self.interval)
+            if self.running:
+                self.write_json()
+
+    def stop(self):
+        self.running = False
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+        self.write_json()
@@ -0,0 +1,117 @@
+"""
+Schlanker OSC-Encoder für den Hot-Loop der MA3 Controller Bridge.
+
+Adresse und Type-Tag werden einmalig beim Laden der Config kodiert.
+Pro Tick wird nur noch der Wert per struct.pack_into in einen
+wiederverwendeten bytearray geschrieben - keine Message-Objekte,
+keine f-Strings, keine neuen Byte-Strings.
+"""
+import socket
+import struct
+
+FLOAT = struct.Struct('>f')
+INT = struct.Struct('>i')
+BUNDLE_HEADER = b'#bundle\x00'
+TIMETAG_IMMEDIATELY = b'\x00\x00\x00\x00\x00\x00\x00\x01'
+
+
+def encode_osc_string(value):
+    """Kodiert einen OSC-String (nullterminiert, auf 4 Byte aufgefüllt)"""
+    data = value.encode('ascii') + b'\x00'
+    return data + b'\x00' * (-len(data) % 4)
+
+
+class OscMessageEncoder:
+    """Vorkodierte OSC-Nachricht mit genau einem Argument (float oder int)"""
+    __slots__ = ('buffer', 'size', '_pack_into', '_offset')
+
+    def __init__(self, address, typetag='f'):
+        if typetag not in ('f', 'i'):
+            raise ValueError(f"Nicht unterstützter OSC-Typ: {typetag}")
+        header = encode_osc_string(address) + encode_osc_string(',' + typetag)
+        self.buffer = bytearray(header + b'\x00' * 4)
+        self.size = len(self.buffer)
+        self._pack_into = FLOAT.pack_into if typetag == 'f' else INT.pack_into
+        self._offset = len(header)
+
+    def encode(self, value):
+        """Schreibt value in den Puffer und gibt den (wiederverwendeten) Puffer zurück"""
+        self._pack_into(self.buffer, self._offset, value)
+        return self.buffer
+
+
+class OscStringEncoder:
+    """OSC-Nachricht mit einem String-Argument (z.B. MA3-Befehle an /cmd)"""
+    __slots__ = ('header',)
+
+    def __init__(self, address):
+        self.header = encode_osc_string(address) + encode_osc_string(',s')
+
+    def encode(self, text):
+        """Gibt die fertige Nachricht als bytes zurück (Befehle sind nicht vorkodierbar)"""
+        return self.header + encode_osc_string(text)
+
+
+class OscBundleEncoder:
+    """Baut ein OSC-Bundle (Timetag 'sofort') in einem vorab allozierten Puffer"""
+
+    def __init__(self, max_size=1472):
+        self.buffer = bytearray(max_size)
+        self.buffer[0:16] = BUNDLE_HEADER + TIMETAG_IMMEDIATELY
+        self.view = memoryview(self.buffer)
+        self.size = 16
+        self._views = {}
+
+    def begin(self):
+        self.size = 16
+
+    def fits(self, message):
+        """Passt message noch in dieses Bundle (inkl. Längenfeld)?"""
+        return self.size + 4 + len(message) <= len(self.buffer)
+
+    def add(self, message):
+        """Hängt eine kodierte Nachricht (bytes/bytearray) an"""
+        length = len(message)
+        offset = self.size
+        INT.pack_into(self.buffer, offset, length)
+        self.buffer[offset + 4:offset + 4 + length] = message
+        self.size = offset + 4 + length
+
+    def finish(self):
+        """Gibt eine View auf das fertige Bundle zurück (pro Länge gecacht)"""
+        view = self._views.get(self.size)
+        if view is None:
+            view = self._views[self.size] = self.view[:self.size]
+        return view
+
+
+class RawOscSender:
+    """Nicht-blockierender UDP-Socket, fest mit dem Ziel verbunden"""
+
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+        # Adressfamilie wie SimpleUDPClient über getaddrinfo - osc.host darf auch IPv6 sein
+        family, _, _, _, address = socket.getaddrinfo(host, port, type=socket.SOCK_DGRAM)[0]
+        self.sock = socket.socket(family, socket.SOCK_DGRAM)
+        self.sock.setblocking(False)
+        self.sock.connect(address)
+
+        # Statistiken
+        self.error_count = 0
+        self.dropped_count = 0
+
+    def send(self, data):
+        """Sendet ein Paket. Gibt die Anzahl gesendeter Bytes zurück (0 bei Fehler)"""
+        try:
+            return self.sock.send(data)
+        except BlockingIOError:
+            # Sendepuffer voll - lieber verwerfen als die Engine blockieren
+            self.dropped_count += 1
+        except OSError:
+            # z.B. ICMP "Port unreachable" wenn MA3 (noch) nicht lauscht
+            self.error_count += 1
+        return 0
+
+    def close(self):
+        self.sock.close()
@@ -0,0 +1,346 @@
+"""
+OSC-Fan-out an mehrere Ziele (Haupt-MA3, Backup-Session, Visualizer).
+
+Jedes Ziel hat ein eigenes OscOutput - also eigene Änderungsschwelle
+(Deadband), Keepalive und Paketierung - und eine eigene maximale Senderate
+(Token-Bucket, Standard: osc.console_rate). Zwischen zwei Sendezeitpunkten
+eines Ziels werden Werte zusammengefasst, raus geht nur der letzte Stand.
+
+Gesendet wird über asyncio-Datagram-Transports in einem eigenen Thread.
+Der Engine-Thread übergibt die fertigen Pakete eines Ticks mit einem
+einzigen call_soon_threadsafe() und wartet nie auf ein Ziel: Namensauflösung,
+Verbindungsaufbau, volle Sendepuffer und ICMP-Fehler landen ausschließlich
+im Fan-out-Thread.
+
+Zustände pro Ziel:
+- connecting: Transport wird aufgebaut, Pakete werden verworfen (gezählt)
+- ok
+- failed: FAIL_AFTER Fehler in Folge - bis zur Erholung geht nur noch alle
+  retry_interval Sekunden ein Resync aller Werte als Probe raus
+"""
+import asyncio
+import logging
+import threading
+import time
+
+from osc_output import OscOutput
+
+logger = logging.getLogger("ma3_bridge")
+
+FAIL_AFTER = 3                  # Fehler in Folge bis "failed"
+RETRY_INTERVAL = 2.0            # Sekunden zwischen Proben im Zustand "failed"
+MAX_WRITE_BUFFER = 64 * 1024    # Bytes im Transport-Puffer, darüber wird verworfen
+
+
+class _TargetProtocol(asyncio.DatagramProtocol):
+    """Leitet asynchrone Sendefehler (z.B. ICMP 'Port unreachable') an das Ziel weiter"""
+
+    def __init__(self, target):
+        self.target = target
+
+    def error_received(self, exc):
+        self.target.on_error(exc)
+
+    def connection_lost(self, exc):
+        self.target.transport = None
+
+
+class FanoutTarget:
+    """Ein Empfänger mit eigener Rate, Deadband und Fehlerzustand"""
+
+    def __init__(self, name, host, port, rate=0.0, burst=2.0, deadband_scale=1.0,
+                 keepalive_interval=1.0, bundle=False, retry_interval=RETRY_INTERVAL):
+        self.name = name
+        self.host = host
+        self.port = port
+        self.rate = rate
+        self.deadband_scale = deadband_scale
+        self.retry_interval = retry_interval
+        self.inherited = frozenset()    # Einstellungen aus osc.* statt aus dem Ziel (Live-Reload)
+        self.output = OscOutput(self, keepalive_interval, bundle=bundle, rate=rate, burst=burst)
+        self.transport = None
+        self.state = 'connecting'
+        self.batch = []
+        self.probe_time = None
+        self.resync_pending = False
+
+        # Statistiken - transmitted/errors/dropped zählt der Fan-out-Thread
+        self.transmitted = 0
+        self.errors = 0
+        self.dropped = 0
+        self.consecutive_errors = 0
+        self.last_error = ""
+        self.last_error_time = 0.0
+        self.errors_per_sec = 0.0
+        self.error_rate = 0.0
+        self._rate_start = time.monotonic()
+        self._rate_transmitted = 0
+        self._rate_errors = 0
+
+    @property
+    def address(self):
+        return f"{self.host}:{self.port}"
+
+    def send(self, data):
+        """Sender-Schnittstelle für OscOutput: sammelt die Pakete des Ticks"""
+        self.batch.append(bytes(data))      # Encoder-Puffer werden wiederverwendet
+        return len(data)
+
+    def tick(self, now):
+        """Gibt die Pakete zurück, die dieses Ziel jetzt senden soll"""
+        output = self.output
+        if self.resync_pending:
+            self.resync_pending = False
+            output.resync()
+        if self.state == 'failed':
+            if self.probe_time is not None and now - self.probe_time >= self.retry_interval:
+                if self.transport is not None and self.last_error_time < self.probe_time:
+                    self._recover()
+                else:
+                    self.probe_time = None
+            if self.state == 'failed':
+                if self.probe_time is not None:
+                    return None
+                self.probe_time = now
+                output.resync()
+        output.keepalive(now)
+        output.flush(now)
+        self._update_rates(now)
+        if not self.batch:
+            return None
+        batch = self.batch
+        self.batch = []
+        return batch
+
+    def on_error(self, exc):
+        """Fan-out-Thread: Sendefehler zählen und ggf. auf 'failed' schalten"""
+        self.errors += 1
+        self.consecutive_errors += 1
+        self.last_error = str(exc)
+        self.last_error_time = time.monotonic()
+        if self.state != 'failed' and self.consecutive_errors >= FAIL_AFTER:
+            self.state = 'failed'
+            self.probe_time = None
+            logger.warning("OSC-Ziel %s (%s) ausgefallen: %s", self.name, self.address, exc)
+
+    def connected(self):
+        """Fan-out-Thread: Transport steht, beim nächsten Tick alle Werte senden"""
+        self.state = 'ok'
+        self.consecutive_errors = 0
+        self.resync_pending = True
+        logger.info("OSC-Ziel %s verbunden (%s)", self.name, self.address)
+
+    def _recover(self):
+        self.state = 'ok'
+        self.consecutive_errors = 0
+        self.probe_time = None
+        self.output.resync()
+        logger.info("OSC-Ziel %s (%s) wieder erreichbar", self.name, self.address)
+
+    def _update_rates(self, now):
+        elapsed = now - self._rate_start
+        if elapsed < 1.0:
+            return
+        transmitted = self.transmitted - self._rate_transmitted
+        errors = self.errors - self._rate_errors
+        if not errors:
+            self.consecutive_errors = 0     # vereinzelte Fehler führen nicht zu "failed"
+        self.errors_per_sec = errors / elapsed
+        self.error_rate = errors / (transmitted + errors) if transmitted + errors else 0.0
+        self._rate_transmitted = self.transmitted
+        self._rate_errors = self.errors
+        self._rate_start = now
+
+    def stats(self):
+        return {
+            'name': self.name,
+            'address': self.address,
+            'state': self.state,
+            'rate': self.rate,
+            'packets_per_sec': self.output.packets_per_sec,
+            'bytes_per_sec': self.output.bytes_per_sec,
+            'transmitted': self.transmitted,
+            'errors': self.errors,
+            'dropped': self.dropped,
+            'errors_per_sec': self.errors_per_sec,
+            'error_rate': self.error_rate,
+            'last_error': self.last_error,
+        }
+
+
+class OscFanout:
+    """
+    Gleiche Schnittstelle wie OscOutput (add_channel/send/keepalive/flush und
+    Statistiken), verteilt aber auf mehrere FanoutTargets.
+    """
+
+    def __init__(self, targets, keepalive_interval=1.0, bundle=False, rate=0.0, burst=2.0):
+        self.targets = [target if isinstance(target, FanoutTarget) else
+                        self._make_target(index, target, keepalive_interval, bundle, rate, burst)
+                        for index, target in enumerate(targets)]
+        if not self.targets:
+            raise ValueError("OscFanout braucht mindestens ein Ziel")
+        self.bundle = any(target.output.bundle for target in self.targets)
+        self.loop = asyncio.new_event_loop()
+        self._ready = threading.Event()
+        self.thread = threading.Thread(target=self._run, name="OscFanout", daemon=True)
+        self.thread.start()
+        self._ready.wait()
+        for target in self.targets:
+            asyncio.run_coroutine_threadsafe(self._connect(target), self.loop)
+
+    @staticmethod
+    def _make_target(index, config, keepalive_interval, bundle, rate, burst):
+        target = FanoutTarget(config.get('name', f"ziel{index + 1}"),
+                              config['host'], config['port'],
+                              rate=config.get('rate', rate),
+                              burst=config.get('burst', burst),
+                              deadband_scale=config.get('deadband_scale', 1.0),
+                              keepalive_interval=config.get('keepalive_interval', keepalive_interval),
+                              bundle=config.get('bundle', bundle))
+        target.inherited = frozenset(key for key in ('keepalive_interval', 'bundle', 'rate', 'burst')
+                                     if key not in config)
+        return target
+
+    def _run(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.call_soon(self._ready.set)
+        self.loop.run_forever()
+
+    async def _connect(self, target):
+        """Baut den Transport auf; scheitert das (z.B. DNS), wird periodisch neu versucht"""
+        while target.transport is None:
+            try:
+                transport, _ = await self.loop.create_datagram_endpoint(
+                    lambda: _TargetProtocol(target), remote_addr=(target.host, target.port))
+            except OSError as e:
+                target.on_error(e)
+                target.state = 'failed'
+                await asyncio.sleep(target.retry_interval)
+                continue
+            target.transport = transport
+            target.connected()
+
+    # --- OscOutput-Schnittstelle (Engine-Thread) ---
+
+    def add_channel(self, name, address, deadband=0.0, typetag='f'):
+        for target in self.targets:
+            target.output.add_channel(name, address, deadband * target.deadband_scale, typetag)
+
+    def update_channel(self, name, address, deadband=0.0, typetag='f', release=None):
+        for target in self.targets:
+            target.output.update_channel(name, address, deadband * target.deadband_scale, typetag, release)
+
+    def configure(self, keepalive_interval=None, bundle=None, rate=None, burst=None):
+        """Neue osc.*-Werte gelten für alle Ziele, die sie nicht selbst festlegen"""
+        values = {'keepalive_interval': keepalive_interval, 'bundle': bundle, 'rate': rate, 'burst': burst}
+        for target in self.targets:
+            target.output.configure(**{key: value for key, value in values.items() if key in target.inherited})
+            if rate is not None and 'rate' in target.inherited:
+                target.rate = rate
+        self.bundle = any(target.output.bundle for target in self.targets)
+
+    def send(self, name, value):
+        sent = False
+        for target in self.targets:
+            if target.output.send(name, value):
+                sent = True
+        return sent
+
+    def keepalive(self, now=None):
+        pass    # pro Ziel in flush(), damit die Senderate auch für Resyncs gilt
+
+    def flush(self, now=None):
+        if now is None:
+            now = time.monotonic()
+        batches = []
+        for target in self.targets:
+            batch = target.tick(now)
+            if batch:
+                batches.append((target, batch))
+        if batches:
+            self.loop.call_soon_threadsafe(self._transmit, batches)
+
+    # --- Fan-out-Thread ---
+
+    @staticmethod
+    def _transmit(batches):
+        for target, batch in batches:
+            transport = target.transport
+            if transport is None:
+                target.dropped += len(batch)
+                continue
+            for packet in batch:
+                if transport.get_write_buffer_size() > MAX_WRITE_BUFFER:
+                    # Langsames Ziel - verwerfen statt Speicher ansammeln
+                    target.dropped += 1
+                    continue
+                transport.sendto(packet)
+                target.transmitted += 1
+
+    # --- Statistiken ---
+
+    @property
+    def sent_count(self):
+        return sum(target.output.sent_count for target in self.targets)
+
+    @property
+    def suppressed_count(self):
+        return sum(target.output.suppressed_count for target in self.targets)
+
+    @property
+    def coalesced_count(self):
+        return sum(target.output.coalesced_count for target in self.targets)
+
+    @property
+    def held_count(self):
+        return sum(target.output.held_count for target in self.targets)
+
+    @property
+    def last_hold(self):
+        return max(target.output.last_hold for target in self.targets)
+
+    @property
+    def packet_count(self):
+        return sum(target.output.packet_count for target in self.targets)
+
+    @property
+    def byte_count(self):
+        return sum(target.output.byte_count for target in self.targets)
+
+    @property
+    def packets_per_sec(self):
+        return sum(target.output.packets_per_sec for target in self.targets)
+
+    @property
+    def bytes_per_sec(self):
+        return sum(target.output.bytes_per_sec for target in self.targets)
+
+    @property
+    def error_count(self):
+        return sum(target.errors for target in self.targets)
+
+    @property
+    def dropped_count(self):
+        return sum(target.dropped for target in self.targets)
+
+    def target_stats(self):
+        return [target.stats() for target in self.targets]
+
+    def close(self):
+        def shutdown():
+            for target in self.targets:
+                if target.transport is not None:
+                    target.transport.close()
+            self.loop.stop()
+        if self.loop.is_running():
+            self.loop.call_soon_threadsafe(shutdown)
+            self.thread.join(timeout=1.0)
+        if not self.loop.is_running():
+            # Offene Verbindungsversuche (z.B. nicht auflösbarer Host) beenden
+            tasks = asyncio.all_tasks(self.loop)
+            for task in tasks:
+                task.cancel()
+            if tasks:
+                self.loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+            self.loop.close()
@@ -0,0 +1,232 @@
+"""
+OSC Output-Schicht für die MA3 Controller Bridge.
+
+Sendet Fader- und Key-Werte nur bei echten Änderungen:
+- Deadband pro Kanal (in Fader-Prozent, 0-100)
+- Keys flankengesteuert (nur bei Wechsel 0 <-> 1)
+- Keepalive: alle N Sekunden werden alle Kanäle erneut gesendet (Resync)
+- Senderate: optional begrenzt auf die Rate, mit der die Konsole liest
+  (Token-Bucket) - dazwischen geht pro Kanal nur der letzte Wert raus
+
+Die Werte eines Ticks werden gesammelt und mit flush() gesendet -
+entweder als einzelne Nachrichten oder als ein OSC-Bundle (ein Paket).
+Kodiert wird mit den vorkodierten Encodern aus osc_encoder.
+"""
+import time
+
+from osc_encoder import OscBundleEncoder, OscMessageEncoder
+
+
+class OscChannel:
+    """Zustand eines einzelnen OSC-Ziels (Fader oder Key)"""
+    __slots__ = ('address', 'encoder', 'deadband', 'last_sent', 'last_value', 'queued')
+
+    def __init__(self, address, deadband=0.0, typetag='f'):
+        self.address = address
+        self.encoder = OscMessageEncoder(address, typetag)
+        self.deadband = deadband
+        self.last_sent = None    # zuletzt an MA3 gesendeter Wert
+        self.last_value = None   # zuletzt angefragter Wert (auch wenn unterdrückt)
+        self.queued = False      # wartet schon auf flush() (dann wird nur last_sent aktualisiert)
+
+
+class TokenBucket:
+    """
+    Begrenzt Sendungen auf im Mittel rate pro Sekunde. Nach einer Pause
+    dürfen bis zu burst Sendungen sofort raus - die erste Änderung nach
+    Stillstand wartet also nie auf einen Takt.
+    """
+    __slots__ = ('rate', 'burst', 'tokens', 'last')
+
+    def __init__(self, rate, burst=2.0):
+        if rate <= 0:
+            raise ValueError("rate muss größer als 0 sein")
+        self.rate = rate
+        self.burst = max(float(burst), 1.0)
+        self.tokens = self.burst
+        self.last = time.monotonic()
+
+    def take(self, now):
+        """Verbraucht ein Token, falls vorhanden"""
+        tokens = self.tokens + (now - self.last) * self.rate
+        self.last = now
+        if tokens > self.burst:
+            tokens = self.burst
+        if tokens < 1.0:
+            self.tokens = tokens
+            return False
+        self.tokens = tokens - 1.0
+        return True
+
+
+class OscOutput:
+    """Change-Detection und Paketierung vor dem OSC-Client"""
+
+    def __init__(self, sender, keepalive_interval=1.0, bundle=False, rate=0.0, burst=2.0):
+        self.sender = sender
+        self.keepalive_interval = keepalive_interval
+        self.bundle = bundle
+        self.bundle_encoder = OscBundleEncoder()
+        self.channels = {}
+        self.pending = []
+        self.pending_since = 0.0
+        self.last_keepalive = time.monotonic()
+        # Ein Token pro flush() (= ein Update der Konsole, egal wie viele Pakete)
+        self.bucket = TokenBucket(rate, burst) if rate else None
+
+        # Statistiken
+        self.sent_count = 0
+        self.suppressed_count = 0
+        self.coalesced_count = 0    # vor dem Senden durch einen neueren Wert ersetzt
+        self.held_count = 0         # flush() ohne Token - Werte warten auf den nächsten
+        self.last_hold = 0.0        # Sekunden vom ersten wartenden Wert bis zum Senden
+        self.packet_count = 0
+        self.byte_count = 0
+        self.packets_per_sec = 0.0
+        self.bytes_per_sec = 0.0
+        self._rate_start = time.monotonic()
+        self._rate_packets = 0
+        self._rate_bytes = 0
+
+    def add_channel(self, name, address, deadband=0.0, typetag='f'):
+        self.channels[name] = OscChannel(address, deadband, typetag)
+
+    def update_channel(self, name, address, deadband=0.0, typetag='f', release=None):
+        """
+        Neue Adresse bzw. Deadband für einen bestehenden Kanal (Live-Reload der
+        Config). Bei neuer Adresse bekommt die alte einmal release (z.B. Mitte,
+        damit das Plugin dort kein Fixture weiterbewegt), die neue sofort den
+        aktuellen Wert.
+        """
+        channel = self.channels[name]
+        channel.deadband = deadband
+        if address == channel.address:
+            return
+        if release is not None and channel.last_sent is not None:
+            self._send_packet(channel.encoder.encode(release))
+        channel.address = address
+        channel.encoder = OscMessageEncoder(address, typetag)
+        if channel.last_value is not None:
+            self._queue(channel, channel.last_value)
+
+    def configure(self, keepalive_interval=None, bundle=None, rate=None, burst=None):
+        """Übernimmt geänderte Einstellungen (Live-Reload), None = unverändert"""
+        if keepalive_interval is not None:
+            self.keepalive_interval = keepalive_interval
+        if bundle is not None:
+            self.bundle = bundle
+        if rate is None and burst is None:
+            return
+        bucket = self.bucket
+        rate = (bucket.rate if bucket else 0.0) if rate is None else rate
+        burst = (bucket.burst if bucket else 2.0) if burst is None else burst
+        if not rate:
+            self.bucket = None
+        elif bucket is None or bucket.rate != rate or bucket.burst != max(float(burst), 1.0):
+            self.bucket = TokenBucket(rate, burst)
+
+    def send(self, name, value):
+        """
+        Merkt value zum Senden vor, wenn er sich genug vom letzten gesendeten
+        Wert unterscheidet. Kleine Änderungen werden nachgereicht, sobald sich
+        der Wert beruhigt hat, damit der Fader nicht knapp neben dem Endwert
+        stehen bleibt. Gibt True zurück, wenn der Wert gesendet wird.
+        """
+        channel = self.channels[name]
+        previous = channel.last_value
+        channel.last_value = value
+
+        last_sent = channel.last_sent
+        if last_sent is not None:
+            if value == last_sent:
+                self.suppressed_count += 1
+                return False
+            if abs(value - last_sent) < channel.deadband and value != previous:
+                self.suppressed_count += 1
+                return False
+
+        self._queue(channel, value)
+        return True
+
+    def keepalive(self, now=None):
+        """Sendet periodisch alle bekannten Werte erneut (z.B. nach MA3-Neustart)"""
+        if not self.keepalive_interval:
+            return
+        if now is None:
+            now = time.monotonic()
+        if now - self.last_keepalive < self.keepalive_interval:
+            return
+        self.last_keepalive = now
+        self.resync()
+
+    def resync(self):
+        """Merkt alle bekannten Werte zum erneuten Senden vor"""
+        for channel in self.channels.values():
+            if channel.last_value is not None:
+                self._queue(channel, channel.last_value)
+
+    def flush(self, now=None):
+        """Sendet alle wartenden Werte (als Bundle oder einzeln), sofern die Rate es zulässt"""
+        if not self.pending:
+            self._update_rates()
+            return
+        if self.bucket is not None:
+            if now is None:
+                now = time.monotonic()
+            if not self.bucket.take(now):
+                self.held_count += 1
+                return
+
+        if self.bundle and len(self.pending) > 1:
+            # Mehrere Bänke können mehr Werte liefern als in ein UDP-Paket
+            # passen - dann wird auf mehrere Bundles aufgeteilt
+            bundle = self.bundle_encoder
+            bundle.begin()
+            for channel in self.pending:
+                message = channel.encoder.encode(channel.last_sent)
+                if not bundle.fits(message):
+                    self._send_packet(bundle.finish())
+                    bundle.begin()
+                bundle.add(message)
+            self._send_packet(bundle.finish())
+        else:
+            for channel in self.pending:
+                self._send_packet(channel.encoder.encode(channel.last_sent))
+
+        self.sent_count += len(self.pending)
+        for channel in self.pending:
+            channel.queued = False
+        self.pending.clear()
+        self.last_hold = time.perf_counter() - self.pending_since
+        self._update_rates()
+
+    def _queue(self, channel, value):
+        # Mehrfaches send() vor einem flush() (z.B. bei begrenzter Senderate)
+        # fasst zusammen: raus geht nur der letzte Wert
+        if channel.queued:
+            self.coalesced_count += 1
+        else:
+            if not self.pending:
+                self.pending_since = time.perf_counter()
+            channel.queued = True
+            self.pending.append(channel)
+        channel.last_sent = value
+
+    def _send_packet(self, data):
+        size = self.sender.send(data)
+        if not size:
+            return  # verworfen oder Fehler (zählt der Sender) - kein Paket, das rausging
+        self.packet_count += 1
+        self.byte_count += size
+        self._rate_packets += 1
+        self._rate_bytes += size
+
+    def _update_rates(self):
+        now = time.monotonic()
+        elapsed = now - self._rate_start
+        if elapsed >= 1.0:
+            self.packets_per_sec = self._rate_packets / elapsed
+            self.bytes_per_sec = self._rate_bytes / elapsed
+            self._rate_packets = 0
+            self._rate_bytes = 0
+            self._rate_start = now
@@ -1,27 +1,80 @@
+import argparse
 import asyncio
 import aiohttp
 from bs4 import BeautifulSoup
+from bs4.builder import builder_registry
 import json
 import os
 import re
+import hashlib
 import logging
-from urllib.parse import urljoin
+import random
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import urljoin, urlsplit
 from datetime import datetime
 
+try:
+    from bs4.filter import ElementFilter
+except ImportError:     # beautifulsoup4 < 4.13: kein gezieltes Parsen, immer ganze Seiten
+    ElementFilter = None
+
 # --- KONFIGURATION ---
-BASE_URL = "https://westfaelisches-landestheater.de"
-SOURCES = [
-    {"url": f"{BASE_URL}/abendtheater/spielzeit-2025-2026/", "cat": "Abendtheater", "season": "2025/2026"},
-    {"url": f"{BASE_URL}/abendtheater/spielzeit-2026-2027/", "cat": "Abendtheater", "season": "2026/2027"},
-    {"url": f"{BASE_URL}/kinder-jugendtheater/spielzeit-2025-2026/", "cat": "KJT", "season": "2025/2026"},
-    {"url": f"{BASE_URL}/kinder-jugendtheater/spielzeit-2026-2027/", "cat": "KJT", "season": "2026/2027"},
+# WLT_BASE_URL (oder --base-url) lenkt den Scraper z.B. auf wlt_standin.py um
+BASE_URL = os.environ.get("WLT_BASE_URL", "https://westfaelisches-landestheater.de").rstrip("/")
+SOURCE_PAGES = [
+    ("/abendtheater/spielzeit-2025-2026/", "Abendtheater", "2025/2026"),
+    ("/abendtheater/spielzeit-2026-2027/", "Abendtheater", "2026/2027"),
+    ("/kinder-jugendtheater/spielzeit-2025-2026/", "KJT", "2025/2026"),
+    ("/kinder-jugendtheater/spielzeit-2026-2027/", "KJT", "2026/2027"),
 ]
+
+def make_sources(base_url):
+    return [{"url": f"{base_url}{path}", "cat": cat, "season": season} for path, cat, season in SOURCE_PAGES]
+
+SOURCES = make_sources(BASE_URL)
 DATA_FILE = "wlt_data.json"
 MAX_CONCURRENT_REQUESTS = 10 
 
+# Verbindungen und Wiederholungen (alle Seiten liegen auf einem Host)
+KEEPALIVE_TIMEOUT = 30          # Sekunden, offene Verbindungen werden wiederverwendet
+REQUEST_TIMEOUT = 30            # Sekunden pro Versuch
+RETRIES = 3                     # weitere Versuche nach Verbindungsfehler, Timeout, 429 oder 5xx
+RETRY_BASE_DELAY = 0.5          # Sekunden, verdoppelt sich pro Versuch (plus Zufall)
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+# Parsen in eigenen Prozessen, damit es weder den Event-Loop noch die Abrufe blockiert
+# und alle Kerne nutzt. 0 = im Event-Loop parsen (wie früher)
+PARSER_WORKERS = os.cpu_count() or 1
+
+# Parser für BeautifulSoup: "html.parser" (Python, Referenz) oder "lxml" (C, braucht das Paket lxml).
+# lxml repariert kaputtes HTML anders (nicht geschlossenes <p>, <div> in <p>) und liefert dann
+# anderen bzw. weniger Inhalt - Standard bleibt html.parser, bis echte Seiten aus --capture im
+# Golden-Test (tests/test_scraper_golden.py) auch mit lxml gleich herauskommen.
+# PARSE_TARGETED baut nur die ausgewerteten Container auf - Ergebnis identisch zur ganzen Seite
+# (prüfen mit python -m benchmarks.bench_scraper_parse --check)
+PARSER_BACKEND = "html.parser"
+PARSE_TARGETED = True
+
+# Antwort-Cache zwischen zwei Läufen (ETag/Last-Modified + Inhalts-Hash pro URL).
+# CACHE_VERSION erhöhen, wenn sich das Parsing ändert - dann wird alles neu gelesen.
+# Ein anderes Backend oder PARSE_TARGETED verwirft den Cache von selbst (parser_tag).
+CACHE_FILE = "wlt_cache.json"
+CACHE_VERSION = 2
+NOT_MODIFIED = object()     # fetch_url mit Cache: Seite unverändert, gespeicherter Datensatz gilt
+
+# Mitschnitt (--capture): Index- und Detail-Seiten eines Laufs als Korpus für wlt_standin.py
+CORPUS_VERSION = 1
+
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(message)s')
 logger = logging.getLogger()
 
+def set_base_url(base_url):
+    """Stellt Host und SOURCES um (auch für Parser-Prozesse, die das Modul neu laden)"""
+    global BASE_URL, SOURCES
+    BASE_URL = base_url.rstrip("/")
+    SOURCES = make_sources(BASE_URL)
+    os.environ["WLT_BASE_URL"] = BASE_URL
+
 def clean_text(text):
     if not text: return ""
     return " ".join(text.split())
@@ -36,226 +89,558 @@ def extract_id_from_url(url):
     nums = re.findall(r'\d+', url)
     return nums[-1] if nums else str(hash(url))
 
-async def fetch_url(session, url):
-    try:
-        async with session.get(url) as response:
-            if response.status == 200:
-                return await response.text()
-            logger.error(f"HTTP {response.status} bei {url}")
-    except Exception as e:
-        logger.error(f"Fehler bei {url}: {e}")
-    return None
-
-async def scrape_detail_page(session, url, sem):
-    """Scrapt Details inklusive Plakatmotiv."""
-    async with sem:
-        html = await fetch_url(session, url)
-        if not html: return {}
-
-        soup = BeautifulSoup(html, 'html.parser')
-        data = {
-            "besetzung": [],
-            "inhalt": "",
-            "termine": [],
-            "medien": [],
-            "presse": [],
-            "meta_details": {
-                "dauer_minuten": None,
-                "hat_pause": False,
-                "altersempfehlung": None,
-                "schulklasse": None
-            },
-            "flags": {"tickets": False, "video": False, "audio": False}
+class HttpCache:
+    """
+    Persistenter Cache pro URL: Validatoren (ETag/Last-Modified), SHA-256 des Inhalts
+    und der daraus gelesene Datensatz. Unveränderte Seiten werden nicht neu geparst.
+    """
+
+    def __init__(self, path=CACHE_FILE):
+        self.path = path
+        self.entries = {}
+        self.used = set()
+        self.stats = {"requests": 0, "not_modified": 0, "unchanged": 0, "bytes_saved": 0, "bytes_loaded": 0}
+        if path and os.path.exists(path):
+            try:
+                with open(path, encoding='utf-8') as f:
+                    data = json.load(f)
+                if data.get("version") != CACHE_VERSION:
+                    logger.info("Cache-Version geändert, alle Seiten werden neu gelesen")
+                elif data.get("parser") != parser_tag():
+                    logger.info(f"Parser geändert ({data.get('parser')} -> {parser_tag()}), alle Seiten werden neu gelesen")
+                else:
+                    self.entries = data.get("entries", {})
+            except (OSError, ValueError) as e:
+                logger.error(f"Cache {path} nicht lesbar, starte leer: {e}")
+
+    def conditional_headers(self, url):
+        """If-None-Match/If-Modified-Since, nur wenn ein Datensatz zum Wiederverwenden da ist"""
+        self.stats["requests"] += 1
+        self.used.add(url)
+        entry = self.entries.get(url)
+        if not entry or entry.get("record") is None: return {}
+        headers = {}
+        if entry.get("etag"): headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"): headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def not_modified(self, url):
+        """304 erhalten: Der Inhalt wurde nicht erneut übertragen"""
+        self.stats["not_modified"] += 1
+        self.stats["bytes_saved"] += self.entries[url]["size"]
+
+    def unchanged(self, url, headers, body):
+        """
+        200 erhalten: merkt sich Validatoren und Hash. True, wenn der Inhalt gleich
+        geblieben ist (Server ohne 304) - dann gilt der gespeicherte Datensatz weiter.
+        """
+        digest = hashlib.sha256(body).hexdigest()
+        self.stats["bytes_loaded"] += len(body)
+        entry = self.entries.get(url)
+        same = bool(entry) and entry.get("hash") == digest and entry.get("record") is not None
+        if not same:
+            entry = self.entries[url] = {"hash": digest, "record": None}
+        entry["etag"] = headers.get("ETag")
+        entry["last_modified"] = headers.get("Last-Modified")
+        entry["size"] = len(body)
+        if same: self.stats["unchanged"] += 1
+        return same
+
+    def record(self, url):
+        return self.entries[url]["record"]
+
+    def store(self, url, record):
+        if url in self.entries: self.entries[url]["record"] = record
+
+    def summary(self):
+        stats = self.stats
+        hits = stats["not_modified"] + stats["unchanged"]
+        rate = hits / stats["requests"] * 100 if stats["requests"] else 0.0
+        return (f"Cache: {hits}/{stats['requests']} unverändert ({rate:.0f} %, {stats['not_modified']}x 304, "
+                f"{stats['unchanged']}x gleicher Inhalt), {stats['bytes_saved'] / 1024:.0f} KB gespart, "
+                f"{stats['bytes_loaded'] / 1024:.0f} KB geladen")
+
+    def save(self):
+        """Schreibt den Cache, Seiten, die in diesem Lauf nicht mehr vorkamen, fallen raus"""
+        if not self.path: return
+        entries = {url: entry for url, entry in self.entries.items() if url in self.used and entry.get("record") is not None}
+        tmp = self.path + ".tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump({"version": CACHE_VERSION, "parser": parser_tag(), "entries": entries}, f, ensure_ascii=False)
+        os.replace(tmp, self.path)
+
+class CorpusWriter:
+    """
+    Speichert das HTML eines Laufs als Korpus: index/*.html, detail/*.html und
+    manifest.json (Format-Version, Quell-Host, Zeitpunkt, Seite -> Datei).
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.pages = {}
+        for kind in ("index", "detail"):
+            os.makedirs(os.path.join(path, kind), exist_ok=True)
+
+    def add(self, url, kind, html):
+        parts = urlsplit(url)
+        key = parts.path + (f"?{parts.query}" if parts.query else "")
+        name = re.sub(r'[^A-Za-z0-9]+', '_', key).strip('_') or "start"
+        filename = f"{kind}/{name}.html"
+        with open(os.path.join(self.path, filename), 'w', encoding='utf-8') as f:
+            f.write(html)
+        self.pages[key] = {"kind": kind, "file": filename}
+
+    def close(self):
+        manifest = {
+            "version": CORPUS_VERSION,
+            "base_url": BASE_URL,
+            "captured": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "sources": [{"path": path, "cat": cat, "season": season} for path, cat, season in SOURCE_PAGES],
+            "pages": dict(sorted(self.pages.items())),
         }
-
-        # 1. Metadaten (Alter, Klasse)
-        full_text = ""
-        for div in soup.find_all('div', class_='detail-beschreibung-title'):
-            txt = clean_text(div.get_text())
+        with open(os.path.join(self.path, "manifest.json"), 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+        logger.info(f"Korpus gespeichert: {self.path} ({len(self.pages)} Seiten)")
+
+def create_session():
+    """
+    Eine Session für den ganzen Lauf: begrenzte Verbindungen zum Host, Keep-Alive, DNS-Cache.
+    Details belegen höchstens MAX_CONCURRENT_REQUESTS (Semaphore), die Index-Seiten
+    haben eigene Plätze und warten nie hinter Detail-Abrufen.
+    """
+    limit = MAX_CONCURRENT_REQUESTS + len(SOURCES)
+    connector = aiohttp.TCPConnector(limit=limit, limit_per_host=limit,
+                                     keepalive_timeout=KEEPALIVE_TIMEOUT, ttl_dns_cache=300)
+    return aiohttp.ClientSession(connector=connector, timeout=aiohttp.ClientTimeout(total=REQUEST_TIMEOUT))
+
+def retry_delay(attempt, retry_after=None):
+    """Exponentielles Backoff mit Zufall, ein Retry-After des Servers (Sekunden) hat Vorrang"""
+    delay = RETRY_BASE_DELAY * 2 ** attempt * random.uniform(1.0, 1.5)
+    if retry_after and retry_after.isdigit():
+        delay = max(delay, float(retry_after))
+    return delay
+
+async def fetch_url(session, url, cache=None):
+    """Lädt eine Seite. Mit cache als bedingter Request - NOT_MODIFIED, wenn der gespeicherte Datensatz gilt."""
+    headers = cache.conditional_headers(url) if cache else None
+    for attempt in range(RETRIES + 1):
+        retry_after = None
+        try:
+            async with session.get(url, headers=headers) as response:
+                if response.status == 304 and cache:
+                    cache.not_modified(url)
+                    return NOT_MODIFIED
+                if response.status == 200:
+                    body = await response.read()
+                    if cache and cache.unchanged(url, response.headers, body):
+                        return NOT_MODIFIED
+                    return await response.text()
+                if response.status not in RETRY_STATUS:
+                    logger.error(f"HTTP {response.status} bei {url}")
+                    return None
+                error = f"HTTP {response.status}"
+                retry_after = response.headers.get("Retry-After")
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            error = str(e) or type(e).__name__
+        except Exception as e:
+            logger.error(f"Fehler bei {url}: {e}")
+            return None
+        if attempt == RETRIES:
+            logger.error(f"Fehler bei {url}: {error} (nach {RETRIES + 1} Versuchen)")
+            return None
+        delay = retry_delay(attempt, retry_after)
+        logger.warning(f"{error} bei {url}, neuer Versuch in {delay:.1f}s ({attempt + 2}/{RETRIES + 1})")
+        await asyncio.sleep(delay)
+
+async def parse_html(pool, parse, html):
+    """Führt parse(html) im Prozess-Pool aus (ohne Pool direkt). Ergebnis sind einfache Dicts/Listen."""
+    if pool is None: return parse(html)
+    return await asyncio.get_running_loop().run_in_executor(pool, parse, html)
+
+async def scrape_detail_page(session, url, sem, cache=None, pool=None, capture=None):
+    """Scrapt Details inklusive Plakatmotiv (unveränderte Seiten aus dem Cache)."""
+    # Nur der Abruf belegt einen Platz - geparst wird danach, der nächste Abruf läuft schon
+    async with sem:
+        html = await fetch_url(session, url, cache)
+    if html is NOT_MODIFIED: return cache.record(url)
+    if not html: return {}
+    if capture: capture.add(url, "detail", html)
+    data = await parse_html(pool, parse_detail_page, html)
+    if cache: cache.store(url, data)
+    return data
+
+# Container, die parse_detail_page auswertet (Tag, Attribut, Wert/Klasse) - beim gezielten
+# Parsen entstehen nur diese mit allem, was darin liegt
+DETAIL_CONTAINERS = [
+    ('div', 'class', 'detail-beschreibung-title'),
+    ('div', 'class', 'detail-cast'),
+    ('h2', 'class', 'detail-beschreibung-header'),
+    ('ul', 'class', 'detail-beschreibung-terminliste'),
+    ('div', 'class', 'detail-plakatmotiv'),
+    ('div', 'data-plyr-provider', 'youtube'),
+    ('audio', None, None),
+    ('div', 'class', 'detail-image-box'),
+    ('div', 'id', 'pressestimmen-content'),
+]
+_warned_backends = set()
+_warned_parents = set()
+
+def parser_features(backend=None):
+    """BeautifulSoup-Feature für das Backend, ohne installiertes lxml html.parser"""
+    backend = backend or PARSER_BACKEND
+    if builder_registry.lookup(backend) is None:
+        if backend not in _warned_backends:
+            _warned_backends.add(backend)
+            logger.warning(f"Parser {backend} nicht installiert, verwende html.parser")
+        return 'html.parser'
+    return backend
+
+if ElementFilter is not None:
+    class ContainerFilter(ElementFilter):
+        """Lässt beim Parsen nur Tags entstehen, die einem Container entsprechen (samt Inhalt)"""
+
+        def __init__(self, containers):
+            super().__init__()
+            self.containers = containers
+
+        def allow_tag_creation(self, nsprefix, name, attrs):
+            for tag, attr, value in self.containers:
+                if name != tag: continue
+                if attr is None: return True
+                raw = attrs.get(attr) if attrs else None
+                if raw is None: continue
+                if attr == 'class':
+                    if value in (raw.split() if isinstance(raw, str) else raw): return True
+                elif raw == value:
+                    return True
+            return False
+
+        def allow_string_creation(self, string):
+            return False    # Text außerhalb der Container wird nicht gebraucht
+
+def parser_tag():
+    """Backend und Parse-Art, mit denen die Datensätze im Cache entstanden sind"""
+    targeted = PARSE_TARGETED and ElementFilter is not None
+    return f"{parser_features()}/{'gezielt' if targeted else 'ganz'}"
+
+def content_header(soup):
+    return soup.find('h2', class_='detail-beschreibung-header', string=lambda t: t and "Zum Stück" in t)
+
+def parse_detail_soup(html, backend=None, targeted=None):
+    """
+    Baut den Baum für parse_detail_page. Gezielt geparst fehlen dem "Zum Stück"-Header
+    die Geschwister, solange sein Elternelement kein Container ist - dann wird die Seite
+    einmal ganz gelesen und das Elternelement als Container übernommen (gilt für alle
+    weiteren Seiten dieses Prozesses). Übernommen wird nur ein Elternelement mit id
+    oder class, ein nacktes <div> oder <body> würde jede weitere Seite ganz parsen
+    lassen - solche Seiten werden einzeln ganz gelesen.
+    """
+    features = parser_features(backend)
+    if targeted is None: targeted = PARSE_TARGETED
+    if targeted and ElementFilter is not None:
+        soup = BeautifulSoup(html, features, parse_only=ContainerFilter(DETAIL_CONTAINERS))
+        header = content_header(soup)
+        if header is None or header.parent is not soup:
+            return soup, header
+    soup = BeautifulSoup(html, features)
+    header = content_header(soup)
+    if targeted and ElementFilter is not None and header is not None:
+        parent = header.parent
+        container = None
+        if parent is not None and parent is not soup:
+            if parent.get('id'):
+                container = (parent.name, 'id', parent['id'])
+            elif parent.get('class'):
+                container = (parent.name, 'class', parent['class'][0])
+        if container is None:
+            where = f"in <{parent.name}> ohne id/class" if parent is not None and parent is not soup else "auf oberster Ebene"
+            if where not in _warned_parents:
+                _warned_parents.add(where)
+                logger.warning(f"'Zum Stück' steht {where} - solche Seiten werden ganz geparst")
+        elif container not in DETAIL_CONTAINERS:
+            DETAIL_CONTAINERS.append(container)
+    return soup, header
+
+def text_without(tag, skip):
+    """tag.get_text() ohne den Text von skip (statt Kopie des Tags und decompose)"""
+    skipped = {id(string) for string in skip.strings}
+    return "".join(string for string in tag.strings if id(string) not in skipped)
+
+def parse_detail_page(html, backend=None, targeted=None):
+    """Liest die Details aus dem HTML einer Stück-Seite."""
+    soup, header = parse_detail_soup(html, backend, targeted)
+    data = {
+        "besetzung": [],
+        "inhalt": "",
+        "termine": [],
+        "medien": [],
+        "presse": [],
+        "meta_details": {
+            "dauer_minuten": None,
+            "hat_pause": False,
+            "altersempfehlung": None,
+            "schulklasse": None
+        },
+        "flags": {"tickets": False, "video": False, "audio": False}
+    }
+
+    # 1. Metadaten (Alter, Klasse)
+    full_text = ""
+    for div in soup.find_all('div', class_='detail-beschreibung-title'):
+        txt = clean_text(div.get_text())
+        full_text += txt + " "
+        if "Jahren" in txt or "ab" in txt:
+            data["meta_details"]["altersempfehlung"] = txt
+        if "Klasse" in txt:
+            data["meta_details"]["schulklasse"] = txt
+
+    # 2. Besetzung
+    cast_div = soup.find('div', class_='detail-cast')
+    if cast_div:
+        for span in cast_div.find_all('span'):
+            role_tag = span.find('strong')
+            if not role_tag: continue
+            rolle = clean_text(role_tag.get_text()).rstrip(':')
+            role_tag.extract()
+            darsteller = clean_text(span.get_text())
+            data["besetzung"].append({"rolle": rolle, "darsteller": darsteller})
+
+    # 3. Inhalt
+    if header:
+        parts = []
+        curr = header.find_next_sibling()
+        while curr:
+            # Stoppen bei Bildern, Terminen oder PLAKATMOTIV (neu)
+            if curr.name == 'div' and any(cls in curr.get('class', []) for cls in ['detail-image-box', 'detail-terminliste', 'detail-presse', 'detail-plakatmotiv']):
+                break
+            txt = clean_text(curr.get_text())
             full_text += txt + " "
-            if "Jahren" in txt or "ab" in txt:
-                data["meta_details"]["altersempfehlung"] = txt
-            if "Klasse" in txt:
-                data["meta_details"]["schulklasse"] = txt
-
-        # 2. Besetzung
-        cast_div = soup.find('div', class_='detail-cast')
-        if cast_div:
-            for span in cast_div.find_all('span'):
-                role_tag = span.find('strong')
-                if not role_tag: continue
-                rolle = clean_text(role_tag.get_text()).rstrip(':')
-                role_tag.extract()
-                darsteller = clean_text(span.get_text())
-                data["besetzung"].append({"rolle": rolle, "darsteller": darsteller})
-
-        # 3. Inhalt
-        header = soup.find('h2', class_='detail-beschreibung-header', string=lambda t: t and "Zum Stück" in t)
-        if header:
-            parts = []
-            curr = header.find_next_sibling()
-            while curr:
-                # Stoppen bei Bildern, Terminen oder PLAKATMOTIV (neu)
-                if curr.name == 'div' and any(cls in curr.get('class', []) for cls in ['detail-image-box', 'detail-terminliste', 'detail-presse', 'detail-plakatmotiv']):
-                    break
-                txt = clean_text(curr.get_text())
-                full_text += txt + " "
-                if curr.name == 'p' and 'download-anchor' not in curr.get('class', []):
-                    if txt: parts.append(txt)
-                curr = curr.find_next_sibling()
-            data["inhalt"] = "\n\n".join(parts)
-
-        if "Pause" in full_text: data["meta_details"]["hat_pause"] = True
-        data["meta_details"]["dauer_minuten"] = extract_duration(full_text)
-
-        # 4. Termine
-        termin_list = soup.find('ul', class_='detail-beschreibung-terminliste')
-        if termin_list:
-            for li in termin_list.find_all('li'):
-                time_tag = li.find('time')
-                ticket_a = li.find('a', class_='ticketlink')
-                ort_span = li.find('span', class_='span-7')
-                ort_text = ""
-                if ort_span:
-                    import copy
-                    sc = copy.copy(ort_span)
-                    if sc.find('a'): sc.find('a').decompose()
-                    ort_text = clean_text(sc.get_text())
-
-                has_ticket = bool(ticket_a and ticket_a.get('href'))
-                if has_ticket: data["flags"]["tickets"] = True
-
-                data["termine"].append({
-                    "datum_iso": time_tag['datetime'] if time_tag else None,
-                    "datum_anzeige": clean_text(time_tag.get_text()) if time_tag else "",
-                    "uhrzeit": clean_text(li.find('span', class_='event-time').get_text()) if li.find('span', class_='event-time') else "",
-                    "ort": ort_text,
-                    "ticket_url": ticket_a['href'] if has_ticket else None
-                })
-
-        # --- 5. MEDIEN (Plakat, Video, Audio, Galerie) ---
-        
+            if curr.name == 'p' and 'download-anchor' not in curr.get('class', []):
+                if txt: parts.append(txt)
+            curr = curr.find_next_sibling()
+        data["inhalt"] = "\n\n".join(parts)
+
+    if "Pause" in full_text: data["meta_details"]["hat_pause"] = True
+    data["meta_details"]["dauer_minuten"] = extract_duration(full_text)
+
+    # 4. Termine
+    termin_list = soup.find('ul', class_='detail-beschreibung-terminliste')
+    if termin_list:
+        for li in termin_list.find_all('li'):
+            time_tag = li.find('time')
+            ticket_a = li.find('a', class_='ticketlink')
+            ort_span = li.find('span', class_='span-7')
+            ort_text = ""
+            if ort_span:
+                ort_link = ort_span.find('a')
+                ort_text = clean_text(text_without(ort_span, ort_link) if ort_link else ort_span.get_text())
+
+            has_ticket = bool(ticket_a and ticket_a.get('href'))
+            if has_ticket: data["flags"]["tickets"] = True
+            time_span = li.find('span', class_='event-time')
+
+            data["termine"].append({
+                "datum_iso": time_tag['datetime'] if time_tag else None,
+                "datum_anzeige": clean_text(time_tag.get_text()) if time_tag else "",
+                "uhrzeit": clean_text(time_span.get_text()) if time_span else "",
+                "ort": ort_text,
+                "ticket_url": ticket_a['href'] if has_ticket else None
+            })
+
+    # --- 5. MEDIEN (Plakat, Video, Audio, Galerie) ---
+    
 # A) PLAKATMOTIV (Der neue Typ "plakat")
-        plakat_div = soup.find('div', class_='detail-plakatmotiv')
-        if plakat_div:
-            plakat_a = plakat_div.find('a', href=True)
-            if plakat_a:
-                cover_url = urljoin(BASE_URL, plakat_a['href'])
-                # HIER IST DIE ÄNDERUNG: typ="plakat"
-                data["medien"].append({"typ": "plakat", "url": cover_url})
-                
-        # B) Youtube Video
-        if soup.find('div', attrs={'data-plyr-provider': 'youtube'}):
-            data["flags"]["video"] = True
-            yt_id = soup.find('div', attrs={'data-plyr-provider': 'youtube'}).get('data-plyr-embed-id')
-            data["medien"].append({"typ": "youtube", "url": f"https://www.youtube.com/watch?v={yt_id}"})
+    plakat_div = soup.find('div', class_='detail-plakatmotiv')
+    if plakat_div:
+        plakat_a = plakat_div.find('a', href=True)
+        if plakat_a:
+            cover_url = urljoin(BASE_URL, plakat_a['href'])
+            # HIER IST DIE ÄNDERUNG: typ="plakat"
+            data["medien"].append({"typ": "plakat", "url": cover_url})
+            
+    # B) Youtube Video
+    youtube = soup.find('div', attrs={'data-plyr-provider': 'youtube'})
+    if youtube:
+        data["flags"]["video"] = True
+        yt_id = youtube.get('data-plyr-embed-id')
+        data["medien"].append({"typ": "youtube", "url": f"https://www.youtube.com/watch?v={yt_id}"})
+    
+    # C) Audio
+    audio = soup.find('audio')
+    if audio and audio.find('source'):
+        data["flags"]["audio"] = True
+        data["medien"].append({"typ": "audio", "url": urljoin(BASE_URL, audio.find('source')['src'])})
+
+    # D) Galerie Bilder
+    img_box = soup.find('div', class_='detail-image-box')
+    if img_box:
+        for a in img_box.find_all('a', class_='fancybox'):
+            if a.get('href') and "download" not in a.get('href', ''):
+                data["medien"].append({"typ": "bild", "url": urljoin(BASE_URL, a.get('href'))})
+
+    # 6. Presse
+    presse_div = soup.find('div', id='pressestimmen-content')
+    if presse_div:
+        for p in presse_div.find_all('p'):
+            t = clean_text(p.get_text())
+            if t: data["presse"].append(t)
+
+    return data
+
+def parse_index_page(html, backend=None):
+    """Liest die Stücke einer Index-Seite (Titel, Untertitel, Genre, URL)."""
+    soup = BeautifulSoup(html, parser_features(backend))
+    entries = []
+    for item in soup.find_all('li', class_='produktion-list-item'):
+        link = item.find('a', href=True)
+        if not link: continue
         
-        # C) Audio
-        audio = soup.find('audio')
-        if audio and audio.find('source'):
-            data["flags"]["audio"] = True
-            data["medien"].append({"typ": "audio", "url": urljoin(BASE_URL, audio.find('source')['src'])})
-
-        # D) Galerie Bilder
-        img_box = soup.find('div', class_='detail-image-box')
-        if img_box:
-            for a in img_box.find_all('a', class_='fancybox'):
-                if a.get('href') and "download" not in a.get('href', ''):
-                    data["medien"].append({"typ": "bild", "url": urljoin(BASE_URL, a.get('href'))})
-
-        # 6. Presse
-        presse_div = soup.find('div', id='pressestimmen-content')
-        if presse_div:
-            for p in presse_div.find_all('p'):
-                t = clean_text(p.get_text())
-                if t: data["presse"].append(t)
-
-        return data
-
-async def main():
-    logger.info("--- START SCRAPER ---")
+        href = link['href']
+        # Prüfen, ob es ein valider Link zum Stück ist
+        if "repertoire" not in href:
+             # Manchmal ist der Text-Link nicht der erste, wir suchen weiter
+             links = item.find_all('a', href=True)
+             for l in links:
+                 if "repertoire" in l['href']:
+                     link = l
+                     href = l['href']
+                     break
+             if "repertoire" not in href: continue
+
+        titel = clean_text(link.get_text())
+        if not titel: # Fallback, falls Link ein Bild war
+            titel_div = item.find('div', class_='termin-list-box')
+            if titel_div: titel = clean_text(titel_div.find('a').get_text())
+
+        full_url = urljoin(BASE_URL, href)
+
+        # Basis-Daten
+        info_div = item.find('div', class_='termin-list-box')
+        subtitel, genre = "", ""
+        if info_div and info_div.find('div'):
+            parts = [clean_text(x) for x in info_div.find('div').get_text("|").split("|") if clean_text(x)]
+            if len(parts) > 1: subtitel = parts[1]
+            if len(parts) > 2: genre = parts[2]
+
+        entries.append({"id": extract_id_from_url(full_url), "titel": titel, "subtitel": subtitel,
+                        "genre_liste": genre, "url": full_url})
+    return entries
+
+async def scrape_index_page(session, url, cache=None, pool=None, capture=None):
+    """Index-Seite laden und lesen (unveränderte Seiten aus dem Cache). None bei Fehler."""
+    html = await fetch_url(session, url, cache)
+    if html is NOT_MODIFIED: return cache.record(url)
+    if not html: return None
+    if capture: capture.add(url, "index", html)
+    entries = await parse_html(pool, parse_index_page, html)
+    if cache: cache.store(url, entries)
+    return entries
+
+def save_data(output_list, data_file=DATA_FILE):
+    """Schreibt data_file nur, wenn sich die Daten geändert haben (sonst kein neuer Commit)."""
+    if os.path.exists(data_file):
+        try:
+            with open(data_file, encoding='utf-8') as f:
+                if json.load(f).get("daten") == output_list:
+                    return False
+        except (OSError, ValueError):
+            pass
+    with open(data_file, 'w', encoding='utf-8') as f:
+        json.dump({"meta": {"generiert": datetime.now().strftime("%Y-%m-%d %H:%M:%S"), "anzahl": len(output_list)}, "daten": output_list}, f, ensure_ascii=False, indent=4)
+    return True
+
+async def main(data_file=DATA_FILE, cache_file=CACHE_FILE, capture=None):
+    """
+    Ein kompletter Lauf. cache_file=None: ohne Cache. capture: Verzeichnis für den
+    Korpus (dann ohne Cache, damit jede Seite vollständig ankommt).
+    Gibt die Anzahl der Stücke und abgerufenen Seiten zurück.
+    """
+    logger.info(f"--- START SCRAPER --- {BASE_URL}")
     merged_data = {}
     sem = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+    cache = HttpCache(cache_file) if cache_file and not capture else None
+    corpus = CorpusWriter(capture) if capture else None
+    pool = ProcessPoolExecutor(max_workers=PARSER_WORKERS) if PARSER_WORKERS else None
+    detail_tasks = {}
 
-    async with aiohttp.ClientSession() as session:
-        # SCHRITT 1: Index-Seiten laden
-        for source in SOURCES:
-            logger.info(f"Lade Index: {source['cat']} ({source['season']})")
-            html = await fetch_url(session, source['url'])
-            if not html: continue
-
-            soup = BeautifulSoup(html, 'html.parser')
-            items = soup.find_all('li', class_='produktion-list-item')
-
-            for item in items:
-                link = item.find('a', href=True)
-                if not link: continue
-                
-                href = link['href']
-                # Prüfen, ob es ein valider Link zum Stück ist
-                if "repertoire" not in href:
-                     # Manchmal ist der Text-Link nicht der erste, wir suchen weiter
-                     links = item.find_all('a', href=True)
-                     for l in links:
-                         if "repertoire" in l['href']:
-                             link = l
-                             href = l['href']
-                             break
-                     if "repertoire" not in href: continue
-
-                titel = clean_text(link.get_text())
-                if not titel: # Fallback, falls Link ein Bild war
-                    titel_div = item.find('div', class_='termin-list-box')
-                    if titel_div: titel = clean_text(titel_div.find('a').get_text())
-
-                full_url = urljoin(BASE_URL, href)
-                prod_id = extract_id_from_url(full_url)
-
-                # Basis-Daten
-                info_div = item.find('div', class_='termin-list-box')
-                subtitel, genre = "", ""
-                if info_div and info_div.find('div'):
-                    parts = [clean_text(x) for x in info_div.find('div').get_text("|").split("|") if clean_text(x)]
-                    if len(parts) > 1: subtitel = parts[1]
-                    if len(parts) > 2: genre = parts[2]
-
-                if prod_id not in merged_data:
-                    merged_data[prod_id] = {
-                        "id": prod_id,
-                        "titel": titel,
-                        "subtitel": subtitel,
-                        "genre_liste": genre,
-                        "url": full_url,
-                        "spielzeiten": set(),
-                        "kategorien": set(),
-                        "is_kjt": False
-                    }
+    try:
+        async with create_session() as session:
+            try:
+                # Index-Seiten parallel laden. Jedes gefundene Stück geht sofort in den
+                # Detail-Abruf, ohne auf die übrigen Index-Seiten zu warten
+                async def load_index(source):
+                    logger.info(f"Lade Index: {source['cat']} ({source['season']})")
+                    entries = await scrape_index_page(session, source['url'], cache, pool, corpus)
+                    for entry in entries or []:
+                        if entry["url"] not in detail_tasks:
+                            detail_tasks[entry["url"]] = asyncio.create_task(
+                                scrape_detail_page(session, entry["url"], sem, cache, pool, corpus))
+                    return entries
+
+                index_results = await asyncio.gather(*(load_index(source) for source in SOURCES))
+
+                # SCHRITT 1: Basis-Daten in der Reihenfolge von SOURCES zusammenführen (deterministisch,
+                # egal welche Index-Seite zuerst ankam)
+                for source, entries in zip(SOURCES, index_results):
+                    if not entries: continue
+
+                    for entry in entries:
+                        prod_id = entry["id"]
+                        if prod_id not in merged_data:
+                            merged_data[prod_id] = dict(entry, spielzeiten=set(), kategorien=set(), is_kjt=False)
                 
-                merged_data[prod_id]["spielzeiten"].add(source['season'])
-                merged_data[prod_id]["kategorien"].add(source['cat'])
-                if source['cat'] == "KJT": merged_data[prod_id]["is_kjt"] = True
-
-        # SCHRITT 2: Details laden
-        logger.info(f"Basis-Scan fertig. {len(merged_data)} Stücke gefunden. Lade Details...")
-        tasks = [scrape_detail_page(session, data["url"], sem) for data in merged_data.values()]
-        results = await asyncio.gather(*tasks)
-
-        for i, (pid, _) in enumerate(merged_data.items()):
-            details = results[i]
-            merged_data[pid].update(details)
-            merged_data[pid]["spielzeiten"] = sorted(list(merged_data[pid]["spielzeiten"]))
-            merged_data[pid]["kategorien"] = sorted(list(merged_data[pid]["kategorien"]))
+                        merged_data[prod_id]["spielzeiten"].add(source['season'])
+                        merged_data[prod_id]["kategorien"].add(source['cat'])
+                        if source['cat'] == "KJT": merged_data[prod_id]["is_kjt"] = True
+
+                # SCHRITT 2: Details (laufen schon seit dem Eintreffen der Index-Seiten)
+                logger.info(f"Basis-Scan fertig. {len(merged_data)} Stücke gefunden. Warte auf Details...")
+                details_by_url = dict(zip(detail_tasks, await asyncio.gather(*detail_tasks.values())))
+                results = [details_by_url[data["url"]] for data in merged_data.values()]
+
+                for i, (pid, _) in enumerate(merged_data.items()):
+                    details = results[i]
+                    merged_data[pid].update(details)
+                    merged_data[pid]["spielzeiten"] = sorted(list(merged_data[pid]["spielzeiten"]))
+                    merged_data[pid]["kategorien"] = sorted(list(merged_data[pid]["kategorien"]))
             
-            today = datetime.now().strftime("%Y-%m-%d")
-            future = [t['datum_iso'] for t in merged_data[pid].get('termine', []) if t['datum_iso'] and t['datum_iso'] >= today]
-            merged_data[pid]["naechster_termin_iso"] = min(future) if future else None
+                    today = datetime.now().strftime("%Y-%m-%d")
+                    future = [t['datum_iso'] for t in merged_data[pid].get('termine', []) if t['datum_iso'] and t['datum_iso'] >= today]
+                    merged_data[pid]["naechster_termin_iso"] = min(future) if future else None
+            finally:
+                # Nach einem Fehler keine Abrufe ohne Session weiterlaufen lassen
+                pending = [task for task in detail_tasks.values() if not task.done()]
+                for task in pending: task.cancel()
+                await asyncio.gather(*pending, return_exceptions=True)
+    finally:
+        # Auch nach einem Fehler: Parser-Prozesse beenden, Mitschnitt abschließen
+        if pool: pool.shutdown(cancel_futures=True)
+        if corpus: corpus.close()
+
+    if cache:
+        cache.save()
+        logger.info(cache.summary())
 
     # Speichern
     output_list = sorted(list(merged_data.values()), key=lambda x: x['titel'])
-    with open(DATA_FILE, 'w', encoding='utf-8') as f:
-        json.dump({"meta": {"generiert": datetime.now().strftime("%Y-%m-%d %H:%M:%S"), "anzahl": len(output_list)}, "daten": output_list}, f, ensure_ascii=False, indent=4)
-
-    logger.info(f"FERTIG: {len(output_list)} Stücke gespeichert.")
+    if save_data(output_list, data_file):
+        logger.info(f"FERTIG: {len(output_list)} Stücke gespeichert.")
+    else:
+        logger.info(f"FERTIG: {len(output_list)} Stücke, keine Änderungen - {data_file} bleibt unverändert.")
+    return {"stuecke": len(output_list), "seiten": len(SOURCES) + len(detail_tasks)}
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="WLT-Spielplan scrapen und als JSON speichern")
+    parser.add_argument('--base-url', help=f"anderer Host, z.B. http://127.0.0.1:8080 für wlt_standin.py (Standard {BASE_URL})")
+    parser.add_argument('--capture', metavar='DIR', help="HTML aller Seiten als Korpus für wlt_standin.py speichern (ohne Cache)")
+    parser.add_argument('--data-file', default=DATA_FILE)
+    parser.add_argument('--cache-file', default=CACHE_FILE)
+    parser.add_argument('--no-cache', action='store_true', help="ohne HTTP-Cache, alle Seiten neu laden und parsen")
+    parser.add_argument('--workers', type=int, default=None, help=f"Parser-Prozesse, 0 = im Event-Loop (Standard {PARSER_WORKERS})")
+    return parser.parse_args()
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    args = parse_args()
+    if args.base_url: set_base_url(args.base_url)
+    if args.workers is not None: PARSER_WORKERS = args.workers
+    asyncio.run(main(args.data_file, None if args.no_cache else args.cache_file, args.capture))
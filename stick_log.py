@@ -0,0 +1,135 @@
+"""
+Aufzeichnung und Wiedergabe von Controller-Eingaben.
+
+Eine Aufnahme ist ein kleiner Header plus ein Array fester 16-Byte-Einträge
+(Zeit, Bank, Art, Index, Wert) - genau die Eingänge, die die Engine aus den
+Joystick-Events übernimmt. Lange Proben bleiben damit klein (ein Event pro
+Stick-Bewegung, nicht pro Tick) und lassen sich per np.memmap öffnen, ohne
+die Datei in den Speicher zu laden.
+
+- StickRecorder: schreibt gepuffert aus dem Engine-Thread
+- load_stick_log: öffnet eine Aufnahme als memmap
+- StickReplay: liefert pro Tick die fälligen Einträge, in Originalzeit oder N-fach schneller
+"""
+import os
+import struct
+import time
+
+import numpy as np
+
+MAGIC = b'MA3STICK'
+VERSION = 1
+HEADER = struct.Struct('<8sHH12x')     # Magic, Version, Eintragsgröße -> 24 Byte
+
+RECORD_DTYPE = np.dtype([
+    ('t', '<f8'),       # Sekunden seit Aufnahmebeginn
+    ('bank', '<u2'),
+    ('kind', 'u1'),
+    ('index', 'u1'),    # Achse/Button, bei CONNECT die Anzahl der Achsen
+    ('value', '<f4'),   # Achsenwert, Button 0/1, bei CONNECT der Controller-Typ
+])
+
+# Arten von Einträgen
+AXIS = 0
+BUTTON = 1
+CONNECT = 2
+DISCONNECT = 3
+
+# Controller-Typ als Zahl (für CONNECT)
+CONTROLLER_TYPES = ('generic', 'xbox', 'playstation')
+
+
+class StickRecorder:
+    """Schreibt Eingaben gepuffert in eine Aufnahme-Datei"""
+
+    def __init__(self, path, buffer_size=4096):
+        self.path = path
+        self.file = open(path, 'wb')
+        self.file.write(HEADER.pack(MAGIC, VERSION, RECORD_DTYPE.itemsize))
+        self.buffer_size = buffer_size
+        self.buffer = []        # Tupel - billiger als einzelne Felder im Array zu setzen
+        self.count = 0
+        self.start = time.perf_counter()
+
+    def record(self, bank, kind, index, value):
+        self.buffer.append((time.perf_counter() - self.start, bank, kind, index, value))
+        if len(self.buffer) >= self.buffer_size:
+            self.flush()
+
+    def connect(self, bank, controller_type, num_axes):
+        code = CONTROLLER_TYPES.index(controller_type) if controller_type in CONTROLLER_TYPES else 0
+        self.record(bank, CONNECT, num_axes, code)
+
+    def flush(self):
+        if self.buffer:
+            self.file.write(np.array(self.buffer, dtype=RECORD_DTYPE).tobytes())
+            self.count += len(self.buffer)
+            self.buffer.clear()
+        self.file.flush()
+
+    def close(self):
+        self.flush()
+        self.file.close()
+
+
+def load_stick_log(path):
+    """Öffnet eine Aufnahme als (schreibgeschütztes) memmap-Array"""
+    with open(path, 'rb') as f:
+        header = f.read(HEADER.size)
+    if len(header) < HEADER.size:
+        raise ValueError(f"{path}: keine Stick-Aufnahme (zu kurz)")
+    magic, version, itemsize = HEADER.unpack(header)
+    if magic != MAGIC:
+        raise ValueError(f"{path}: keine Stick-Aufnahme")
+    if version != VERSION or itemsize != RECORD_DTYPE.itemsize:
+        raise ValueError(f"{path}: nicht unterstützte Version {version}")
+    # Nach einem Absturz mitten im Schreiben fehlt dem letzten Eintrag der Rest - nur ganze lesen
+    count = (os.path.getsize(path) - HEADER.size) // RECORD_DTYPE.itemsize
+    if count == 0:
+        return np.zeros(0, dtype=RECORD_DTYPE)     # leere Aufnahme - mmap geht bei Länge 0 nicht
+    return np.memmap(path, dtype=RECORD_DTYPE, mode='r', offset=HEADER.size, shape=(count,))
+
+
+class StickReplay:
+    """
+    Spielt eine Aufnahme in Echtzeit (speed=1) oder N-fach schneller ab.
+    due() gibt pro Tick alle Einträge zurück, deren Zeit erreicht ist.
+    """
+
+    def __init__(self, records, speed=1.0, loop=False):
+        if speed <= 0:
+            raise ValueError("speed muss größer als 0 sein")
+        self.records = records
+        self.times = records['t']
+        self.speed = speed
+        self.loop = loop
+        self.position = 0
+        self.start = None
+        self.loops = 0
+
+    @property
+    def duration(self):
+        return float(self.times[-1]) if len(self.times) else 0.0
+
+    @property
+    def finished(self):
+        return not self.loop and self.position >= len(self.records)
+
+    def due(self, now=None):
+        """Einträge bis zur aktuellen Aufnahmezeit (als Liste von Tupeln)"""
+        if now is None:
+            now = time.perf_counter()
+        if self.start is None:
+            self.start = now
+        if self.position >= len(self.records):
+            if not self.loop or not len(self.records):
+                return []
+            # Nächster Durchlauf beginnt, wo der letzte aufgehört hat
+            self.start += self.duration / self.speed
+            self.position = 0
+            self.loops += 1
+
+        position = self.position
+        end = int(np.searchsorted(self.times, (now - self.start) * self.speed, side='right'))
+        self.position = end
+        return self.records[position:end].tolist()
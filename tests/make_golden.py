@@ -0,0 +1,76 @@
+"""
+Erzeugt tests/fixtures/wlt_detail/expected.json mit scrape_detail_page() aus einem
+früheren Stand von scraper.py (Standard: vor dem Umbau auf Cache, Prozess-Pool und
+gezieltes Parsen). test_scraper_golden.py prüft, dass alle Parser-Backends dieselben
+Datensätze liefern. Nach neuen Seiten im Korpus neu erzeugen - nie mit dem
+aktuellen Parser, sonst prüft der Test nur sich selbst.
+
+    python tests/make_golden.py [--rev 063b4a4]
+"""
+import argparse
+import asyncio
+import json
+import subprocess
+import types
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+CORPUS = Path(__file__).resolve().parent / "fixtures" / "wlt_detail"
+BASELINE_REV = "063b4a4"    # letzter Stand mit dem ursprünglichen scrape_detail_page()
+
+
+class FakeResponse:
+    def __init__(self, html):
+        self.status = 200
+        self.html = html
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def text(self):
+        return self.html
+
+
+class FakeSession:
+    """Genug von aiohttp.ClientSession für fetch_url() des alten Stands"""
+
+    def __init__(self, html):
+        self.html = html
+
+    def get(self, url, **kwargs):
+        return FakeResponse(self.html)
+
+
+def load_scraper(rev):
+    source = subprocess.run(['git', 'show', f'{rev}:scraper.py'], capture_output=True, text=True,
+                            cwd=ROOT, check=True).stdout
+    module = types.ModuleType(f"scraper_{rev}")
+    exec(compile(source, f"scraper.py@{rev}", 'exec'), module.__dict__)
+    return module
+
+
+async def scrape_all(scraper, pages):
+    sem = asyncio.Semaphore(1)
+    return {name: await scraper.scrape_detail_page(FakeSession(html), f"{scraper.BASE_URL}/{name}", sem)
+            for name, html in pages.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rev', default=BASELINE_REV, help="git-Revision mit dem Referenz-Parser")
+    args = parser.parse_args()
+
+    scraper = load_scraper(args.rev)
+    pages = {path.name: path.read_text(encoding='utf-8') for path in sorted(CORPUS.glob("*.html"))}
+    expected = asyncio.run(scrape_all(scraper, pages))
+    with open(CORPUS / "expected.json", 'w', encoding='utf-8') as f:
+        json.dump({"rev": args.rev, "base_url": scraper.BASE_URL, "pages": expected}, f, ensure_ascii=False, indent=1)
+        f.write("\n")
+    print(f"✓ {len(expected)} Seiten mit scraper.py@{args.rev} -> {CORPUS / 'expected.json'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""Skalarer Weg und Array-Weg der AxisPipeline liefern dieselben Werte"""
+import numpy as np
+import pytest
+
+from axis_pipeline import SCALAR_MAX_BANKS, AxisPipeline
+
+CURVES = [{'type': 'linear'}, {'type': 'expo', 'amount': 0.4}, {'type': 'points', 'points': [[0, 0], [0.5, 0.2], [1, 1]]}]
+FILTERS = [{'type': 'lowpass'}, {'type': 'lowpass', 'time_constant_ms': 20},
+           {'type': 'one_euro', 'min_cutoff_ms': 50, 'beta': 10.0, 'derivative_ms': 30}]
+
+
+def make_pair(mode, curve, filter_config, count=3):
+    return [AxisPipeline(count, 0.15, mode, 1.0, 0.3, curve, filter_config, 0.3, 250, scalar=scalar)
+            for scalar in (True, False)]
+
+
+@pytest.mark.parametrize('mode', ['axial', 'radial'])
+@pytest.mark.parametrize('curve', CURVES, ids=[c['type'] for c in CURVES])
+@pytest.mark.parametrize('filter_config', FILTERS, ids=['smoothing', 'lowpass', 'one_euro'])
+def test_scalar_matches_array(mode, curve, filter_config):
+    rng = np.random.default_rng(7)
+    scalar, array = make_pair(mode, curve, filter_config)
+    for tick in range(400):
+        # Bewegung, dann Ruhe bis alles eingerastet ist; Bank 0 bleibt in der Deadzone
+        sticks = rng.uniform(-1, 1, (3, 4)) if tick < 150 else np.zeros((3, 4))
+        sticks[0] = [0.1, -0.05, 0.0, 0.12]
+        trigger = rng.uniform(0, 1, 3) if tick < 150 else np.zeros(3)
+        for pipeline in (scalar, array):
+            pipeline.input[:] = sticks
+            pipeline.trigger[:] = trigger
+            pipeline.process()
+            pipeline.smooth(0.004)
+        np.testing.assert_allclose(scalar.output, array.output, rtol=0, atol=1e-12)
+        np.testing.assert_allclose(scalar.smoothed, array.smoothed, rtol=0, atol=1e-12)
+        np.testing.assert_allclose(scalar.trigger_smoothed, array.trigger_smoothed, rtol=0, atol=1e-12)
+        assert scalar.settling.tolist() == array.settling.tolist(), tick
+    assert not scalar.settling.any()
+    assert scalar.smoothed.tolist() == [[0.0] * 4] * 3
+
+
+def test_scalar_only_given_rows():
+    pipeline = AxisPipeline(3, 0.15, 'radial', filter_config={'type': 'lowpass', 'time_constant_ms': 20})
+    pipeline.input[:] = 0.8
+    pipeline.process([1])
+    pipeline.smooth(0.01, [1])
+    assert pipeline.output[[0, 2]].tolist() == [[0.0] * 4] * 2
+    assert pipeline.smoothed[[0, 2]].tolist() == [[0.0] * 4] * 2
+    assert pipeline.output[1].min() > 0.0 and pipeline.smoothed[1].min() > 0.0
+    assert pipeline.settling.tolist() == [False, True, False]
+
+
+def test_path_by_bank_count():
+    assert AxisPipeline(SCALAR_MAX_BANKS, 0.15).scalar
+    assert not AxisPipeline(SCALAR_MAX_BANKS + 1, 0.15).scalar
@@ -0,0 +1,154 @@
+"""Prüfung der Konfiguration: gültige Defaults, abgelehnte Werte und Live-Reload"""
+import copy
+import json
+
+import pytest
+
+from config_snapshot import ConfigError, ConfigWatcher, load_config_file, merge_config, validate_config
+from xbox_to_ma3 import DEFAULT_CONFIG      # lädt config.json, pygame erst beim Start
+
+
+@pytest.fixture
+def config():
+    return copy.deepcopy(DEFAULT_CONFIG)
+
+
+def test_defaults_valid(config):
+    validate_config(config)
+
+
+# (Pfad, Wert, erwarteter Anfang der Fehlermeldung)
+INVALID = [
+    ('osc.host', '', "osc.host muss ein Hostname sein"),
+    ('osc.host', None, "osc.host muss ein Hostname sein"),
+    ('osc.port', 0, "osc.port muss mindestens 1 sein"),
+    ('osc.port', 65536, "osc.port darf höchstens 65535 sein"),
+    ('osc.port', 8000.0, "osc.port muss eine ganze Zahl sein"),
+    ('osc.port', True, "osc.port muss eine ganze Zahl sein"),
+    ('osc.port', "8000", "osc.port muss eine ganze Zahl sein"),
+    ('osc.fader_pan', 0, "osc.fader_pan muss mindestens 1 sein"),
+    ('osc.target_page', 1.5, "osc.target_page muss eine ganze Zahl sein"),
+    ('osc.deadband', 0.1, "osc.deadband muss ein Objekt sein"),
+    ('osc.deadband', {'zoom': 0.1}, "osc.deadband.zoom: unbekannter Fader"),
+    ('osc.deadband', {'pan': -0.1}, "osc.deadband.pan muss mindestens 0 sein"),
+    ('osc.deadband', {'pan': float('nan')}, "osc.deadband.pan muss eine Zahl sein"),
+    ('osc.keepalive_interval', -1, "osc.keepalive_interval muss mindestens 0 sein"),
+    ('osc.bundle', 1, "osc.bundle muss true oder false sein"),
+    ('osc.console_rate', -5, "osc.console_rate muss mindestens 0 sein"),
+    ('osc.console_burst', 0.5, "osc.console_burst muss mindestens 1 sein"),
+    ('osc.targets', {}, "osc.targets muss eine Liste sein"),
+    ('osc.targets', [{'port': 9000}], "osc.targets[0] braucht host und port"),
+    ('osc.targets', [{'host': 'a', 'port': 70000}], "osc.targets[0].port darf höchstens 65535 sein"),
+    ('controller.deadzone', 0.96, "controller.deadzone darf höchstens 0.95 sein"),
+    ('controller.deadzone', -0.1, "controller.deadzone muss mindestens 0 sein"),
+    ('controller.deadzone_mode', 'square', "controller.deadzone_mode muss radial oder axial sein"),
+    ('controller.sensitivity', float('inf'), "controller.sensitivity muss eine Zahl sein"),
+    ('controller.update_rate', 0, "controller.update_rate muss mindestens 1 sein"),
+    ('controller.update_rate', 5000, "controller.update_rate darf höchstens 2000 sein"),
+    ('controller.smoothing', 1.0, "controller.smoothing darf höchstens 0.99 sein"),
+    ('controller.response_curve', {'type': 'cubic'}, "controller.response_curve: Unbekannte Response-Kurve"),
+    ('controller.response_curve', {'type': 'points', 'points': [[0, 0]]}, "controller.response_curve: "),
+    ('controller.filter', {'type': 'kalman'}, "controller.filter: Unbekannter Filter"),
+    ('controller.filter', 'one_euro', "controller.filter muss ein Objekt sein"),
+    ('controller.filter', {'type': 'one_euro', 'derivative_ms': 0},
+     "controller.filter.derivative_ms muss größer als 0 sein"),
+    ('controller.filter', {'type': 'one_euro', 'min_cutoff_ms': -5},
+     "controller.filter.min_cutoff_ms muss größer als 0 sein"),
+    ('controller.filter', {'type': 'one_euro', 'min_cutoff_ms': True},
+     "controller.filter.min_cutoff_ms muss eine Zahl sein"),
+    ('controller.filter', {'type': 'one_euro', 'beta': -1.0}, "controller.filter.beta muss mindestens 0 sein"),
+    ('controller.filter', {'type': 'one_euro', 'beta': False}, "controller.filter.beta muss eine Zahl sein"),
+    ('controller.filter', {'type': 'one_euro', 'beta': float('nan')}, "controller.filter.beta muss eine Zahl sein"),
+    ('controller.filter', {'type': 'lowpass', 'time_constant_ms': 0},
+     "controller.filter.time_constant_ms muss größer als 0 sein"),
+    ('controller.filter', {'type': 'lowpass', 'time_constant_ms': '20'},
+     "controller.filter.time_constant_ms muss eine Zahl sein"),
+    ('features.live_reload', 'yes', "features.live_reload muss true oder false sein"),
+    ('metrics.enabled', None, "metrics.enabled muss true oder false sein"),
+    ('metrics.json_interval', 0, "metrics.json_interval muss größer als 0 sein"),
+    ('metrics.prometheus_port', -1, "metrics.prometheus_port muss mindestens 0 sein"),
+    ('direct.mode', 'fast', "direct.mode muss relative oder absolute sein"),
+    ('direct.rate', 0, "direct.rate muss größer als 0 sein"),
+    ('direct.address', 'cmd', "direct.address muss mit / beginnen"),
+    ('shared_state.name', '', "shared_state.name muss ein Name ohne / sein"),
+    ('shared_state.name', 'a/b', "shared_state.name muss ein Name ohne / sein"),
+    ('shared_state.ring_size', 0, "shared_state.ring_size muss mindestens 1 sein"),
+    ('controllers', {}, "controllers muss eine Liste sein"),
+    ('controllers', ['Spot 1'], "controllers[0] muss ein Objekt sein"),
+    ('controllers', [{'fader_tilt': -2}], "controllers[0].fader_tilt muss mindestens 1 sein"),
+    ('ui.window_width', 0, "ui.window_width muss mindestens 1 sein"),
+    ('ui.refresh_rate', 0, "ui.refresh_rate muss größer als 0 sein"),
+]
+
+
+def set_path(config, path, value):
+    *sections, key = path.split('.')
+    target = config
+    for section in sections:
+        target = target[section]
+    target[key] = value
+
+
+@pytest.mark.parametrize('path,value,message', INVALID, ids=[f"{p}={v!r}" for p, v, _ in INVALID])
+def test_rejects(config, path, value, message):
+    set_path(config, path, value)
+    with pytest.raises(ConfigError) as excinfo:
+        validate_config(config)
+    assert len(excinfo.value.errors) == 1
+    assert excinfo.value.errors[0].startswith(message)
+
+
+@pytest.mark.parametrize('section', ['osc', 'controller', 'features', 'metrics', 'direct', 'shared_state', 'ui'])
+def test_rejects_missing_section(config, section):
+    config[section] = []
+    with pytest.raises(ConfigError) as excinfo:
+        validate_config(config)
+    assert excinfo.value.errors == [f"{section} muss ein Objekt sein"]
+
+
+def test_collects_all_errors(config):
+    config['osc']['port'] = 0
+    config['controller']['deadzone'] = 2
+    config['ui']['refresh_rate'] = -1
+    with pytest.raises(ConfigError) as excinfo:
+        validate_config(config)
+    assert [error.split(' ')[0] for error in excinfo.value.errors] == \
+        ['osc.port', 'controller.deadzone', 'ui.refresh_rate']
+    assert isinstance(excinfo.value, ValueError)
+
+
+def test_merge_keeps_defaults(config):
+    merged = merge_config(config, {'osc': {'port': 9000}, 'controllers': [{'name': 'Spot 1'}]})
+    assert merged['osc']['port'] == 9000
+    assert merged['osc']['host'] == config['osc']['host']
+    assert config == DEFAULT_CONFIG
+
+
+def test_load_rejects_non_object(tmp_path):
+    path = tmp_path / "config.json"
+    path.write_text("[1, 2]")
+    with pytest.raises(ConfigError):
+        load_config_file(path, DEFAULT_CONFIG)
+
+
+def test_watcher_keeps_snapshot_on_invalid_file(tmp_path):
+    path = tmp_path / "config.json"
+    path.write_text(json.dumps({'osc': {'port': 8000}}))
+    changes, rejects = [], []
+    watcher = ConfigWatcher(path, DEFAULT_CONFIG, lambda snapshot, restart: changes.append((snapshot, restart)),
+                            rejects.append)
+
+    path.write_text(json.dumps({'osc': {'port': 0}}) + " ")
+    assert not watcher.check()
+    assert len(rejects) == 1 and isinstance(rejects[0], ConfigError)
+    assert watcher.config['osc']['port'] == 8000
+
+    path.write_text("{\"osc\": {\"port\": 8")     # halb geschrieben
+    assert not watcher.check()
+    assert len(rejects) == 2
+
+    path.write_text(json.dumps({'osc': {'port': 9000}}))
+    assert watcher.check()
+    snapshot, restart = changes[0]
+    assert snapshot.version == 1
+    assert restart == ['osc.port']
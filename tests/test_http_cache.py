@@ -0,0 +1,232 @@
+"""
+Bedingte Requests des Scrapers: 304 und gleicher Inhalt (Server ohne 304) liefern
+den gespeicherten Datensatz, ohne die Seite neu zu parsen. Gegen einen lokalen
+aiohttp-Server, der ETags wahlweise auswertet oder ignoriert.
+"""
+import asyncio
+import contextlib
+
+import pytest
+from aiohttp import web
+
+import scraper
+from scraper import HttpCache
+
+URL = "http://wlt.test/stueck/1"
+PAGE = b"<html><body><h1>Stueck</h1></body></html>"
+
+
+def test_conditional_headers_only_with_record():
+    cache = HttpCache(None)
+    assert cache.conditional_headers(URL) == {}
+    assert not cache.unchanged(URL, {"ETag": '"v1"', "Last-Modified": "Mon, 01 Jan 2024 00:00:00 GMT"}, PAGE)
+    assert cache.conditional_headers(URL) == {}         # noch kein Datensatz
+    cache.store(URL, {"title": "Stück"})
+    assert cache.conditional_headers(URL) == {"If-None-Match": '"v1"',
+                                              "If-Modified-Since": "Mon, 01 Jan 2024 00:00:00 GMT"}
+    assert cache.stats["requests"] == 3
+
+
+def test_same_hash_reuses_record():
+    cache = HttpCache(None)
+    cache.unchanged(URL, {}, PAGE)
+    cache.store(URL, {"title": "Stück"})
+    assert cache.unchanged(URL, {"ETag": '"v2"'}, PAGE)
+    assert cache.record(URL) == {"title": "Stück"}
+    assert cache.entries[URL]["etag"] == '"v2"'         # neue Validatoren übernommen
+    assert cache.stats["unchanged"] == 1
+
+
+def test_changed_hash_drops_record():
+    cache = HttpCache(None)
+    cache.unchanged(URL, {"ETag": '"v1"'}, PAGE)
+    cache.store(URL, {"title": "Stück"})
+    assert not cache.unchanged(URL, {}, PAGE + b" ")
+    assert cache.record(URL) is None
+    assert cache.conditional_headers(URL) == {}
+
+
+def test_not_modified_counts_saved_bytes():
+    cache = HttpCache(None)
+    cache.unchanged(URL, {"ETag": '"v1"'}, PAGE)
+    cache.store(URL, {})
+    cache.not_modified(URL)
+    assert cache.stats["not_modified"] == 1
+    assert cache.stats["bytes_saved"] == len(PAGE)
+
+
+def test_save_keeps_only_used_entries_with_record(tmp_path):
+    path = str(tmp_path / "cache.json")
+    cache = HttpCache(path)
+    for url, record in ((URL, {"title": "a"}), (URL + "/alt", {"title": "b"}), (URL + "/neu", None)):
+        cache.conditional_headers(url)
+        cache.unchanged(url, {"ETag": '"v1"'}, PAGE)
+        cache.store(url, record)
+    cache.save()
+
+    reloaded = HttpCache(path)
+    assert sorted(reloaded.entries) == [URL, URL + "/alt"]
+    reloaded.conditional_headers(URL)                   # /alt kommt in diesem Lauf nicht mehr vor
+    reloaded.save()
+    assert list(HttpCache(path).entries) == [URL]
+
+
+def test_version_change_starts_empty(tmp_path, monkeypatch):
+    path = str(tmp_path / "cache.json")
+    cache = HttpCache(path)
+    cache.conditional_headers(URL)
+    cache.unchanged(URL, {}, PAGE)
+    cache.store(URL, {})
+    cache.save()
+    monkeypatch.setattr(scraper, 'CACHE_VERSION', scraper.CACHE_VERSION + 1)
+    assert HttpCache(path).entries == {}
+
+
+def test_parser_change_starts_empty(tmp_path, monkeypatch):
+    if scraper.ElementFilter is None:
+        pytest.skip("gezieltes Parsen braucht beautifulsoup4 >= 4.13")
+    path = str(tmp_path / "cache.json")
+    cache = HttpCache(path)
+    cache.conditional_headers(URL)
+    cache.unchanged(URL, {}, PAGE)
+    cache.store(URL, {})
+    cache.save()
+    assert list(HttpCache(path).entries) == [URL]
+    monkeypatch.setattr(scraper, 'PARSE_TARGETED', not scraper.PARSE_TARGETED)
+    assert HttpCache(path).entries == {}
+
+
+def test_unreadable_cache_starts_empty(tmp_path):
+    path = tmp_path / "cache.json"
+    path.write_text("{kaputt")
+    assert HttpCache(str(path)).entries == {}
+
+
+class Server:
+    """Liefert PAGE mit ETag; honor_etag=False spielt einen Server ohne 304"""
+
+    def __init__(self, honor_etag):
+        self.honor_etag = honor_etag
+        self.body = PAGE
+        self.requests = []
+
+    async def handle(self, request):
+        self.requests.append(dict(request.headers))
+        etag = '"%d"' % len(self.body)
+        if self.honor_etag and request.headers.get("If-None-Match") == etag:
+            return web.Response(status=304)
+        return web.Response(body=self.body, content_type="text/html", headers={"ETag": etag})
+
+
+@contextlib.asynccontextmanager
+async def serve(server):
+    """Startet server auf einem freien Port, liefert die URL der Seite"""
+    app = web.Application()
+    app.router.add_get("/stueck/1", server.handle)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    try:
+        yield f"http://127.0.0.1:{port}/stueck/1"
+    finally:
+        await runner.cleanup()
+
+
+async def crawl(server, cache, runs):
+    """Ruft die Seite einmal pro Eintrag in runs über scrape_detail_page ab, gibt die Datensätze zurück"""
+    records = []
+    async with serve(server) as url, scraper.create_session() as session:
+        sem = asyncio.Semaphore(1)
+        for run in runs:
+            run(server)
+            records.append(await scraper.scrape_detail_page(session, url, sem, cache))
+    return records
+
+
+@pytest.fixture
+def parses(monkeypatch):
+    """Zählt die Parser-Aufrufe, Datensatz = Länge der Seite"""
+    calls = []
+
+    def parse(html):
+        calls.append(html)
+        return {"length": len(html)}
+    monkeypatch.setattr(scraper, 'parse_detail_page', parse)
+    return calls
+
+
+def unchanged(server):
+    pass
+
+
+def edited(server):
+    server.body = PAGE.replace(b"Stueck", b"Stueck (neu)")
+
+
+@pytest.mark.parametrize('honor_etag', [True, False], ids=['304', 'same-hash'])
+def test_scrape_reuses_record(honor_etag, parses):
+    server = Server(honor_etag)
+    cache = HttpCache(None)
+    records = asyncio.run(crawl(server, cache, [unchanged, unchanged, edited, unchanged]))
+
+    assert records == [{"length": len(PAGE)}] * 2 + [{"length": len(server.body)}] * 2
+    assert len(parses) == 2                             # nur erster Abruf und geänderte Seite
+    assert [request.get("If-None-Match") for request in server.requests] == \
+        [None, '"%d"' % len(PAGE), '"%d"' % len(PAGE), '"%d"' % len(server.body)]
+    if honor_etag:
+        assert (cache.stats["not_modified"], cache.stats["unchanged"]) == (2, 0)
+        assert cache.stats["bytes_saved"] == len(PAGE) + len(server.body)
+    else:
+        assert (cache.stats["not_modified"], cache.stats["unchanged"]) == (0, 2)
+
+
+def test_fetch_without_cache_returns_text():
+    server = Server(True)
+
+    async def fetch():
+        async with serve(server) as url, scraper.create_session() as session:
+            return await scraper.fetch_url(session, url)
+
+    assert asyncio.run(fetch()) == PAGE.decode()
+    assert "If-None-Match" not in server.requests[0]
+
+
+def test_failed_run_cleans_up(tmp_path, monkeypatch):
+    """Fällt eine Index-Seite aus, werden offene Details abgebrochen, Pool und Korpus geschlossen"""
+    pools, cancelled = [], []
+
+    class Pool:
+        def __init__(self, max_workers):
+            self.shut_down = False
+            pools.append(self)
+
+        def shutdown(self, wait=True, cancel_futures=False):
+            self.shut_down = cancel_futures
+
+    async def index_page(session, url, cache=None, pool=None, capture=None):
+        if url.endswith("/kaputt"):
+            await asyncio.sleep(0.01)
+            raise RuntimeError("Index kaputt")
+        return [{"id": "1", "url": URL, "titel": "Stück"}]
+
+    async def detail_page(session, url, sem, cache=None, pool=None, capture=None):
+        try:
+            await asyncio.sleep(60)
+        except asyncio.CancelledError:
+            cancelled.append(url)
+            raise
+
+    monkeypatch.setattr(scraper, 'SOURCES', [{"url": "http://wlt.test/a", "cat": "A", "season": "x"},
+                                             {"url": "http://wlt.test/kaputt", "cat": "B", "season": "x"}])
+    monkeypatch.setattr(scraper, 'ProcessPoolExecutor', Pool)
+    monkeypatch.setattr(scraper, 'scrape_index_page', index_page)
+    monkeypatch.setattr(scraper, 'scrape_detail_page', detail_page)
+    data_file = tmp_path / "data.json"
+    with pytest.raises(RuntimeError, match="Index kaputt"):
+        asyncio.run(scraper.main(str(data_file), None, capture=str(tmp_path / "korpus")))
+    assert cancelled == [URL]
+    assert len(pools) == 1 and pools[0].shut_down
+    assert (tmp_path / "korpus" / "manifest.json").exists()
+    assert not data_file.exists()
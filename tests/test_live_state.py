@@ -0,0 +1,149 @@
+"""Live-Zustand im Shared Memory: Ring-Umlauf, verworfene Slots, Seqlock und Besitz des Blocks"""
+import subprocess
+import sys
+import uuid
+from types import SimpleNamespace
+
+import pytest
+
+from live_state import VALUE_FIELDS, LiveStatePublisher, LiveStateReader
+
+
+def make_bank(index, name="Spot"):
+    bank = SimpleNamespace(index=index, name=f"{name} {index + 1}", page=1 + index, generation=1,
+                           faders={'pan': 201, 'tilt': 202, 'dimmer': 203, 'fine_pan': 204, 'fine_tilt': 205},
+                           button_states={0: False, 3: False}, joystick=None)
+    set_values(bank, 0.0)
+    return bank
+
+
+def set_values(bank, value):
+    """Alle Werte einer Bank auf value (ganzzahlig, damit float32 exakt bleibt)"""
+    for offset, field in enumerate(VALUE_FIELDS):
+        setattr(bank, field, value + offset)
+
+
+@pytest.fixture
+def name():
+    return f"ma3_test_{uuid.uuid4().hex[:12]}"
+
+
+@pytest.fixture
+def open_state(name):
+    """Publisher und Reader unter einem eindeutigen Namen, werden am Ende geschlossen"""
+    opened = []
+
+    def open_state(bank_count, ring_size):
+        publisher = LiveStatePublisher(name, bank_count, ring_size)
+        opened.append(publisher)
+        reader = LiveStateReader(name)
+        opened.insert(0, reader)
+        return publisher, reader
+    yield open_state
+    for item in opened:
+        item.close()
+
+
+def test_ring_wraparound(open_state):
+    publisher, reader = open_state(1, 4)
+    bank = make_bank(0)
+    for i in range(10):
+        set_values(bank, i * 10)
+        publisher.publish([bank])
+
+    samples, position = reader.since(0)
+    assert position == reader.head == 10
+    assert list(samples['seq']) == [7, 8, 9, 10]            # nur die letzten ring_size
+    assert list(samples['pan_val']) == [60, 70, 80, 90]
+    assert list(samples['tilt_fine_raw']) == [68, 78, 88, 98]
+
+    assert len(reader.since(position)[0]) == 0
+    for i in range(10, 12):
+        set_values(bank, i * 10)
+        publisher.publish([bank])
+    samples, position = reader.since(position)
+    assert list(samples['seq']) == [11, 12]
+    assert position == 12
+
+    # Zu spät gelesen: die überschriebenen Samples fehlen, der Rest kommt in Reihenfolge
+    samples, _ = reader.since(5)
+    assert list(samples['seq']) == [9, 10, 11, 12]
+
+
+def test_ring_several_banks(open_state):
+    publisher, reader = open_state(2, 3)
+    banks = [make_bank(0), make_bank(1)]
+    for i in range(3):
+        for bank in banks:
+            set_values(bank, i * 10 + bank.index)
+        publisher.publish(banks)
+    samples, position = reader.since(0)
+    assert position == 6
+    assert list(samples['seq']) == [4, 5, 6]
+    assert list(samples['bank']) == [1, 0, 1]
+    assert list(samples['pan_val']) == [11, 20, 21]
+
+
+def test_ring_skips_invalid_slot(open_state):
+    """Ein Slot mit seq 0 (wird gerade geschrieben) oder falscher Nummer fällt raus"""
+    publisher, reader = open_state(1, 4)
+    bank = make_bank(0)
+    for _ in range(6):
+        publisher.publish([bank])
+    publisher.ring['seq'][(5 - 1) % 4] = 0
+    publisher.ring['seq'][(6 - 1) % 4] = 2          # schon von einem anderen Umlauf
+    samples, position = reader.since(0)
+    assert list(samples['seq']) == [3, 4]
+    assert position == 6
+
+
+def test_latest(open_state):
+    publisher, reader = open_state(2, 8)
+    banks = [make_bank(0), make_bank(1)]
+    banks[1].button_states = {0: True, 3: True, 5: False}
+    banks[1].joystick = object()
+    set_values(banks[1], 40)
+    publisher.describe(banks)
+    publisher.publish(banks)
+    publisher.publish([banks[1]])
+
+    assert reader.bank_names() == ["Spot 1", "Spot 2"]
+    assert list(reader.info['page']) == [1, 2]
+    value = reader.latest(1)
+    assert value['seq'] == 4
+    assert value['pan_val'] == 40 and value['tilt_fine_raw'] == 48
+    assert value['buttons'] == 0b1001
+    assert value['connected'] == 1
+    assert reader.latest(0)['connected'] == 0
+
+
+def test_latest_waits_for_writer(open_state):
+    publisher, reader = open_state(1, 4)
+    publisher.publish([make_bank(0)])
+    publisher.banks['seq'][0] = 3                   # Schreiber mitten im Block
+    with pytest.raises(TimeoutError):
+        reader.latest(0, retries=5)
+
+
+def test_second_publisher_refused(name, open_state):
+    publisher, reader = open_state(1, 4)
+    publisher.publish([make_bank(0)])
+    with pytest.raises(FileExistsError, match="laufenden Bridge"):
+        LiveStatePublisher(name, 1, 4)
+    # Der Block der laufenden Bridge bleibt unverändert
+    assert reader.head == 1
+    assert reader.since(0)[0]['seq'].tolist() == [1]
+
+
+def test_stale_block_replaced(name, open_state):
+    """Der Block einer abgestürzten Bridge wird ersetzt, auch mit anderem Layout"""
+    stale = LiveStatePublisher(name, 1, 4)
+    try:
+        dead = subprocess.Popen([sys.executable, "-c", "pass"])
+        dead.wait()
+        stale.header['pid'] = dead.pid
+        publisher, reader = open_state(2, 16)
+        assert reader.bank_count == 2 and reader.ring_size == 16
+        assert reader.head == 0
+    finally:
+        stale.close()
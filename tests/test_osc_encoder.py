@@ -0,0 +1,141 @@
+"""Vorkodierte OSC-Nachrichten und Bundles müssen Byte für Byte python-osc entsprechen"""
+import socket
+
+import pytest
+
+pythonosc = pytest.importorskip("pythonosc")
+from pythonosc.osc_bundle import OscBundle
+from pythonosc.osc_bundle_builder import IMMEDIATELY, OscBundleBuilder
+from pythonosc.osc_message_builder import OscMessageBuilder
+
+from osc_encoder import OscBundleEncoder, OscMessageEncoder, OscStringEncoder, RawOscSender
+
+# Adresslängen für alle vier Padding-Fälle
+ADDRESSES = ['/a', '/ab', '/abc', '/abcd', '/Page1/Fader201', '/13.13.1.5.201']
+
+
+def reference(address, *args):
+    builder = OscMessageBuilder(address)
+    for value, typetag in args:
+        builder.add_arg(value, typetag)
+    return builder.build()
+
+
+@pytest.mark.parametrize('address', ADDRESSES)
+@pytest.mark.parametrize('value', [0.0, 50.0, 12.345, -1.0, 100.0])
+def test_float_message_matches_python_osc(address, value):
+    encoder = OscMessageEncoder(address)
+    assert bytes(encoder.encode(value)) == reference(address, (value, 'f')).dgram
+
+
+@pytest.mark.parametrize('address', ADDRESSES)
+@pytest.mark.parametrize('value', [0, 1, -7, 2 ** 31 - 1])
+def test_int_message_matches_python_osc(address, value):
+    encoder = OscMessageEncoder(address, 'i')
+    assert bytes(encoder.encode(value)) == reference(address, (value, 'i')).dgram
+
+
+def test_message_buffer_is_reused():
+    encoder = OscMessageEncoder('/Page1/Fader201')
+    first = encoder.encode(10.0)
+    second = encoder.encode(20.0)
+    assert first is second
+    assert bytes(second) == reference('/Page1/Fader201', (20.0, 'f')).dgram
+
+
+def test_unsupported_typetag():
+    with pytest.raises(ValueError):
+        OscMessageEncoder('/a', 's')
+
+
+@pytest.mark.parametrize('text', ["", "Go+", "Attribute 'Pan' At + 0.420", "Fixture 12 Attribute 'Dimmer' At 50.0"])
+def test_string_message_matches_python_osc(text):
+    assert OscStringEncoder('/cmd').encode(text) == reference('/cmd', (text, 's')).dgram
+
+
+def test_bundle_matches_python_osc():
+    encoders = [OscMessageEncoder(address) for address in ADDRESSES]
+    builder = OscBundleBuilder(IMMEDIATELY)
+    bundle = OscBundleEncoder()
+    bundle.begin()
+    for i, encoder in enumerate(encoders):
+        value = i * 10.5
+        bundle.add(encoder.encode(value))
+        builder.add_content(reference(ADDRESSES[i], (value, 'f')))
+    assert bytes(bundle.finish()) == builder.build().dgram
+
+
+def test_bundle_reuse_and_parse():
+    bundle = OscBundleEncoder()
+    encoder = OscMessageEncoder('/Page1/Fader202')
+    for value in (1.0, 2.0):
+        bundle.begin()
+        bundle.add(encoder.encode(value))
+        bundle.add(encoder.encode(value + 0.5))
+        parsed = OscBundle(bytes(bundle.finish()))
+        assert [message.params for message in parsed] == [[value], [value + 0.5]]
+
+
+def test_bundle_fits_max_size():
+    message = OscMessageEncoder('/Page1/Fader201').encode(1.0)
+    bundle = OscBundleEncoder(max_size=16 + 2 * (4 + len(message)))
+    bundle.begin()
+    for _ in range(2):
+        assert bundle.fits(message)
+        bundle.add(message)
+    assert not bundle.fits(message)
+    assert len(bundle.finish()) == 16 + 2 * (4 + len(message))
+
+
+def receive(sock):
+    sock.settimeout(1.0)
+    return sock.recv(2048)
+
+
+def test_raw_sender_ipv4():
+    receiver = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    receiver.bind(('127.0.0.1', 0))
+    sender = RawOscSender('127.0.0.1', receiver.getsockname()[1])
+    data = OscMessageEncoder('/a').encode(1.0)
+    try:
+        assert sender.send(data) == len(data)
+        assert receive(receiver) == bytes(data)
+    finally:
+        sender.close()
+        receiver.close()
+
+
+def test_raw_sender_ipv6():
+    if not socket.has_ipv6:
+        pytest.skip("kein IPv6")
+    try:
+        receiver = socket.socket(socket.AF_INET6, socket.SOCK_DGRAM)
+        receiver.bind(('::1', 0))
+    except OSError:
+        pytest.skip("::1 nicht verfügbar")
+    sender = RawOscSender('::1', receiver.getsockname()[1])
+    data = OscMessageEncoder('/a').encode(1.0)
+    try:
+        assert sender.sock.family == socket.AF_INET6
+        assert sender.send(data) == len(data)
+        assert receive(receiver) == bytes(data)
+    finally:
+        sender.close()
+        receiver.close()
+
+
+def test_raw_sender_error_returns_zero():
+    # Port ohne Empfänger: spätestens das zweite send() scheitert (ICMP "Port unreachable")
+    probe = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    probe.bind(('127.0.0.1', 0))
+    port = probe.getsockname()[1]
+    probe.close()
+    sender = RawOscSender('127.0.0.1', port)
+    data = OscMessageEncoder('/a').encode(1.0)
+    try:
+        results = [sender.send(data) for _ in range(3)]
+    finally:
+        sender.close()
+    if sender.error_count == 0:
+        pytest.skip("kein ICMP-Fehler auf diesem System")
+    assert results.count(0) == sender.error_count
@@ -0,0 +1,184 @@
+"""Change-Detection, Deadband, Keepalive und Senderate der OSC-Ausgabe (Werte exakt als float32 darstellbar)"""
+import pytest
+
+from pythonosc.osc_bundle import OscBundle
+from pythonosc.osc_message import OscMessage
+
+from osc_output import OscOutput, TokenBucket
+
+
+class FakeSender:
+    """Sammelt die Pakete statt sie zu senden; accept=False spielt einen Sendefehler"""
+
+    def __init__(self):
+        self.packets = []
+        self.accept = True
+
+    def send(self, data):
+        if not self.accept:
+            return 0
+        self.packets.append(bytes(data))
+        return len(data)
+
+    def messages(self):
+        """Alle gesendeten (Adresse, Wert), Bundles aufgelöst"""
+        result = []
+        for packet in self.packets:
+            items = OscBundle(packet) if OscBundle.dgram_is_bundle(packet) else [OscMessage(packet)]
+            result.extend((message.address, message.params[0]) for message in items)
+        return result
+
+
+@pytest.fixture
+def sender():
+    return FakeSender()
+
+
+def make_output(sender, **kwargs):
+    output = OscOutput(sender, **kwargs)
+    output.add_channel('fader', '/Page1/Fader201', deadband=0.5)
+    output.add_channel('key', '/Page1/Key201', typetag='i')
+    return output
+
+
+def step(output, name, value):
+    sent = output.send(name, value)
+    output.flush()
+    return sent
+
+
+def test_first_value_is_sent(sender):
+    output = make_output(sender, keepalive_interval=0)
+    assert step(output, 'fader', 10.0)
+    assert step(output, 'key', 1)
+    assert sender.messages() == [('/Page1/Fader201', 10.0), ('/Page1/Key201', 1)]
+
+
+def test_equal_value_suppressed(sender):
+    output = make_output(sender, keepalive_interval=0)
+    step(output, 'fader', 10.0)
+    assert not step(output, 'fader', 10.0)
+    assert not step(output, 'fader', 10.0)
+    assert output.packet_count == 1
+    assert output.suppressed_count == 2
+
+
+def test_deadband(sender):
+    output = make_output(sender, keepalive_interval=0)
+    step(output, 'fader', 10.0)
+    assert not step(output, 'fader', 10.125)    # unter der Deadband
+    assert not step(output, 'fader', 10.375)
+    assert step(output, 'fader', 10.625)        # 0.625 vom letzten gesendeten Wert
+    assert sender.messages() == [('/Page1/Fader201', 10.0), ('/Page1/Fader201', 10.625)]
+
+
+def test_small_change_sent_once_settled(sender):
+    """Bleibt der Wert innerhalb der Deadband stehen, wird er nachgereicht"""
+    output = make_output(sender, keepalive_interval=0)
+    step(output, 'fader', 10.0)
+    assert not step(output, 'fader', 10.25)
+    assert step(output, 'fader', 10.25)
+    assert not step(output, 'fader', 10.25)
+    assert sender.messages()[-1] == ('/Page1/Fader201', 10.25)
+    assert output.packet_count == 2
+
+
+def test_bundle_one_packet_per_flush(sender):
+    output = make_output(sender, keepalive_interval=0, bundle=True)
+    output.send('fader', 42.0)
+    output.send('key', 1)
+    output.flush()
+    assert len(sender.packets) == 1
+    assert sender.messages() == [('/Page1/Fader201', 42.0), ('/Page1/Key201', 1)]
+
+
+def test_keepalive_resends_everything(sender):
+    output = make_output(sender, keepalive_interval=1.0)
+    output.last_keepalive = 100.0
+    step(output, 'fader', 10.0)
+    step(output, 'key', 0)
+    output.keepalive(100.5)
+    output.flush()
+    assert output.packet_count == 2
+    output.keepalive(101.0)
+    output.flush()
+    assert sender.messages()[2:] == [('/Page1/Fader201', 10.0), ('/Page1/Key201', 0)]
+
+
+def test_resync_uses_last_requested_value(sender):
+    """Nach einem unterdrückten Wert schickt der Resync den zuletzt angefragten"""
+    output = make_output(sender, keepalive_interval=0)
+    step(output, 'fader', 10.0)
+    step(output, 'fader', 10.25)
+    output.resync()
+    output.flush()
+    assert sender.messages()[-1] == ('/Page1/Fader201', 10.25)
+
+
+def test_failed_send_not_counted(sender):
+    output = make_output(sender, keepalive_interval=0)
+    sender.accept = False
+    step(output, 'fader', 10.0)
+    assert output.packet_count == 0
+    assert output.byte_count == 0
+    sender.accept = True
+    step(output, 'fader', 20.0)
+    assert output.packet_count == 1
+    assert output.byte_count == len(sender.packets[0])
+
+
+def test_bucket_burst_then_rate():
+    bucket = TokenBucket(10.0, burst=3)
+    bucket.last = 0.0
+    assert [bucket.take(0.0) for _ in range(4)] == [True, True, True, False]
+    assert not bucket.take(0.05)                # erst ein halbes Token
+    assert bucket.take(0.1)
+    assert not bucket.take(0.1)
+
+
+def test_bucket_refill_capped_at_burst():
+    bucket = TokenBucket(10.0, burst=2)
+    bucket.last = 0.0
+    assert [bucket.take(60.0) for _ in range(3)] == [True, True, False]
+
+
+@pytest.mark.parametrize('rate', [0, -1.0])
+def test_bucket_rejects_rate(rate):
+    with pytest.raises(ValueError):
+        TokenBucket(rate)
+
+
+def test_bucket_burst_at_least_one():
+    bucket = TokenBucket(10.0, burst=0)
+    assert bucket.burst == 1.0
+    bucket.last = 0.0
+    assert bucket.take(0.0)
+    assert not bucket.take(0.0)
+
+
+def test_rate_holds_and_coalesces(sender):
+    output = make_output(sender, keepalive_interval=0, rate=10.0, burst=1)
+    output.bucket.last = 0.0
+    output.send('fader', 10.0)
+    output.flush(0.0)
+    for i, now in enumerate((0.025, 0.05, 0.075)):
+        output.send('fader', 20.0 + i)
+        output.flush(now)
+    assert output.held_count == 3
+    assert output.coalesced_count == 2
+    output.flush(0.1)
+    # Dazwischen geht nur der letzte Wert raus
+    assert sender.messages() == [('/Page1/Fader201', 10.0), ('/Page1/Fader201', 22.0)]
+    assert output.sent_count == 2
+
+
+def test_configure_rate(sender):
+    output = make_output(sender, keepalive_interval=0)
+    assert output.bucket is None
+    output.configure(rate=50.0)
+    assert output.bucket.rate == 50.0
+    bucket = output.bucket
+    output.configure(rate=50.0, burst=2.0)
+    assert output.bucket is bucket              # unverändert - Tokens bleiben
+    output.configure(rate=0)
+    assert output.bucket is None
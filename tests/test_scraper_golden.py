@@ -0,0 +1,80 @@
+"""
+Golden-Test der Stück-Seiten: jedes Parser-Backend (html.parser/lxml, ganze Seite
+oder gezielt) muss für den Korpus in fixtures/wlt_detail Byte für Byte (als JSON)
+die Datensätze liefern, die das ursprüngliche scrape_detail_page() erzeugt hat
+(expected.json, siehe make_golden.py). Ausnahme: lxml repariert kaputtes HTML anders,
+für die Seiten in LXML_REPAIRS gilt der Vergleich nur für html.parser (deshalb ist
+html.parser der Standard).
+"""
+import json
+import logging
+from pathlib import Path
+
+import pytest
+
+import scraper
+
+CORPUS = Path(__file__).resolve().parent / "fixtures" / "wlt_detail"
+GOLDEN = json.loads((CORPUS / "expected.json").read_text(encoding='utf-8'))
+PAGES = {name: (CORPUS / name).read_text(encoding='utf-8') for name in sorted(GOLDEN["pages"])}
+BACKENDS = [('html.parser', False), ('html.parser', True), ('lxml', False), ('lxml', True)]
+# Kaputtes HTML, das lxml anders aufbaut als html.parser (Inhalt fehlt bzw. ist anders getrennt)
+LXML_REPAIRS = {'unclosed_p.html', 'image_box_in_p.html'}
+
+
+@pytest.fixture(autouse=True)
+def reference_setup(monkeypatch):
+    """Basis-URL des Referenzlaufs, gelernte Container nur für diesen Test"""
+    monkeypatch.setattr(scraper, 'BASE_URL', GOLDEN["base_url"])
+    monkeypatch.setattr(scraper, 'DETAIL_CONTAINERS', list(scraper.DETAIL_CONTAINERS))
+
+
+def encode(record):
+    return json.dumps(record, ensure_ascii=False)
+
+
+def test_corpus_complete():
+    assert sorted(path.name for path in CORPUS.glob("*.html")) == sorted(GOLDEN["pages"])
+
+
+@pytest.mark.parametrize('backend,targeted', BACKENDS)
+def test_backend_matches_original(backend, targeted):
+    if backend != 'html.parser' and scraper.parser_features(backend) == 'html.parser':
+        pytest.skip(f"{backend} nicht installiert")
+    # Alle Seiten nacheinander wie in einem Parser-Prozess (gelernte Container gelten weiter)
+    for name, html in PAGES.items():
+        record = encode(scraper.parse_detail_page(html, backend, targeted))
+        if backend == 'lxml' and name in LXML_REPAIRS:
+            continue    # trotzdem geparst: gelernte Container wie im Betrieb
+        assert record == encode(GOLDEN["pages"][name]), name
+
+
+@pytest.mark.parametrize('name', sorted(LXML_REPAIRS))
+def test_lxml_differs_on_broken_markup(name):
+    """Der Korpus enthält Seiten, an denen ein Wechsel des Standard-Backends auffällt"""
+    if scraper.parser_features('lxml') == 'html.parser':
+        pytest.skip("lxml nicht installiert")
+    assert encode(scraper.parse_detail_page(PAGES[name], 'lxml', False)) != encode(GOLDEN["pages"][name])
+
+
+def test_default_backend_matches_original():
+    for name, html in PAGES.items():
+        assert encode(scraper.parse_detail_page(html)) == encode(GOLDEN["pages"][name]), name
+
+
+@pytest.mark.parametrize('backend', ['html.parser', 'lxml'])
+def test_learns_only_specific_containers(backend, caplog, monkeypatch):
+    """Elternelemente ohne id/class werden nicht zum Container (sonst würde jede Seite ganz geparst)"""
+    if backend != 'html.parser' and scraper.parser_features(backend) == 'html.parser':
+        pytest.skip(f"{backend} nicht installiert")
+    if scraper.ElementFilter is None:
+        pytest.skip("gezieltes Parsen braucht beautifulsoup4 >= 4.13")
+    monkeypatch.setattr(scraper, '_warned_parents', set())
+    builtin = list(scraper.DETAIL_CONTAINERS)
+    with caplog.at_level(logging.WARNING):
+        for _ in range(2):
+            for name in ('header_in_plain_div.html', 'header_top_level.html', 'header_in_article.html'):
+                scraper.parse_detail_page(PAGES[name], backend, True)
+    assert scraper.DETAIL_CONTAINERS == builtin
+    warnings = [record.getMessage() for record in caplog.records if "Zum Stück" in record.getMessage()]
+    assert len(warnings) == len(set(warnings)) > 0     # je Elternelement nur einmal
@@ -0,0 +1,47 @@
+"""Stick-Aufnahmen: Schreiben und Laden, auch wenn die Datei mitten im Eintrag endet"""
+import os
+
+import pytest
+
+from stick_log import AXIS, BUTTON, HEADER, RECORD_DTYPE, StickRecorder, load_stick_log
+
+
+def record_log(path, count):
+    recorder = StickRecorder(str(path), buffer_size=64)
+    recorder.connect(0, 'xbox', 6)
+    for i in range(count - 1):
+        recorder.record(0, AXIS if i % 2 else BUTTON, i % 6, i / 8)
+    recorder.close()
+    return path
+
+
+def test_roundtrip(tmp_path):
+    records = load_stick_log(record_log(tmp_path / "probe.stick", 202))
+    assert len(records) == 202
+    assert records['index'][0] == 6
+    assert records['value'][-1] == 200 / 8
+    assert (records['t'][1:] >= records['t'][:-1]).all()
+
+
+@pytest.mark.parametrize('cut', [1, 3, RECORD_DTYPE.itemsize - 1])
+def test_truncated_log_drops_partial_record(tmp_path, cut):
+    """Absturz mitten im Schreiben: der halbe letzte Eintrag fällt weg"""
+    path = record_log(tmp_path / "probe.stick", 202)
+    os.truncate(path, os.path.getsize(path) - cut)
+    records = load_stick_log(path)
+    assert len(records) == 201
+    assert records['value'][-1] == 199 / 8
+
+
+def test_truncated_to_partial_first_record(tmp_path):
+    path = record_log(tmp_path / "probe.stick", 1)
+    os.truncate(path, HEADER.size + 5)
+    assert len(load_stick_log(path)) == 0
+
+
+def test_rejects_foreign_file(tmp_path):
+    path = tmp_path / "probe.stick"
+    path.write_bytes(b"x" * 64)
+    with pytest.raises(ValueError, match="keine Stick-Aufnahme"):
+        load_stick_log(path)
+
@@ -0,0 +1,226 @@
+"""
+Lokaler Ersatz für westfaelisches-landestheater.de zum Testen und Messen des Scrapers.
+
+Spielt einen Korpus ab, den scraper.py --capture DIR mitgeschnitten hat
+(manifest.json + index/*.html + detail/*.html). Links auf den Original-Host
+werden dabei auf den Ersatz umgeschrieben. Ohne Korpus (--synthetic N) entstehen
+N Stücke im Aufbau der echten Seiten, verteilt auf die vier Index-Seiten.
+
+Wie ein echter Server:
+- ETag pro Seite, If-None-Match -> 304 (für den HTTP-Cache des Scrapers)
+- Latenz pro Antwort (--latency, --jitter in ms)
+- zufällige 503 (--error-rate, reproduzierbar über --seed)
+- Rate-Limit (--rate-limit Anfragen/s, --burst) -> 429 mit Retry-After
+
+GET /_standin/stats liefert Anfragen, Status-Codes, Bytes und die höchste
+Zahl gleichzeitiger Anfragen als JSON.
+
+    python wlt_standin.py --corpus corpus/2026-10-17 [--port 8080] [--latency 50]
+    python wlt_standin.py --synthetic 60 --error-rate 0.05 --rate-limit 40
+    python scraper.py --base-url http://127.0.0.1:8080 --no-cache
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import random
+import signal
+import time
+from pathlib import Path
+
+from aiohttp import web
+
+import scraper
+
+CORPUS_VERSION = scraper.CORPUS_VERSION
+
+
+def synthetic_page(i):
+    """Detail-Seite im Aufbau der WLT-Seiten (~30 KB)"""
+    nav = "".join(f'<li class="nav-item"><a href="/menu/{n}/">Menüpunkt {n}</a></li>' for n in range(250))
+    cast = "".join(f'<span><strong>Rolle {n}:</strong> Darsteller*in {i}-{n}</span>' for n in range(15))
+    dates = "".join(
+        f'<li><time datetime="2026-{n % 12 + 1:02d}-{n % 27 + 1:02d}">{n % 27 + 1:02d}.{n % 12 + 1:02d}.2026</time>'
+        f'<span class="event-time">19:30 Uhr</span><span class="span-7">Stadthalle {n} <a href="/ort/{n}">Anfahrt</a></span>'
+        f'<a class="ticketlink" href="https://tickets.example/{i}/{n}">Tickets</a></li>' for n in range(12))
+    gallery = "".join(f'<a class="fancybox" href="/fileadmin/galerie/{i}_{n}.jpg"><img src="/t/{n}.jpg"></a>' for n in range(12))
+    press = "".join(f'<p>„Großartige Inszenierung Nr. {n}“ – Zeitung {n}</p>' for n in range(5))
+    text = "".join(f'<p>Absatz {n} zum Stück {i}. ' + "Lorem ipsum dolor sit amet. " * 20 + '</p>' for n in range(6))
+    footer = "".join(f'<div class="footer-col"><a href="/f/{n}">Footer {n}</a><p>Adresse {n}</p></div>' for n in range(40))
+    return (f'<html><head><title>Stück {i}</title></head><body><nav><ul>{nav}</ul></nav><main>'
+            f'<div class="detail-beschreibung-title">ab 14 Jahren</div><div class="detail-beschreibung-title">Dauer ca. 120 Minuten, eine Pause</div>'
+            f'<div class="detail-cast">{cast}</div>'
+            f'<h2 class="detail-beschreibung-header">Zum Stück</h2>{text}<p class="download-anchor">Download</p>'
+            f'<div class="detail-image-box">{gallery}</div>'
+            f'<ul class="detail-beschreibung-terminliste">{dates}</ul>'
+            f'<div class="detail-plakatmotiv"><a href="/fileadmin/plakat/{i}.jpg">Plakat</a></div>'
+            f'<div data-plyr-provider="youtube" data-plyr-embed-id="yt{i}"></div>'
+            f'<audio><source src="/audio/{i}.mp3"></audio>'
+            f'<div id="pressestimmen-content">{press}</div></main><footer>{footer}</footer></body></html>')
+
+
+def synthetic_index_page(productions):
+    items = "".join(
+        f'<li class="produktion-list-item"><a href="/repertoire/produktion_id/{i}/"><img src="/t/{i}.jpg"></a>'
+        f'<div class="termin-list-box"><a href="/repertoire/produktion_id/{i}/">Stück {i}</a>'
+        f'<div>Stück {i}|Untertitel {i}|Schauspiel</div></div></li>' for i in productions)
+    return f'<html><body><ul class="produktion-list">{items}</ul></body></html>'
+
+
+def synthetic_corpus(count):
+    """Seitenpfad -> HTML: count Stücke, jede Index-Seite mit einem Teil (mit Überschneidungen)"""
+    pages = {}
+    sources = len(scraper.SOURCE_PAGES)
+    for n, (path, _, _) in enumerate(scraper.SOURCE_PAGES):
+        share = range(n * count // sources, min(count, (n + 1) * count // sources + 2))
+        pages[path] = synthetic_index_page(share)
+    for i in range(count):
+        pages[f"/repertoire/produktion_id/{i}/"] = synthetic_page(i)
+    return pages
+
+
+def load_corpus(path):
+    """Seitenpfad -> HTML aus einem Mitschnitt, dazu der Original-Host"""
+    path = Path(path)
+    manifest = json.loads((path / "manifest.json").read_text(encoding='utf-8'))
+    if manifest.get("version") != CORPUS_VERSION:
+        raise SystemExit(f"{path}: Korpus-Version {manifest.get('version')}, erwartet {CORPUS_VERSION}")
+    pages = {key: (path / page["file"]).read_text(encoding='utf-8') for key, page in manifest["pages"].items()}
+    return pages, manifest["base_url"]
+
+
+class StandIn:
+    def __init__(self, pages, source_url=None, latency=0.0, jitter=0.0, error_rate=0.0,
+                 rate_limit=0.0, burst=10, etag=True, seed=1):
+        self.source_url = source_url
+        self.raw_pages = pages
+        self.pages = {}
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rate_limit = rate_limit
+        self.burst = burst
+        self.tokens = float(burst)
+        self.last_refill = time.monotonic()
+        self.etag = etag
+        self.random = random.Random(seed)
+        self.active = 0
+        self.stats = {"requests": 0, "status": {}, "bytes": 0, "max_concurrent": 0}
+
+    def publish(self, base_url):
+        """Kodiert alle Seiten, Links auf den Original-Host zeigen auf den Ersatz"""
+        for key, html in self.raw_pages.items():
+            if self.source_url:
+                html = html.replace(self.source_url, base_url)
+            body = html.encode('utf-8')
+            self.pages[key] = (body, '"' + hashlib.sha1(body).hexdigest() + '"')
+
+    def take_token(self):
+        if not self.rate_limit:
+            return True
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.last_refill) * self.rate_limit)
+        self.last_refill = now
+        if self.tokens < 1.0:
+            return False
+        self.tokens -= 1.0
+        return True
+
+    def count(self, status, size=0):
+        self.stats["status"][str(status)] = self.stats["status"].get(str(status), 0) + 1
+        self.stats["bytes"] += size
+
+    async def handle(self, request):
+        self.stats["requests"] += 1
+        self.active += 1
+        self.stats["max_concurrent"] = max(self.stats["max_concurrent"], self.active)
+        try:
+            if not self.take_token():
+                self.count(429)
+                return web.Response(status=429, headers={"Retry-After": "1"})
+            delay = self.latency + self.random.uniform(-self.jitter, self.jitter)
+            if delay > 0:
+                await asyncio.sleep(delay / 1000.0)
+            if self.error_rate and self.random.random() < self.error_rate:
+                self.count(503)
+                return web.Response(status=503)
+            key = request.path_qs
+            page = self.pages.get(key)
+            if page is None:
+                self.count(404)
+                return web.Response(status=404)
+            body, etag = page
+            if self.etag and request.headers.get("If-None-Match") == etag:
+                self.count(304)
+                return web.Response(status=304, headers={"ETag": etag})
+            self.count(200, len(body))
+            headers = {"ETag": etag} if self.etag else {}
+            return web.Response(body=body, content_type='text/html', charset='utf-8', headers=headers)
+        finally:
+            self.active -= 1
+
+    async def handle_stats(self, request):
+        return web.json_response(self.stats)
+
+    def make_app(self):
+        app = web.Application()
+        app.router.add_get('/_standin/stats', self.handle_stats)
+        app.router.add_get('/{tail:.*}', self.handle)
+        return app
+
+
+async def serve(standin, host, port, duration=None):
+    runner = web.AppRunner(standin.make_app(), access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, host, port)
+    await site.start()
+    base_url = f"http://{host}:{port}"
+    standin.publish(base_url)
+    print(f"✓ WLT-Ersatz auf {base_url} ({len(standin.pages)} Seiten)", flush=True)
+    # SIGTERM/SIGINT beenden sauber (Statistik wird noch ausgegeben)
+    stop = asyncio.Event()
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        try:
+            asyncio.get_running_loop().add_signal_handler(signum, stop.set)
+        except (NotImplementedError, RuntimeError):     # Windows: nur Strg+C
+            pass
+    try:
+        await asyncio.wait_for(stop.wait(), duration)
+    except asyncio.TimeoutError:
+        pass
+    finally:
+        await runner.cleanup()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--corpus', help="Mitschnitt von scraper.py --capture")
+    source.add_argument('--synthetic', type=int, metavar='N', help="N synthetische Stücke statt eines Korpus")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--latency', type=float, default=0.0, help="ms pro Antwort")
+    parser.add_argument('--jitter', type=float, default=0.0, help="± ms zufällig zur Latenz")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="Anteil 503-Antworten (0-1)")
+    parser.add_argument('--rate-limit', type=float, default=0.0, help="Anfragen/s, darüber 429 (0 = aus)")
+    parser.add_argument('--burst', type=int, default=10, help="Anfragen, die nach einer Pause sofort durchgehen")
+    parser.add_argument('--no-etag', action='store_true', help="ohne ETag/304 (Server ohne bedingte Requests)")
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--duration', type=float, default=None, help="Nach N Sekunden beenden")
+    args = parser.parse_args()
+
+    if args.corpus:
+        pages, source_url = load_corpus(args.corpus)
+    else:
+        pages, source_url = synthetic_corpus(args.synthetic), None
+    standin = StandIn(pages, source_url, args.latency, args.jitter, args.error_rate,
+                      args.rate_limit, args.burst, not args.no_etag, args.seed)
+    try:
+        asyncio.run(serve(standin, args.host, args.port, args.duration))
+    except KeyboardInterrupt:
+        pass
+    print(json.dumps(standin.stats))
+
+
+if __name__ == "__main__":
+    main()
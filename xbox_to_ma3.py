@@ -1,11 +1,26 @@
-import pygame
 import time
-from pythonosc import udp_client
+START_TIME = time.perf_counter()    # Bezugspunkt der Start-Zeitleiste
+
 import sys
+import copy
 import json
 import os
+import argparse
+import logging
+import threading
+import traceback
+from collections import deque
 from pathlib import Path
 
+from axis_pipeline import AxisPipeline, STICK_AXES
+from config_snapshot import FADER_NAMES, ConfigSnapshot, ConfigWatcher, load_config_file
+import stick_log
+from osc_encoder import RawOscSender
+from osc_output import OscOutput
+# Lazy (nur bei Bedarf): direct_commands, osc_fanout (asyncio), metrics (http.server)
+# pygame erst nach Socket und Engine-Start, siehe load_pygame()
+pygame = None
+
 # Standard Konfiguration (Fallback)
 DEFAULT_CONFIG = {
     "osc": {
@@ -16,52 +31,116 @@ DEFAULT_CONFIG = {
         "fader_tilt": 202,
         "fader_dimmer": 203,
         "fader_fine_pan": 204,
-        "fader_fine_tilt": 205
+        "fader_fine_tilt": 205,
+        # Minimale Änderung (Fader-%) bevor erneut gesendet wird
+        "deadband": {
+            "pan": 0.05,
+            "tilt": 0.05,
+            "fine_pan": 0.05,
+            "fine_tilt": 0.05,
+            "dimmer": 0.2
+        },
+        "keepalive_interval": 1.0,  # Sekunden, 0 = aus
+        "bundle": False,            # Alle Werte eines Ticks als ein OSC-Bundle senden
+        # Sendetakt an die Konsole (Hz, 0 = jeder Tick). Die Engine tastet weiter mit
+        # update_rate ab, gesendet wird nur der letzte Stand - XboxControl.lua liest
+        # ohnehin nur alle 50 ms (20 Hz). burst = Updates, die nach einer Pause sofort raus dürfen
+        "console_rate": 0,
+        "console_burst": 2,
+        # Mehrere Empfänger (Haupt-MA3, Backup, Visualizer), ersetzt host/port:
+        # {"name": "backup", "host": ..., "port": ..., "rate": 25, "deadband_scale": 2.0}
+        # rate = max. Pakete/s (0 = jeder Tick), deadband_scale multipliziert "deadband"
+        "targets": []
     },
     "controller": {
         "deadzone": 0.15,
+        "deadzone_mode": "axial",                 # "axial" (pro Achse, wie bisher) oder "radial" (pro Stick)
+        "response_curve": {"type": "linear"},     # linear, expo, s_curve oder points (siehe axis_pipeline)
         "sensitivity": 1.0,
         "fine_sensitivity": 0.3,
-        "update_rate": 50,
-        "smoothing": 0.3
+        "update_rate": 50,       # Engine-Rate (Sampling + OSC), bis 1000 Hz
+        "smoothing": 0.3,        # alter Faktor pro Tick, nur für den Tiefpass ohne time_constant_ms
+        "filter": {"type": "lowpass"}   # "lowpass" oder "one_euro" (siehe filters.py)
     },
     "features": {
         "use_right_stick_fine_control": True,
         "show_debug_info": False,
-        "auto_reconnect": True
+        "auto_reconnect": True,
+        "live_reload": True      # config.json beobachten und Änderungen ohne Neustart übernehmen
+    },
+    # Latenz-Messung pro Stufe (siehe metrics.py). Mit python -O fallen die Hooks ganz weg.
+    "metrics": {
+        "enabled": False,
+        "json_path": "",         # z.B. "ma3_stats.json", leer = keine Datei
+        "json_interval": 5.0,    # Sekunden
+        "prometheus_port": 0     # GET http://127.0.0.1:<port>/metrics, 0 = aus
+    },
+    # Befehlsmodus (siehe direct_commands.py): die Bridge rechnet Pan/Tilt selbst und
+    # sendet Attribute-Befehle an osc.host/osc.port statt Fader - ohne Plugin-Poll
+    "direct": {
+        "enabled": False,
+        "mode": "relative",      # "relative" oder "absolute" wie im Plugin
+        "fixture": None,         # wie AssignFixture(id), None = Selektion; pro Bank: "fixture" in controllers
+        "rate": 20,              # max. Schritte/s (20 = Befehlslast wie das Plugin)
+        "address": "/cmd",       # Befehlseingang der Konsole (ggf. mit OSC-Prefix)
+        "speed_multiplier": 2.0,
+        "fine_multiplier": 0.3,
+        "deadzone": 5.0          # Fader-% um die Mitte, wie im Plugin
     },
+    # Live-Werte im Shared Memory für lokale Tools (siehe live_state.py), ohne OSC-Mitschnitt
+    "shared_state": {
+        "enabled": False,
+        "name": "ma3_bridge",    # Name des Blocks, Leser: LiveStateReader("ma3_bridge")
+        "ring_size": 256         # letzte Samples aller Bänke
+    },
+    # Mehrere Operatoren: ein Eintrag pro Controller/Fader-Block, z.B.
+    # {"name": "Spot 1", "match": "<GUID oder Namensteil>", "target_page": 1,
+    #  "fader_pan": 201, ..., "mapping": "xbox"}. Leer = eine Bank aus "osc".
+    "controllers": [],
     "ui": {
         "window_width": 800,
         "window_height": 600,
+        "refresh_rate": 30,      # UI-FPS, unabhängig von der Engine-Rate
         "theme": "dark"
     }
 }
 
+CONFIG_PATH = Path(__file__).parent / "config.json"
+
 # Lade Konfiguration
 def load_config():
-    """Lädt config.json oder verwendet Default-Werte"""
-    config_path = Path(__file__).parent / "config.json"
-    if config_path.exists():
-        try:
-            with open(config_path, 'r') as f:
-                loaded = json.load(f)
-                # Merge mit Default (falls Keys fehlen)
-                config = DEFAULT_CONFIG.copy()
-                for key in loaded:
-                    if isinstance(loaded[key], dict):
-                        config[key].update(loaded[key])
-                    else:
-                        config[key] = loaded[key]
-                print(f"✓ Config geladen: {config_path}")
-                return config
-        except Exception as e:
-            print(f"⚠ Fehler beim Laden der Config: {e}")
-            print("  Verwende Default-Konfiguration")
-    else:
+    """
+    Lädt config.json oder verwendet Default-Werte. Eine fehlerhafte Datei
+    bricht den Start ab - mit den Defaults liefen sonst die falschen Fader.
+    """
+    if not CONFIG_PATH.exists():
         print(f"ℹ config.json nicht gefunden, verwende Defaults")
-    return DEFAULT_CONFIG
+        return copy.deepcopy(DEFAULT_CONFIG)
+    try:
+        config = load_config_file(CONFIG_PATH, DEFAULT_CONFIG)
+    except (OSError, ValueError) as e:
+        print(f"✗ Fehler in der Config {CONFIG_PATH}:")
+        for error in getattr(e, 'errors', [e]):
+            print(f"  - {error}")
+        sys.exit(1)
+    print(f"✓ Config geladen: {CONFIG_PATH}")
+    return config
 
 CONFIG = load_config()
+IMPORT_TIME = time.perf_counter() - START_TIME
+
+logger = logging.getLogger("ma3_bridge")
+
+def log_event(event, level=logging.INFO, **fields):
+    """Schreibt eine strukturierte Log-Zeile (event=... key=value) für den Headless-Betrieb"""
+    parts = [f"event={event}"]
+    for key, value in fields.items():
+        if isinstance(value, float):
+            value = f"{value:.1f}"
+        elif isinstance(value, str) and (not value or ' ' in value):
+            value = json.dumps(value, ensure_ascii=False)
+        parts.append(f"{key}={value}")
+    logger.log(level, " ".join(parts))
 
 # UI Konfiguration
 WINDOW_WIDTH = CONFIG['ui']['window_width']
@@ -72,6 +151,7 @@ ACCENT_COLOR = (100, 150, 255)
 SUCCESS_COLOR = (100, 255, 150)
 WARNING_COLOR = (255, 200, 100)
 ERROR_COLOR = (255, 100, 100)
+STICK_SIZE = 100
 
 # Controller-Typen Erkennung
 KNOWN_CONTROLLERS = {
@@ -111,51 +191,212 @@ def get_button_mapping(controller_type):
     }
     return mappings.get(controller_type, mappings['generic'])
 
-def apply_deadzone(value, deadzone):
+def clamp(value, low=-1.0, high=1.0):
+    """Begrenzt einen Wert auf [low, high]"""
+    return max(low, min(high, value))
+
+# Grenzen für dt der Glättung: 0 würde im One Euro Filter durch 0 teilen, ein
+# hängender Tick (z.B. Debugger) soll nur einmal komplett aufholen
+MIN_TICK_DT = 1e-4
+MAX_TICK_DT = 0.25
+
+# Stufen im Latenz-Overlay (Reihenfolge = Zeilen)
+OVERLAY_STAGES = ('input', 'pipeline', 'send', 'e2e', 'hold', 'tick', 'jitter', 'ui', 'frame')
+
+# Events, die der Haupt-Thread beim Pumpen an die Engine weiterreicht (setzt load_pygame)
+JOYSTICK_EVENTS = ()
+
+def load_pygame():
     """
-    Wendet eine Deadzone auf einen Achsenwert an.
-    value: -1.0 bis 1.0
-    deadzone: Schwellwert (z.B. 0.15 = 15%)
+    Importiert pygame (~190 ms) beim ersten Aufruf und setzt pygame und
+    JOYSTICK_EVENTS dieses Moduls. Läuft erst, wenn Socket und Engine schon stehen.
     """
-    if abs(value) < deadzone:
-        return 0.0
-    # Skaliere den Wert außerhalb der Deadzone zurück auf den vollen Bereich
-    sign = 1 if value > 0 else -1
-    scaled = (abs(value) - deadzone) / (1.0 - deadzone)
-    return sign * scaled
-
-def smooth_value(current, target, smoothing):
+    global pygame, JOYSTICK_EVENTS
+    if pygame is None:
+        import pygame as module
+        JOYSTICK_EVENTS = (module.JOYAXISMOTION, module.JOYBUTTONDOWN, module.JOYBUTTONUP,
+                           module.JOYDEVICEADDED, module.JOYDEVICEREMOVED)
+        pygame = module
+    return pygame
+
+class TickScheduler:
     """
-    Glättet Werte mittels linearer Interpolation.
-    smoothing: 0.0 = keine Glättung, 1.0 = maximale Glättung
+    Präziser Takt-Geber für die Engine.
+    Schläft bis kurz vor die Deadline und wartet den Rest aktiv ab,
+    damit auch 250-1000 Hz ohne OS-Timer-Jitter eingehalten werden.
     """
-    return current + (target - current) * (1.0 - smoothing)
+    def __init__(self, rate, spin_time=0.002):
+        self.period = 1.0 / rate
+        self.spin_time = spin_time
+        self.next_tick = time.perf_counter()
+        self.overruns = 0
 
-class MA3ControllerUI:
-    def __init__(self):
-        pygame.init()
-        pygame.joystick.init()
-        
-        self.screen = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
-        pygame.display.set_caption("MA3 Controller Bridge v2.0")
-        
-        self.clock = pygame.time.Clock()
-        self.font_large = pygame.font.Font(None, 48)
-        self.font_medium = pygame.font.Font(None, 32)
-        self.font_small = pygame.font.Font(None, 24)
-        self.font_tiny = pygame.font.Font(None, 18)
+    def reset(self):
+        self.next_tick = time.perf_counter()
+
+    def wait(self):
+        """Blockiert bis zum nächsten Tick"""
+        self.next_tick += self.period
+        remaining = self.next_tick - time.perf_counter()
+
+        if remaining <= 0:
+            # Tick verpasst - nicht nachholen, sondern neu synchronisieren
+            self.overruns += 1
+            self.next_tick = time.perf_counter()
+            return
+
+        if remaining > self.spin_time:
+            time.sleep(remaining - self.spin_time)
+        while time.perf_counter() < self.next_tick:
+            time.sleep(0)  # GIL freigeben, damit der UI-Thread weiterläuft
+
+class StartupTimeline:
+    """
+    Start-Zeitleiste in Sekunden ab START_TIME: Import + Config, OSC-Socket,
+    Engine, pygame + SDL, Fenster, erster Controller, erstes Paket. mark() darf aus jedem
+    Thread kommen, es zählt nur der erste Aufruf pro Stufe.
+    """
+    LABELS = {
+        'import': "Import+Config",
+        'socket': "Socket",
+        'engine': "Engine",
+        'sdl': "pygame+SDL",
+        'display': "Fenster",
+        'controller': "Controller",
+        'first_packet': "Erstes Paket",
+    }
+    
+    def __init__(self, start=START_TIME):
+        self.start = start
+        self.marks = {'import': IMPORT_TIME}
+        self.reported = False
+    
+    def mark(self, stage):
+        if stage not in self.marks:
+            self.marks[stage] = time.perf_counter() - self.start
+    
+    @property
+    def complete(self):
+        return 'first_packet' in self.marks
+    
+    def ordered(self):
+        return sorted(self.marks.items(), key=lambda item: item[1])
+    
+    def format(self):
+        return " | ".join(f"{self.LABELS[stage]} {elapsed * 1000:.0f} ms" for stage, elapsed in self.ordered())
+    
+    def fields(self):
+        """Für log_event: <stufe>_ms=..."""
+        return {f"{stage}_ms": f"{elapsed * 1000:.1f}" for stage, elapsed in self.ordered()}
+
+class ControllerEngine(threading.Thread):
+    """
+    Input/Output-Engine: ruft tick() in eigenem Thread mit fester Rate auf.
+    Die UI liest nur noch den letzten Snapshot und bremst den OSC-Output nicht.
+    setup() läuft einmal vor dem ersten Tick im Engine-Thread (Controller-Suche).
+    """
+    def __init__(self, tick, rate, metrics=None, setup=None):
+        super().__init__(name="ControllerEngine", daemon=True)
+        self.tick = tick
+        self.rate = rate
+        self.metrics = metrics
+        self.setup = setup
+        self.scheduler = TickScheduler(rate)
+        self.running = True
+        self.error = None
+
+        # Statistiken
+        self.tick_count = 0
+        self.measured_rate = 0.0
+
+    def run(self):
+        if self.setup is not None:
+            try:
+                self.setup()
+            except Exception as e:
+                self.error = e
+                traceback.print_exc()
+                self.running = False
+                return
+        self.scheduler.reset()
+        rate_ticks = 0
+        rate_start = time.perf_counter()
+        metrics = self.metrics
+        scheduler = self.scheduler
+
+        while self.running:
+            if __debug__ and metrics:
+                # Jitter: wie spät der Tick gegenüber seiner Deadline startet
+                tick_start = time.perf_counter()
+                metrics.record('jitter', tick_start - scheduler.next_tick)
+            try:
+                self.tick()
+            except Exception as e:
+                self.error = e
+                traceback.print_exc()
+                self.running = False
+                break
+
+            self.tick_count += 1
+            rate_ticks += 1
+            now = time.perf_counter()
+            if __debug__ and metrics:
+                metrics.record('tick', now - tick_start)
+            if now - rate_start >= 1.0:
+                self.measured_rate = rate_ticks / (now - rate_start)
+                rate_ticks = 0
+                rate_start = now
+
+            self.scheduler.wait()
+
+    def stop(self):
+        self.running = False
+        if self.is_alive():
+            self.join(timeout=1.0)
+
+# Wert, den eine alte Fader-Adresse nach einem Live-Reload zuletzt bekommt
+# (Mitte = Stillstand im Plugin, Key los). Der Dimmer behält seinen Wert.
+RELEASE_VALUES = {'pan': 50.0, 'tilt': 50.0, 'fine_pan': 50.0, 'fine_tilt': 50.0, 'key': 0}
+
+class ControllerBank:
+    """
+    Ein Operator: Controller-Zuordnung (GUID oder Name), eigener Fader-Block
+    und eigener Eingangszustand. Alle Bänke senden über dasselbe OscOutput,
+    ihre Werte landen also im selben Bundle pro Tick.
+    """
+    def __init__(self, layout, output, pipeline):
+        index = layout.index
+        self.index = index
+        self.name = layout.name
+        self.match = layout.match           # GUID oder Teil des Namens, None = beliebig
+        self.mapping_type = layout.mapping  # erzwingt get_button_mapping(...)
+        self.page = layout.page
+        self.faders = dict(layout.faders)
         
-        # OSC Client
-        osc_config = CONFIG['osc']
-        self.client = udp_client.SimpleUDPClient(osc_config['host'], osc_config['port'])
-        self.osc_host = osc_config['host']
-        self.osc_port = osc_config['port']
-        self.osc_connected = True
+        # OSC-Kanäle dieser Bank (Namen sind im gemeinsamen OscOutput eindeutig)
+        self.output = output
+        self.channels = {name: f"{index}.{name}" for name in FADER_NAMES + ('key',)}
+        for channel, address, deadband, typetag in layout.channels:
+            output.add_channel(channel, address, deadband, typetag)
         
         self.joystick = None
+        self.joystick_id = None
+        self.last_guid = None
         self.controller_type = None
-        self.button_mapping = None
-        self.running = True
+        self.controller_name = None
+        self.button_mapping = get_button_mapping(self.mapping_type or 'generic')
+        self.generation = 0
+        
+        # Eingangszustand aus Joystick-Events (statt get_axis/get_button pro Tick).
+        # Die Stick-Achsen liegen zusätzlich in der Zeile dieser Bank im AxisPipeline-Array.
+        self.pipeline = pipeline
+        self.sticks = pipeline.input[index]
+        self.axes = []
+        self.button_states = {}
+        self.input_dirty = False   # neue Events seit der letzten Verarbeitung
+        self.settling = False      # Glättung läuft noch auf den Zielwert zu
+        self.trigger_active = False  # Trigger hat schon einen Wert > Ruhelage gemeldet
+        self.recorder = None       # StickRecorder, wenn aufgezeichnet wird
         
         # Werte-Speicher (smoothed values)
         self.pan_val = 0.0
@@ -163,344 +404,1170 @@ class MA3ControllerUI:
         self.pan_fine_val = 0.0
         self.tilt_fine_val = 0.0
         self.trigger_val = 0.0
-        self.button_states = {}
         
         # Raw values (vor smoothing)
         self.pan_raw = 0.0
         self.tilt_raw = 0.0
         self.pan_fine_raw = 0.0
         self.tilt_fine_raw = 0.0
+    
+    def apply_layout(self, layout):
+        """Neue Page, Fader und Deadbands aus einem Config-Snapshot (Engine-Thread)"""
+        for channel, address, deadband, typetag in layout.channels:
+            fader = channel.split('.', 1)[1]
+            self.output.update_channel(channel, address, deadband, typetag, RELEASE_VALUES.get(fader))
+        self.page = layout.page
+        self.faders = dict(layout.faders)   # ersetzen statt ändern - die UI hält ggf. noch das alte Dict
+        self.input_dirty = True
+    
+    def matches(self, guid, name):
+        """Passt ein Controller zu dieser Bank? (GUID exakt oder Namensteil, ohne Groß/klein)"""
+        if self.match is None:
+            return True
+        match = self.match.lower()
+        return guid.lower() == match or match in name.lower()
+    
+    def attach(self, joystick):
+        """Übernimmt einen geöffneten Controller"""
+        controller_name = joystick.get_name()
+        self.controller_type = detect_controller_type(controller_name)
+        self.button_mapping = get_button_mapping(self.mapping_type or self.controller_type)
+        self.controller_name = controller_name
+        
+        # Startzustand einmalig lesen, danach kommen nur noch Events
+        self.axes = [joystick.get_axis(i) for i in range(joystick.get_numaxes())]
+        for i in range(STICK_AXES):
+            self.sticks[i] = self.axis(i)
+        self.set_trigger(self.axis(self.button_mapping['rt_axis']))
+        self.button_states = {btn_id: joystick.get_button(btn_id)
+                              for btn_id in self.button_mapping['buttons']
+                              if btn_id < joystick.get_numbuttons()}
+        self.output.send(self.channels['key'], 1 if self.button_states.get(0) else 0)
+        
+        self.joystick = joystick
+        self.joystick_id = joystick.get_instance_id()
+        self.last_guid = joystick.get_guid()
+        self.input_dirty = True
+        self.generation += 1
+        log_event("controller_connected", bank=self.name, name=controller_name, type=self.controller_type,
+                  guid=self.last_guid, instance_id=self.joystick_id)
+        
+        # Aufnahme: Startzustand komplett, damit die Wiedergabe genauso beginnt
+        if self.recorder is not None:
+            self.recorder.connect(self.index, self.controller_type, len(self.axes))
+            for i, value in enumerate(self.axes):
+                self.recorder.record(self.index, stick_log.AXIS, i, value)
+            for btn_id, is_pressed in self.button_states.items():
+                self.recorder.record(self.index, stick_log.BUTTON, btn_id, is_pressed)
+    
+    def attach_replay(self, controller_type, num_axes):
+        """Wiedergabe: Bank verhält sich wie mit einem frisch angesteckten Controller in Ruhelage"""
+        self.controller_type = controller_type
+        self.button_mapping = get_button_mapping(self.mapping_type or controller_type)
+        self.controller_name = f"Wiedergabe ({controller_type})"
+        
+        self.axes = [0.0] * num_axes
+        rt_axis = self.button_mapping['rt_axis']
+        if rt_axis < num_axes:
+            self.axes[rt_axis] = -1.0
+        self.sticks.fill(0.0)
+        self.button_states = {btn_id: 0 for btn_id in self.button_mapping['buttons']}
+        self.output.send(self.channels['key'], 0)
+        
+        self.input_dirty = True
+        self.generation += 1
+        log_event("replay_connected", bank=self.name, type=controller_type)
+    
+    def detach(self):
+        """
+        Controller wurde abgezogen: Sticks auf Ruhelage, Buttons loslassen.
+        So bleibt im relativen Modus kein Fixture in Bewegung hängen. Der
+        Dimmer behält seinen letzten Wert, die Engine läuft weiter.
+        """
+        log_event("controller_removed", level=logging.WARNING, bank=self.name,
+                  name=self.controller_name, instance_id=self.joystick_id)
+        if self.joystick is not None:
+            self.joystick.quit()
+        if self.recorder is not None:
+            self.recorder.record(self.index, stick_log.DISCONNECT, 0, 0.0)
+        self.joystick = None
+        self.joystick_id = None
+        self.controller_name = None
+        
+        rt_axis = self.button_mapping['rt_axis']
+        for i in range(len(self.axes)):
+            if i != rt_axis:
+                self.axes[i] = 0.0
+        self.sticks.fill(0.0)
+        for btn_id in self.button_states:
+            self.button_states[btn_id] = 0
+        self.output.send(self.channels['key'], 0)
+        
+        self.input_dirty = True
+        self.generation += 1
+    
+    def handle_event(self, event):
+        """Übernimmt ein Achsen-/Button-Event dieses Controllers in den Eingangszustand"""
+        if event.type == pygame.JOYAXISMOTION:
+            self.set_axis(event.axis, event.value)
+        elif event.type in (pygame.JOYBUTTONDOWN, pygame.JOYBUTTONUP):
+            self.set_button(event.button, 1 if event.type == pygame.JOYBUTTONDOWN else 0)
+    
+    def set_axis(self, axis, value):
+        """Neuer Achsenwert (aus einem Event oder einer Wiedergabe)"""
+        if axis < len(self.axes):
+            self.axes[axis] = value
+            if axis < STICK_AXES:
+                self.sticks[axis] = value
+            elif axis == self.button_mapping['rt_axis']:
+                self.set_trigger(value)
+            self.input_dirty = True
+            if self.recorder is not None:
+                self.recorder.record(self.index, stick_log.AXIS, axis, value)
+    
+    def set_button(self, button, is_pressed):
+        """Neuer Button-Zustand (aus einem Event oder einer Wiedergabe)"""
+        if button in self.button_states:
+            self.button_states[button] = is_pressed
+            
+            # Button A/X für Flash (nur bei Flankenwechsel)
+            if button == 0:
+                self.output.send(self.channels['key'], is_pressed)
+            self.input_dirty = True
+            if self.recorder is not None:
+                self.recorder.record(self.index, stick_log.BUTTON, button, is_pressed)
+    
+    def set_trigger(self, value):
+        """Neuer Zielwert für den Dimmer (Trigger -1..1, die Ruhelage -1 wird ignoriert)"""
+        if value > -1:
+            self.pipeline.trigger[self.index] = (value + 1) / 2
+            self.trigger_active = True
+    
+    def axis(self, index):
+        """Letzter per Event gemeldeter Achsenwert (0.0 wenn nicht vorhanden)"""
+        return self.axes[index] if index < len(self.axes) else 0.0
+    
+    def process(self, use_fine):
+        """
+        Übernimmt die Werte dieser Bank aus der AxisPipeline (Deadzone, Kurve,
+        Sensitivity und Glättung sind dort schon für alle Bänke gerechnet) und sendet
+        """
+        output = self.output
+        channels = self.channels
+        index = self.index
+        
+        # Raw (vor Smoothing) und geglättete Werte der Sticks
+        self.pan_raw, self.tilt_raw, pan_fine_raw, tilt_fine_raw = self.pipeline.output[index].tolist()
+        self.pan_val, self.tilt_val, pan_fine_val, tilt_fine_val = self.pipeline.smoothed[index].tolist()
+        
+        # Rechter Stick (Fine Control) - optional
+        if use_fine:
+            self.pan_fine_raw, self.tilt_fine_raw = pan_fine_raw, tilt_fine_raw
+            self.pan_fine_val, self.tilt_fine_val = pan_fine_val, tilt_fine_val
+        
+        # Skaliere auf 0-100 für MA3 und sende Hauptwerte
+        output.send(channels['pan'], (self.pan_val + 1) * 50)
+        output.send(channels['tilt'], (self.tilt_val + 1) * 50)
+        
+        # Sende Fine-Control Werte (wenn aktiv)
+        if use_fine:
+            output.send(channels['fine_pan'], (self.pan_fine_val + 1) * 50)
+            output.send(channels['fine_tilt'], (self.tilt_fine_val + 1) * 50)
+        
+        # Trigger (RT), ebenfalls in der Pipeline geglättet
+        if self.trigger_active:
+            self.trigger_val = float(self.pipeline.trigger_smoothed[index]) * 100
+            output.send(channels['dimmer'], self.trigger_val)
+        
+        # Weiterrechnen, bis alle geglätteten Werte (Sticks und Trigger) ihr Ziel erreicht haben
+        self.settling = bool(self.pipeline.settling[index])
+    
+    def make_snapshot(self):
+        """Kopie der Werte dieser Bank für den UI-Thread"""
+        return {
+            'bank_name': self.name,
+            'faders': self.faders,
+            'page': self.page,
+            'pan_val': self.pan_val,
+            'tilt_val': self.tilt_val,
+            'pan_fine_val': self.pan_fine_val,
+            'tilt_fine_val': self.tilt_fine_val,
+            'trigger_val': self.trigger_val,
+            'pan_raw': self.pan_raw,
+            'tilt_raw': self.tilt_raw,
+            'pan_fine_raw': self.pan_fine_raw,
+            'tilt_fine_raw': self.tilt_fine_raw,
+            'button_states': dict(self.button_states),
+            'button_mapping': self.button_mapping,
+            'controller_name': self.controller_name,
+            'controller_generation': self.generation,
+        }
+
+class MA3ControllerUI:
+    def __init__(self, headless=False, recorder=None, replay=None):
+        self.headless = headless
+        self.recorder = recorder   # StickRecorder: Eingaben aller Bänke mitschreiben
+        self.replay = replay       # StickReplay: Aufnahme statt Controller abspielen
+        
+        self.startup = StartupTimeline()
+        
+        # Schnellstart: pygame wird erst in start_sdl() geladen, wenn Socket und
+        # Engine schon laufen. Fenster und Fonts kommen danach in open_window().
+        if headless:
+            os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+        self.sdl_ready = threading.Event()
+        self.clock = None
+        self.screen = None
+        
+        # SDL darf nur im Haupt-Thread pumpen (Windows/macOS) - UI bzw. Headless-Schleife
+        # holen alle Events und reichen die Joystick-Events hierüber an die Engine
+        self.joystick_events = deque()
+        self.pump_interval = 1.0 / CONFIG['controller']['update_rate']
+        
+        # Geprüfte, kompilierte Config - Engine und UI lesen nur noch diesen Snapshot.
+        # Live-Reload (siehe config_snapshot): next_settings wird vom ConfigWatcher ersetzt,
+        # die Engine übernimmt ihn zwischen zwei Ticks.
+        self.settings = ConfigSnapshot(CONFIG, DEFAULT_CONFIG['osc']['deadband'])
+        self.next_settings = self.settings
+        self.config_watcher = None
+        settings = self.settings
+        
+        # OSC Client (öffnet den Socket sofort)
+        osc_config = CONFIG['osc']
+        direct_config = CONFIG['direct']
+        targets = osc_config.get('targets') or []
+        osc = settings.osc
+        self.osc_connected = True
+        if direct_config['enabled']:
+            from direct_commands import CommandOutput
+            self.output_kind = 'direct'
+            # Befehle statt Fader, nur an osc.host/osc.port (relative Befehle an mehrere
+            # Konsolen würden die Fixtures dort unabhängig voneinander bewegen)
+            self.client = RawOscSender(osc_config['host'], osc_config['port'])
+            self.osc_address = f"{osc_config['host']}:{osc_config['port']}{direct_config['address']}"
+            fixtures = {layout.index: layout.fixture for layout in settings.banks}
+            self.output = CommandOutput(self.client, direct_config['mode'], direct_config['rate'],
+                                        address=direct_config['address'], fixtures=fixtures,
+                                        speed_multiplier=direct_config['speed_multiplier'],
+                                        fine_multiplier=direct_config['fine_multiplier'],
+                                        deadzone=direct_config['deadzone'],
+                                        bundle=osc.bundle)
+        elif targets:
+            from osc_fanout import OscFanout
+            self.output_kind = 'fanout'
+            # Fan-out: eigener Thread mit asyncio, Change-Detection pro Ziel
+            self.client = OscFanout(targets, osc.keepalive_interval, bundle=osc.bundle,
+                                    rate=osc.console_rate, burst=osc.console_burst)
+            self.output = self.client
+            self.osc_address = ", ".join(target.address for target in self.client.targets)
+        else:
+            self.output_kind = 'fader'
+            self.client = RawOscSender(osc_config['host'], osc_config['port'])
+            self.osc_address = f"{osc_config['host']}:{osc_config['port']}"
+            
+            # Change-Detection: nur echte Änderungen gehen an MA3
+            self.output = OscOutput(self.client, osc.keepalive_interval, bundle=osc.bundle,
+                                    rate=osc.console_rate, burst=osc.console_burst)
+        
+        self.startup.mark('socket')
+        
+        # Alle Sticks aller Bänke in einem Array (siehe axis_pipeline)
+        self.pipeline = AxisPipeline(len(settings.banks), *settings.controller.pipeline_args(),
+                                     CONFIG['controller']['update_rate'])
+        self.last_tick = None      # perf_counter des letzten Engine-Ticks (für dt)
+        self.first_packet_pending = True
+        
+        # Ein Fader-Block pro Operator, alle im selben Output
+        self.banks = [ControllerBank(layout, self.output, self.pipeline) for layout in settings.banks]
+        self.banks_by_id = {}
+        for bank in self.banks:
+            bank.recorder = recorder
+        self.display_index = 0   # Bank, die die UI im Detail zeigt (TAB wechselt)
+        self.running = True
         
         # Statistiken
         self.osc_message_count = 0
         self.start_time = time.time()
         
-    def wait_for_controller(self):
-        """Wartet auf Controller-Verbindung mit UI-Feedback"""
-        waiting = True
-        dots = 0
-        last_check = time.time()
+        # Latenz-Histogramme pro Stufe (None = aus, die Hooks kosten dann nur einen Vergleich)
+        metrics_config = CONFIG.get('metrics', {})
+        self.metrics = None
+        if metrics_config.get('enabled'):
+            from metrics import Metrics
+            self.metrics = Metrics()
+            self.metrics.gauges = self.metrics_counters
+        self.metrics_exporter = None
+        self.live_state = None     # LiveStatePublisher, solange shared_state läuft
+        self.show_overlay = settings.features.show_debug_info
+        self.overlay_lines = []
+        self.overlay_updated = 0.0
         
-        while waiting and self.running:
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    self.running = False
-                    return False
-                elif event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE:
-                    self.running = False
-                    return False
-            
-            # Prüfe alle 0.5 Sekunden auf neue Controller
-            if time.time() - last_check > 0.5:
-                pygame.joystick.quit()
-                pygame.joystick.init()
-                
-                if pygame.joystick.get_count() > 0:
-                    self.joystick = pygame.joystick.Joystick(0)
-                    self.joystick.init()
-                    
-                    # Erkenne Controller-Typ
-                    controller_name = self.joystick.get_name()
-                    self.controller_type = detect_controller_type(controller_name)
-                    self.button_mapping = get_button_mapping(self.controller_type)
-                    
-                    waiting = False
-                else:
-                    dots = (dots + 1) % 4
-                    last_check = time.time()
-            
-            # Zeichne Wartebildschirm
-            self.screen.fill(BG_COLOR)
-            
-            title = self.font_large.render("MA3 Controller Bridge v2.0", True, ACCENT_COLOR)
-            self.screen.blit(title, (WINDOW_WIDTH // 2 - title.get_width() // 2, 100))
-            
-            wait_text = f"Warte auf Controller{'.' * dots}   "
-            wait_surface = self.font_medium.render(wait_text, True, WARNING_COLOR)
-            self.screen.blit(wait_surface, (WINDOW_WIDTH // 2 - wait_surface.get_width() // 2, 250))
-            
-            info_lines = [
-                "Verbinde deinen Xbox oder PlayStation Controller",
-                "ESC = Beenden"
-            ]
-            y = 350
-            for line in info_lines:
-                text = self.font_small.render(line, True, TEXT_COLOR)
-                self.screen.blit(text, (WINDOW_WIDTH // 2 - text.get_width() // 2, y))
-                y += 30
-            
-            # Config Info
-            config_info = f"Config: {self.osc_host}:{self.osc_port} | DZ: {int(CONFIG['controller']['deadzone']*100)}% | Smooth: {int(CONFIG['controller']['smoothing']*100)}%"
-            text = self.font_tiny.render(config_info, True, (100, 100, 120))
-            self.screen.blit(text, (20, WINDOW_HEIGHT - 30))
-            
-            pygame.display.flip()
-            self.clock.tick(30)
+        # Letzter Werte-Stand für die UI (wird von der Engine ersetzt, nie verändert)
+        self.snapshot = self.make_snapshot()
+        self.engine = None
+        
+    def open_window(self):
+        """Fenster und Fonts (nur mit UI) - läuft, während die Engine schon sendet"""
+        pygame.font.init()
+        self.screen = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
+        pygame.display.set_caption("MA3 Controller Bridge v2.0")
+        
+        self.font_large = pygame.font.Font(None, 48)
+        self.font_medium = pygame.font.Font(None, 32)
+        self.font_small = pygame.font.Font(None, 24)
+        self.font_tiny = pygame.font.Font(None, 18)
         
-        return self.running
+        # Statische Ebene + Dirty-Rect-Verwaltung (siehe build_background)
+        self.background = None
+        self.region_states = {}
+        self.dirty_rects = []
+        self.drawn_state = None
+        self.startup.mark('display')
+    
+    def start_engine(self):
+        """
+        Startet die Engine. Ohne Wiedergabe öffnet sie zuerst im eigenen Thread die
+        schon angesteckten Controller - das erste Paket geht raus, sobald einer da ist,
+        auch wenn das Fenster noch aufgebaut wird.
+        """
+        setup = self.connect_present_controllers if self.replay is None else None
+        self.engine = ControllerEngine(self.update_values, CONFIG['controller']['update_rate'],
+                                       self.metrics, setup=setup)
+        self.engine.start()
+        self.startup.mark('engine')
     
-    def draw_stick_indicator(self, x, y, value_x, value_y, raw_x, raw_y, label):
-        """Zeichnet einen Joystick-Indikator mit Deadzone-Visualisierung"""
-        size = 100
+    def start_sdl(self):
+        """
+        Lädt pygame und initialisiert SDL nur für Joystick + Event-Queue (kein
+        pygame.init() mit Audio). Nur im Haupt-Thread, nach start_engine().
+        """
+        load_pygame()
+        pygame.display.init()
+        pygame.joystick.init()
+        self.clock = pygame.time.Clock()
+        self.startup.mark('sdl')
+        self.sdl_ready.set()
+    
+    def connect_present_controllers(self):
+        """Öffnet alle beim Start schon angesteckten Controller. True, wenn mindestens einer zugeordnet wurde"""
+        # Die Engine läuft schon, bevor der Haupt-Thread pygame geladen hat
+        while not self.sdl_ready.wait(0.05):
+            if not self.running:
+                return False
+        connected = False
+        for device_index in range(pygame.joystick.get_count()):
+            connected = self.connect_controller(device_index) or connected
+        return connected
+    
+    def find_bank(self, guid, name):
+        """
+        Freie Bank für einen neuen Controller: zuerst die Bank, die genau diesen
+        Controller schon einmal hatte, dann passende match-Einträge, dann Bänke ohne match.
+        """
+        auto_reconnect = self.settings.features.auto_reconnect
+        free = [bank for bank in self.banks
+                if bank.joystick is None and (auto_reconnect or bank.generation == 0)]
+        for candidates in ([bank for bank in free if bank.last_guid == guid],
+                           [bank for bank in free if bank.match is not None and bank.matches(guid, name)],
+                           [bank for bank in free if bank.match is None]):
+            if candidates:
+                return candidates[0]
+        return None
+    
+    def connect_controller(self, device_index):
+        """Öffnet den Controller mit diesem Geräte-Index (aus JOYDEVICEADDED) und ordnet ihn einer Bank zu"""
+        try:
+            joystick = pygame.joystick.Joystick(device_index)
+            joystick.init()
+        except pygame.error as e:
+            log_event("controller_open_failed", level=logging.WARNING, device_index=device_index, error=str(e))
+            return False
+        
+        # Schon zugeordnet (z.B. JOYDEVICEADDED für einen beim Start geöffneten Controller)
+        if joystick.get_instance_id() in self.banks_by_id:
+            return True
+        
+        bank = self.find_bank(joystick.get_guid(), joystick.get_name())
+        if bank is None:
+            log_event("controller_ignored", name=joystick.get_name(), guid=joystick.get_guid())
+            joystick.quit()
+            return False
+        
+        bank.attach(joystick)
+        self.banks_by_id[bank.joystick_id] = bank
+        self.startup.mark('controller')
+        return True
+    
+    def handle_joystick_event(self, event):
+        """Verteilt ein Joystick-Event an die Bank des Controllers (Engine-Thread)"""
+        if event.type == pygame.JOYDEVICEADDED:
+            # Erneutes Öffnen statt joystick.quit()/init() - OSC-Output läuft weiter
+            self.connect_controller(event.device_index)
+            return
+        
+        bank = self.banks_by_id.get(event.instance_id)
+        if bank is None:
+            return
+        
+        if event.type == pygame.JOYDEVICEREMOVED:
+            del self.banks_by_id[event.instance_id]
+            bank.detach()
+        else:
+            bank.handle_event(event)
+    
+    def apply_replay(self):
+        """Übernimmt die fälligen Einträge der Wiedergabe in die Bänke (Engine-Thread)"""
+        for _, bank_index, kind, index, value in self.replay.due():
+            if bank_index >= len(self.banks):
+                continue
+            bank = self.banks[bank_index]
+            if kind == stick_log.AXIS:
+                bank.set_axis(index, value)
+            elif kind == stick_log.BUTTON:
+                bank.set_button(index, int(value))
+            elif kind == stick_log.CONNECT:
+                self.startup.mark('controller')
+                code = int(value)
+                bank.attach_replay(stick_log.CONTROLLER_TYPES[code] if code < len(stick_log.CONTROLLER_TYPES)
+                                   else 'generic', index)
+            elif kind == stick_log.DISCONNECT:
+                bank.detach()
+        
+        if self.replay.finished and self.running:
+            log_event("replay_finished", duration=self.replay.duration, speed=self.replay.speed)
+            self.running = False
+    
+    def close_recorder(self):
+        """Schreibt den Rest der Aufnahme (nach dem Stoppen der Engine)"""
+        if self.recorder is not None:
+            self.recorder.close()
+            log_event("recording_saved", path=self.recorder.path, records=self.recorder.count)
+    
+    def pump_events(self):
+        """
+        Leert die SDL-Queue (nur im Haupt-Thread). Joystick-Events gehen an die
+        Engine, die übrigen (Fenster, Tastatur, QUIT) kommen zurück.
+        """
+        events = []
+        forward = self.joystick_events.append
+        for event in pygame.event.get():
+            if event.type in JOYSTICK_EVENTS:
+                forward(event)
+            else:
+                events.append(event)
+        return events
+    
+    def pump_until(self, deadline):
+        """
+        Wartet bis deadline (perf_counter) und pumpt dabei im Takt der Engine -
+        Stick-Events warten so nicht auf den nächsten Frame. Liefert die übrigen Events.
+        """
+        events = self.pump_events()
+        while True:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                return events
+            time.sleep(min(self.pump_interval, remaining))
+            events.extend(self.pump_events())
+    
+    def poll_headless_events(self, duration):
+        """Pumpt ohne UI für duration Sekunden: Joystick-Events an die Engine, Beenden (SIGINT/SIGTERM via SDL)"""
+        for event in self.pump_until(time.perf_counter() + duration):
+            if event.type == pygame.QUIT:
+                self.running = False
+    
+    def draw_stick_background(self, x, y, label):
+        """Zeichnet den statischen Teil eines Joystick-Indikators (Kreise, Fadenkreuz, Label)"""
+        size = STICK_SIZE
         center_x = x + size // 2
         center_y = y + size // 2
         
         # Hintergrund
-        pygame.draw.circle(self.screen, (40, 40, 50), (center_x, center_y), size // 2)
+        pygame.draw.circle(self.background, (40, 40, 50), (center_x, center_y), size // 2)
         
         # Deadzone Circle
-        deadzone_radius = int((size // 2) * CONFIG['controller']['deadzone'])
-        pygame.draw.circle(self.screen, (60, 60, 70), (center_x, center_y), deadzone_radius, 1)
+        deadzone_radius = int((size // 2) * self.settings.controller.deadzone)
+        pygame.draw.circle(self.background, (60, 60, 70), (center_x, center_y), deadzone_radius, 1)
         
         # Outer circle
-        pygame.draw.circle(self.screen, ACCENT_COLOR, (center_x, center_y), size // 2, 2)
+        pygame.draw.circle(self.background, ACCENT_COLOR, (center_x, center_y), size // 2, 2)
         
         # Crosshair
-        pygame.draw.line(self.screen, (60, 60, 70), (center_x - size // 2, center_y), 
+        pygame.draw.line(self.background, (60, 60, 70), (center_x - size // 2, center_y), 
                         (center_x + size // 2, center_y), 1)
-        pygame.draw.line(self.screen, (60, 60, 70), (center_x, center_y - size // 2), 
+        pygame.draw.line(self.background, (60, 60, 70), (center_x, center_y - size // 2), 
                         (center_x, center_y + size // 2), 1)
         
-        # Raw Position (grau)
-        raw_pos_x = center_x + int(raw_x * (size // 2 - 5))
-        raw_pos_y = center_y + int(raw_y * (size // 2 - 5))
-        pygame.draw.circle(self.screen, (100, 100, 120), (raw_pos_x, raw_pos_y), 4)
-        
-        # Smoothed Position (grün)
-        pos_x = center_x + int(value_x * (size // 2 - 5))
-        pos_y = center_y + int(value_y * (size // 2 - 5))
-        pygame.draw.circle(self.screen, SUCCESS_COLOR, (pos_x, pos_y), 8)
-        
         # Label
         label_surface = self.font_small.render(label, True, TEXT_COLOR)
-        self.screen.blit(label_surface, (x, y - 25))
+        self.background.blit(label_surface, (x, y - 25))
+    
+    def draw_stick_indicator(self, key, x, y, value_x, value_y, raw_x, raw_y):
+        """Zeichnet die Joystick-Punkte und Werte (nur wenn sie sich bewegt haben)"""
+        size = STICK_SIZE
+        center_x = x + size // 2
+        center_y = y + size // 2
+        reach = size // 2 - 8
+        
+        # Punkte bleiben im Kreis, auch bei Sensitivity > 1
+        raw_pos = (center_x + int(clamp(raw_x) * reach), center_y + int(clamp(raw_y) * reach))
+        pos = (center_x + int(clamp(value_x) * reach), center_y + int(clamp(value_y) * reach))
+        
+        def draw_dots():
+            pygame.draw.circle(self.screen, (100, 100, 120), raw_pos, 4)  # Raw (grau)
+            pygame.draw.circle(self.screen, SUCCESS_COLOR, pos, 8)         # Smoothed (grün)
+        
+        self.update_region(key + '_dots', pygame.Rect(x, y, size, size), (raw_pos, pos), draw_dots)
         
         # Werte
         value_text = f"X: {value_x:+.2f}  Y: {value_y:+.2f}"
-        value_surface = self.font_tiny.render(value_text, True, TEXT_COLOR)
-        self.screen.blit(value_surface, (x, y + size + 5))
+        self.update_text(key + '_text', x, y + size + 5, 180, value_text, self.font_tiny, TEXT_COLOR)
     
-    def draw_bar(self, x, y, width, height, value, label, max_val=100):
-        """Zeichnet einen horizontalen Balken"""
-        # Hintergrund
-        pygame.draw.rect(self.screen, (40, 40, 50), (x, y, width, height))
-        pygame.draw.rect(self.screen, ACCENT_COLOR, (x, y, width, height), 2)
+    def draw_bar_background(self, x, y, width, height, label):
+        """Zeichnet Rahmen und Label eines Balkens"""
+        pygame.draw.rect(self.background, (40, 40, 50), (x, y, width, height))
+        pygame.draw.rect(self.background, ACCENT_COLOR, (x, y, width, height), 2)
         
-        # Füllung
+        label_surface = self.font_small.render(label, True, TEXT_COLOR)
+        self.background.blit(label_surface, (x, y - 25))
+    
+    def draw_bar(self, key, x, y, width, height, value, max_val=100):
+        """Zeichnet Füllung und Wert eines horizontalen Balkens"""
         fill_width = int(width * (value / max_val))
-        if fill_width > 0:
-            pygame.draw.rect(self.screen, SUCCESS_COLOR, (x, y, fill_width, height))
         
-        # Label und Wert
-        label_surface = self.font_small.render(label, True, TEXT_COLOR)
-        self.screen.blit(label_surface, (x, y - 25))
+        def draw_fill():
+            if fill_width > 0:
+                pygame.draw.rect(self.screen, SUCCESS_COLOR, (x, y, fill_width, height))
+                pygame.draw.rect(self.screen, ACCENT_COLOR, (x, y, width, height), 2)
+        
+        self.update_region(key + '_fill', pygame.Rect(x, y, width, height), fill_width, draw_fill)
         
         value_text = f"{value:.1f}"
-        value_surface = self.font_small.render(value_text, True, TEXT_COLOR)
-        self.screen.blit(value_surface, (x + width + 10, y + height // 2 - value_surface.get_height() // 2))
+        text_y = y + height // 2 - self.font_small.get_height() // 2
+        self.update_text(key + '_text', x + width + 10, text_y, 80, value_text, self.font_small, TEXT_COLOR)
     
-    def draw_button_states(self, x, y):
-        """Zeichnet Button-Status"""
+    def draw_button_background(self, x, y, button_mapping):
+        """Zeichnet Titel und Namen der Buttons"""
         title = self.font_small.render("Buttons:", True, TEXT_COLOR)
-        self.screen.blit(title, (x, y))
+        self.background.blit(title, (x, y))
         
         y += 30
-        for btn_id, btn_name in self.button_mapping['buttons'].items():
-            is_pressed = self.button_states.get(btn_id, False)
+        for btn_name in button_mapping['buttons'].values():
+            text = self.font_small.render(btn_name, True, TEXT_COLOR)
+            self.background.blit(text, (x + 30, y))
+            y += 30
+    
+    def draw_button_states(self, x, y, button_states, button_mapping):
+        """Zeichnet die Button-LEDs"""
+        y += 30
+        for btn_id in button_mapping['buttons']:
+            is_pressed = bool(button_states.get(btn_id, False))
             color = SUCCESS_COLOR if is_pressed else (60, 60, 70)
+            center = (x + 15, y + 12)
             
-            pygame.draw.circle(self.screen, color, (x + 15, y + 12), 8)
-            text = self.font_small.render(btn_name, True, TEXT_COLOR)
-            self.screen.blit(text, (x + 30, y))
+            self.update_region(f'button_{btn_id}', pygame.Rect(x + 7, y + 4, 16, 16), is_pressed,
+                               lambda color=color, center=center: pygame.draw.circle(self.screen, color, center, 8))
             y += 30
     
+    def make_snapshot(self):
+        """Erstellt eine Kopie der aktuellen Werte für den UI-Thread"""
+        return {
+            'banks': [bank.make_snapshot() for bank in self.banks],
+            'osc_message_count': self.osc_message_count,
+            'osc_suppressed_count': self.output.suppressed_count,
+            'osc_packets_per_sec': self.output.packets_per_sec,
+            'osc_bytes_per_sec': self.output.bytes_per_sec,
+            'config_version': self.settings.version,
+        }
+    
     def update_values(self):
-        """Liest Controller-Werte und sendet OSC"""
-        pygame.event.pump()
+        """Verarbeitet Joystick-Events und sendet OSC (läuft im Engine-Thread)"""
+        metrics = self.metrics
+        if __debug__ and metrics:
+            tick_start = time.perf_counter()
         
-        deadzone = CONFIG['controller']['deadzone']
-        smoothing = CONFIG['controller']['smoothing']
-        sensitivity = CONFIG['controller']['sensitivity']
-        fine_sensitivity = CONFIG['controller']['fine_sensitivity']
+        # Vom Haupt-Thread gepumpt (pump_events) - die Engine ruft SDL nicht selbst auf
+        events = self.joystick_events
+        while events:
+            event = events.popleft()
+            # Während einer Wiedergabe gehören die Bänke der Aufnahme
+            if self.replay is None:
+                self.handle_joystick_event(event)
+        if self.replay is not None:
+            self.apply_replay()
         
-        # Linker Stick (Pan/Tilt) - Raw lesen
-        pan_input = self.joystick.get_axis(0)
-        tilt_input = self.joystick.get_axis(1)
-        
-        # Deadzone anwenden
-        pan_deadzone = apply_deadzone(pan_input, deadzone)
-        tilt_deadzone = apply_deadzone(tilt_input, deadzone)
-        
-        # Mit Sensitivity multiplizieren
-        self.pan_raw = pan_deadzone * sensitivity
-        self.tilt_raw = tilt_deadzone * sensitivity
-        
-        # Smoothing
-        self.pan_val = smooth_value(self.pan_val, self.pan_raw, smoothing)
-        self.tilt_val = smooth_value(self.tilt_val, self.tilt_raw, smoothing)
-        
-        # Rechter Stick (Fine Control) - optional
-        if CONFIG['features']['use_right_stick_fine_control']:
-            pan_fine_input = self.joystick.get_axis(2)  # Right stick X
-            tilt_fine_input = self.joystick.get_axis(3)  # Right stick Y
-            
-            pan_fine_deadzone = apply_deadzone(pan_fine_input, deadzone)
-            tilt_fine_deadzone = apply_deadzone(tilt_fine_input, deadzone)
-            
-            self.pan_fine_raw = pan_fine_deadzone * fine_sensitivity
-            self.tilt_fine_raw = tilt_fine_deadzone * fine_sensitivity
-            
-            self.pan_fine_val = smooth_value(self.pan_fine_val, self.pan_fine_raw, smoothing)
-            self.tilt_fine_val = smooth_value(self.tilt_fine_val, self.tilt_fine_raw, smoothing)
+        if __debug__ and metrics:
+            input_done = time.perf_counter()
+            metrics.record('input', input_done - tick_start)
         
-        # Skaliere auf 0-100 für MA3
-        osc_config = CONFIG['osc']
-        pan_ma3 = (self.pan_val + 1) * 50
-        tilt_ma3 = (self.tilt_val + 1) * 50
+        # Neuer Config-Snapshot vom ConfigWatcher? Übernommen wird zwischen zwei Ticks
+        settings = self.next_settings
+        if settings is not self.settings:
+            self.apply_settings(settings)
+        use_fine = settings.features.use_fine
         
-        # Sende Hauptwerte
-        self.client.send_message(f"/Page{osc_config['target_page']}/Fader{osc_config['fader_pan']}", pan_ma3)
-        self.client.send_message(f"/Page{osc_config['target_page']}/Fader{osc_config['fader_tilt']}", tilt_ma3)
-        self.osc_message_count += 2
+        # Echte Zeit seit dem letzten Tick - auch Leerlauf-Ticks zählen, damit nach
+        # einer Pause nicht die ganze Pause als ein Schritt eingeht
+        now = time.perf_counter()
+        dt = now - self.last_tick if self.last_tick is not None else 1.0 / CONFIG['controller']['update_rate']
+        self.last_tick = now
+        dt = min(max(dt, MIN_TICK_DT), MAX_TICK_DT)
         
-        # Sende Fine-Control Werte (wenn aktiv)
-        if CONFIG['features']['use_right_stick_fine_control']:
-            pan_fine_ma3 = (self.pan_fine_val + 1) * 50
-            tilt_fine_ma3 = (self.tilt_fine_val + 1) * 50
-            
-            self.client.send_message(f"/Page{osc_config['target_page']}/Fader{osc_config['fader_fine_pan']}", pan_fine_ma3)
-            self.client.send_message(f"/Page{osc_config['target_page']}/Fader{osc_config['fader_fine_tilt']}", tilt_fine_ma3)
-            self.osc_message_count += 2
+        # Gerechnet wird nur, wenn sich ein Stick bewegt hat oder noch nachgeglättet wird -
+        # bei wenigen Bänken nur diese, sonst alle in einem Array-Durchlauf (siehe axis_pipeline)
+        active = [bank for bank in self.banks if bank.input_dirty or bank.settling]
+        processed = bool(active)
+        if processed:
+            rows = [bank.index for bank in active]
+            self.pipeline.process(rows)
+            self.pipeline.smooth(dt, rows)
+            for bank in active:
+                bank.input_dirty = False
+                bank.process(use_fine)
+            if self.live_state is not None:
+                self.live_state.publish(active)
+            if __debug__ and metrics:
+                metrics.record('pipeline', time.perf_counter() - input_done)
         
-        # Trigger (RT)
-        try:
-            trigger_raw = self.joystick.get_axis(self.button_mapping['rt_axis'])
-            if trigger_raw > -1:
-                trigger_processed = (trigger_raw + 1) * 50
-                self.trigger_val = smooth_value(self.trigger_val, trigger_processed, smoothing)
-                self.client.send_message(f"/Page{osc_config['target_page']}/Fader{osc_config['fader_dimmer']}", self.trigger_val)
-                self.osc_message_count += 1
-        except:
-            pass
+        # Periodischer Resync, falls MA3 Pakete verpasst hat
+        packet_count = self.output.packet_count
+        if __debug__ and metrics:
+            send_start = time.perf_counter()
+        self.output.keepalive()
+        self.output.flush()
+        if self.first_packet_pending and self.output.packet_count != packet_count:
+            self.first_packet_pending = False
+            self.startup.mark('first_packet')
+        if __debug__ and metrics and self.output.packet_count != packet_count:
+            # send: Kodieren + sendto der wartenden Werte, e2e: Event aus der Queue bis Paket raus
+            send_done = time.perf_counter()
+            metrics.record('send', send_done - send_start)
+            metrics.record('e2e', send_done - tick_start)
+            # hold: wie lange der älteste Wert auf ein Token des Sendetakts gewartet hat
+            metrics.record('hold', self.output.last_hold)
         
-        # Buttons
-        for btn_id in self.button_mapping['buttons'].keys():
-            try:
-                is_pressed = self.joystick.get_button(btn_id)
-                self.button_states[btn_id] = is_pressed
-                
-                # Button A/X für Flash
-                if btn_id == 0:
-                    self.client.send_message(f"/Page{osc_config['target_page']}/Key{osc_config['fader_pan']}", 1 if is_pressed else 0)
-                    if is_pressed:
-                        self.osc_message_count += 1
-            except:
-                pass
+        # Im Leerlauf bleibt der alte Snapshot gültig, solange sich keine Rate geändert hat
+        if (processed or self.output.packet_count != packet_count
+                or self.snapshot['osc_packets_per_sec'] != self.output.packets_per_sec):
+            self.osc_message_count = self.output.sent_count
+            # Referenz-Tausch ist atomar - die UI sieht immer einen konsistenten Stand
+            self.snapshot = self.make_snapshot()
     
-    def draw_ui(self):
-        """Zeichnet die Haupt-UI"""
-        self.screen.fill(BG_COLOR)
+    def apply_settings(self, settings):
+        """
+        Übernimmt einen geprüften Config-Snapshot (Engine-Thread, vor dem Tick).
+        Pipeline und Output werden nur angepasst, die Glättung läuft ohne Sprung
+        weiter. Was einen Neustart braucht (RESTART_KEYS), bleibt wie gestartet.
+        """
+        old = self.settings
+        controller = settings.controller
+        if controller.pipeline_args() != old.controller.pipeline_args():
+            self.pipeline.configure(*controller.pipeline_args(), CONFIG['controller']['update_rate'])
+        osc = settings.osc
+        self.output.configure(osc.keepalive_interval, osc.bundle, osc.console_rate, osc.console_burst)
+        if len(settings.banks) == len(self.banks):
+            for bank, layout in zip(self.banks, settings.banks):
+                bank.apply_layout(layout)
+            if self.live_state is not None:
+                self.live_state.describe(self.banks)
+        self.settings = settings
+        log_event("config_applied", version=settings.version)
+    
+    def on_config_change(self, settings, restart):
+        """ConfigWatcher: neuer gültiger Stand, die Engine übernimmt ihn beim nächsten Tick"""
+        if restart:
+            log_event("config_restart_required", level=logging.WARNING, keys=",".join(restart))
+        self.next_settings = settings   # Referenz-Tausch ist atomar
+        if self.engine is None or not self.engine.is_alive():
+            self.apply_settings(settings)
+    
+    def on_config_reject(self, error):
+        """ConfigWatcher: ungültiger Stand, der bisherige Snapshot bleibt aktiv"""
+        log_event("config_rejected", level=logging.ERROR, path=str(CONFIG_PATH), error=str(error))
+    
+    def start_config_watcher(self):
+        """Beobachtet config.json (features.live_reload)"""
+        if not CONFIG['features'].get('live_reload') or not CONFIG_PATH.exists():
+            return
+        self.config_watcher = ConfigWatcher(CONFIG_PATH, DEFAULT_CONFIG, self.on_config_change, self.on_config_reject)
+        self.config_watcher.start()
+    
+    def stop_config_watcher(self):
+        if self.config_watcher is not None:
+            self.config_watcher.stop()
+            self.config_watcher = None
+    
+    def update_region(self, key, rect, state, draw):
+        """
+        Zeichnet einen UI-Bereich nur neu, wenn sich sein Zustand geändert hat.
+        Der Bereich wird mit dem gecachten Hintergrund überdeckt und als Dirty-Rect vermerkt.
+        """
+        if self.region_states.get(key) == state:
+            return
+        self.region_states[key] = state
+        self.screen.blit(self.background, rect, rect)
+        draw()
+        self.dirty_rects.append(rect)
+    
+    def update_text(self, key, x, y, width, text, font, color):
+        """Text-Bereich: rendert nur, wenn sich der String geändert hat"""
+        rect = pygame.Rect(x, y, width, font.get_height())
+        self.update_region(key, rect, text,
+                           lambda: self.screen.blit(font.render(text, True, color), (x, y), pygame.Rect(0, 0, width, rect.height)))
+    
+    def build_background(self):
+        """Rendert alle statischen UI-Elemente einmalig in die Hintergrund-Ebene"""
+        self.background = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT)).convert()
+        self.background.fill(BG_COLOR)
         
         # Header
         title = self.font_large.render("MA3 Controller Bridge v2.0", True, ACCENT_COLOR)
-        self.screen.blit(title, (20, 20))
+        self.background.blit(title, (20, 20))
+        
+        # Controller Info (angezeigte Bank)
+        banks = self.snapshot['banks']
+        values = banks[self.display_index]
+        if values['controller_name'] is not None:
+            controller_info = f"{values['bank_name']} - {values['button_mapping']['name']}: {values['controller_name']}"
+            info_color = SUCCESS_COLOR
+        elif values['controller_generation'] == 0:
+            controller_info = f"{values['bank_name']} - Verbinde deinen Xbox oder PlayStation Controller..."
+            info_color = WARNING_COLOR
+        else:
+            controller_info = f"{values['bank_name']} - Controller getrennt, warte auf Reconnect..."
+            info_color = WARNING_COLOR
+        info_surface = self.font_small.render(controller_info, True, info_color)
+        self.background.blit(info_surface, (20, 80))
+        self.drawn_state = self.bank_state(self.snapshot)
         
-        # Controller Info
-        controller_info = f"{self.button_mapping['name']}: {self.joystick.get_name()}"
-        info_surface = self.font_small.render(controller_info, True, SUCCESS_COLOR)
-        self.screen.blit(info_surface, (20, 80))
+        # Übersicht aller Bänke (nur bei mehreren Operatoren)
+        if len(banks) > 1:
+            bank_info = "  |  ".join(f"{bank['bank_name']}: {'✓' if bank['controller_name'] else '-'}" for bank in banks)
+            bank_surface = self.font_tiny.render(bank_info + "   (TAB = Bank wechseln)", True, TEXT_COLOR)
+            self.background.blit(bank_surface, (20, 130))
         
         # OSC Info
-        osc_info = f"OSC → {self.osc_host}:{self.osc_port}"
+        osc_info = f"OSC → {self.osc_address}"
         osc_surface = self.font_small.render(osc_info, True, SUCCESS_COLOR if self.osc_connected else ERROR_COLOR)
-        self.screen.blit(osc_surface, (20, 105))
+        self.background.blit(osc_surface, (20, 105))
+        
+        # Sticks, Trigger, Buttons
+        self.draw_stick_background(50, 180, "Left: Pan/Tilt")
+        if self.settings.features.use_fine:
+            self.draw_stick_background(250, 180, "Right: Fine")
+        self.draw_bar_background(50, 420, 200, 30, "RT (Dimmer)")
+        self.draw_button_background(500, 180, values['button_mapping'])
+        
+        # OSC Titel
+        osc_title = self.font_small.render(f"OSC (Page {values['page']}):", True, TEXT_COLOR)
+        self.background.blit(osc_title, (500, 420))
+        
+        # Config Info
+        controller = self.settings.controller
+        config_text = f"DZ: {int(controller.deadzone*100)}% {self.pipeline.mode} | {self.pipeline.stick_filter.describe()} | Sens: {controller.sensitivity:.1f}x"
+        config_surface = self.font_tiny.render(config_text, True, (100, 100, 120))
+        self.background.blit(config_surface, (20, WINDOW_HEIGHT - 30))
+        
+        # Footer
+        help_text = "ESC = Beenden  |  F3 = Latenz  |  Engine: {}Hz  UI: {}fps  |  Deadzone (grau) | Smoothed (grün)".format(
+            CONFIG['controller']['update_rate'], CONFIG['ui']['refresh_rate'])
+        help_surface = self.font_tiny.render(help_text, True, (100, 100, 110))
+        self.background.blit(help_surface, (20, WINDOW_HEIGHT - 10))
+        
+        self.invalidate_ui()
+    
+    def invalidate_ui(self):
+        """Erzwingt ein komplettes Neuzeichnen (Start, Expose, neuer Hintergrund)"""
+        self.screen.blit(self.background, (0, 0))
+        self.region_states = {}
+        self.dirty_rects = [self.screen.get_rect()]
+    
+    def bank_state(self, snapshot):
+        """Was der Hintergrund zeigt: angezeigte Bank, Controller-Wechsel und Config-Stand"""
+        return (self.display_index, tuple(bank['controller_generation'] for bank in snapshot['banks']),
+                snapshot['config_version'])
+    
+    def draw_ui(self):
+        """Zeichnet die Haupt-UI aus dem letzten Engine-Snapshot (nur geänderte Bereiche)"""
+        snapshot = self.snapshot
+        values = snapshot['banks'][self.display_index]
+        
+        # Controller ab-/angesteckt, andere Bank gewählt oder neue Config: Hintergrund neu aufbauen
+        if self.bank_state(snapshot) != self.drawn_state:
+            self.build_background()
         
         # Linker Stick (Pan/Tilt)
-        self.draw_stick_indicator(50, 180, self.pan_val, self.tilt_val, self.pan_raw, self.tilt_raw, "Left: Pan/Tilt")
+        self.draw_stick_indicator('left', 50, 180, values['pan_val'], values['tilt_val'], values['pan_raw'], values['tilt_raw'])
         
         # Rechter Stick (Fine Control) - wenn aktiv
-        if CONFIG['features']['use_right_stick_fine_control']:
-            self.draw_stick_indicator(250, 180, self.pan_fine_val, self.tilt_fine_val, 
-                                     self.pan_fine_raw, self.tilt_fine_raw, "Right: Fine")
+        use_fine = self.settings.features.use_fine
+        if use_fine:
+            self.draw_stick_indicator('right', 250, 180, values['pan_fine_val'], values['tilt_fine_val'], 
+                                      values['pan_fine_raw'], values['tilt_fine_raw'])
         
         # Trigger Bar
-        self.draw_bar(50, 420, 200, 30, self.trigger_val, "RT (Dimmer)")
+        self.draw_bar('trigger', 50, 420, 200, 30, values['trigger_val'])
         
         # Button Status
-        self.draw_button_states(500, 180)
+        self.draw_button_states(500, 180, values['button_states'], values['button_mapping'])
         
         # OSC Werte
-        y = 420
-        osc_config = CONFIG['osc']
-        osc_title = self.font_small.render(f"OSC (Page {osc_config['target_page']}):", True, TEXT_COLOR)
-        self.screen.blit(osc_title, (500, y))
-        y += 30
-        
+        y = 450
+        faders = values['faders']
         osc_values = [
-            f"F{osc_config['fader_pan']} Pan:   {(self.pan_val + 1) * 50:.1f}",
-            f"F{osc_config['fader_tilt']} Tilt:  {(self.tilt_val + 1) * 50:.1f}",
-            f"F{osc_config['fader_dimmer']} Dim: {self.trigger_val:.1f}",
+            f"F{faders['pan']} Pan:   {(values['pan_val'] + 1) * 50:.1f}",
+            f"F{faders['tilt']} Tilt:  {(values['tilt_val'] + 1) * 50:.1f}",
+            f"F{faders['dimmer']} Dim: {values['trigger_val']:.1f}",
         ]
         
-        if CONFIG['features']['use_right_stick_fine_control']:
+        if use_fine:
             osc_values.extend([
-                f"F{osc_config['fader_fine_pan']} PanF: {(self.pan_fine_val + 1) * 50:.1f}",
-                f"F{osc_config['fader_fine_tilt']} TiltF: {(self.tilt_fine_val + 1) * 50:.1f}",
+                f"F{faders['fine_pan']} PanF: {(values['pan_fine_val'] + 1) * 50:.1f}",
+                f"F{faders['fine_tilt']} TiltF: {(values['tilt_fine_val'] + 1) * 50:.1f}",
             ])
         
-        for value_line in osc_values:
-            text = self.font_tiny.render(value_line, True, TEXT_COLOR)
-            self.screen.blit(text, (500, y))
+        for i, value_line in enumerate(osc_values):
+            self.update_text(f'osc_{i}', 500, y, 280, value_line, self.font_tiny, TEXT_COLOR)
             y += 22
         
         # Statistiken
         runtime = time.time() - self.start_time
-        stats_text = f"Runtime: {int(runtime)}s | OSC Msgs: {self.osc_message_count} | FPS: {int(self.clock.get_fps())}"
-        stats_surface = self.font_tiny.render(stats_text, True, (100, 100, 120))
-        self.screen.blit(stats_surface, (20, WINDOW_HEIGHT - 50))
+        stats_text = f"Runtime: {int(runtime)}s | OSC gesendet: {snapshot['osc_message_count']} unterdrückt: {snapshot['osc_suppressed_count']} | Engine: {int(self.engine.measured_rate)}Hz | FPS: {int(self.clock.get_fps())}"
+        self.update_text('stats', 20, WINDOW_HEIGHT - 50, WINDOW_WIDTH - 40, stats_text, self.font_tiny, (100, 100, 120))
         
-        # Config Info
-        config_text = f"DZ: {int(CONFIG['controller']['deadzone']*100)}% | Smooth: {int(CONFIG['controller']['smoothing']*100)}% | Sens: {CONFIG['controller']['sensitivity']:.1f}x"
-        config_surface = self.font_tiny.render(config_text, True, (100, 100, 120))
-        self.screen.blit(config_surface, (20, WINDOW_HEIGHT - 30))
+        mode = "Bundle" if self.output.bundle else "Einzeln"
+        if self.output_kind == 'direct':
+            mode = f"Befehle {self.output.mode}, {mode}"
+        net_text = f"Pakete: {snapshot['osc_packets_per_sec']:.0f}/s | {snapshot['osc_bytes_per_sec']:.0f} B/s | Modus: {mode}"
+        console_rate = self.settings.osc.console_rate
+        if console_rate:
+            net_text += f" | Takt: {console_rate}/s"
+        self.update_text('net', 20, WINDOW_HEIGHT - 70, 460, net_text, self.font_tiny, (100, 100, 120))
         
-        # Footer
-        help_text = "ESC = Beenden  |  Update: {}Hz  |  Deadzone (grau) | Smoothed (grün)".format(CONFIG['controller']['update_rate'])
-        help_surface = self.font_tiny.render(help_text, True, (100, 100, 110))
-        self.screen.blit(help_surface, (20, WINDOW_HEIGHT - 10))
+        if self.output_kind == 'fanout':
+            targets_text = "  |  ".join(self.target_summary(stats) for stats in self.output.target_stats())
+            self.update_text('targets', 20, WINDOW_HEIGHT - 90, WINDOW_WIDTH - 40, targets_text, self.font_tiny, (100, 100, 120))
+        
+        self.draw_overlay()
+        
+        # Nur geänderte Bereiche an das Display übergeben
+        if self.dirty_rects:
+            pygame.display.update(self.dirty_rects)
+            self.dirty_rects = []
+    
+    def draw_overlay(self):
+        """Latenz-Overlay oben rechts (F3 an/aus, F4 setzt die Histogramme zurück)"""
+        if not self.show_overlay:
+            lines = []
+        elif self.metrics is None:
+            lines = ["Metrics aus (metrics.enabled)"]
+        else:
+            # Perzentile kosten etwas - zweimal pro Sekunde reicht
+            now = time.perf_counter()
+            if now - self.overlay_updated >= 0.5:
+                self.overlay_updated = now
+                self.overlay_lines = self.metrics.overlay_lines(OVERLAY_STAGES)
+                self.overlay_lines.append(f"overruns {self.engine.scheduler.overruns}")
+            lines = self.overlay_lines
         
-        pygame.display.flip()
+        for i in range(len(OVERLAY_STAGES) + 1):
+            text = lines[i] if i < len(lines) else ""
+            self.update_text(f'overlay_{i}', WINDOW_WIDTH - 330, 20 + i * 14, 320, text, self.font_tiny, WARNING_COLOR)
+    
+    @staticmethod
+    def target_summary(stats):
+        """Eine Zeile pro Fan-out-Ziel: Zustand, Pakete/s, Fehlerrate"""
+        return (f"{stats['name']}: {stats['state']} {stats['packets_per_sec']:.0f}/s "
+                f"Fehler {stats['error_rate'] * 100:.0f}% verworfen {stats['dropped']}")
+    
+    def metrics_counters(self):
+        """Zähler außerhalb von Metrics (Engine, OscOutput, Socket) für JSON/Prometheus"""
+        return {
+            'tick_overruns': self.engine.scheduler.overruns if self.engine else 0,
+            'osc_messages_sent': self.output.sent_count,
+            'osc_messages_suppressed': self.output.suppressed_count,
+            'osc_messages_coalesced': self.output.coalesced_count,
+            'osc_packets': self.output.packet_count,
+            'osc_bytes': self.output.byte_count,
+            'osc_send_errors': self.client.error_count,
+        }
+    
+    def start_metrics_exporter(self):
+        """Startet JSON-Datei und Prometheus-Endpoint, sofern konfiguriert"""
+        metrics_config = CONFIG['metrics']
+        if self.metrics is None or not (metrics_config['json_path'] or metrics_config['prometheus_port']):
+            return
+        from metrics import MetricsExporter
+        json_path = metrics_config['json_path']
+        port = metrics_config['prometheus_port']
+        try:
+            exporter = MetricsExporter(self.metrics, json_path, metrics_config['json_interval'], port)
+        except OSError as e:
+            # Port belegt o.ä. - die Bridge läuft ohne Endpoint weiter, die JSON-Datei bleibt
+            log_event("metrics_failed", level=logging.WARNING, prometheus_port=port, error=str(e))
+            if not json_path:
+                return
+            port = 0
+            exporter = MetricsExporter(self.metrics, json_path, metrics_config['json_interval'])
+        self.metrics_exporter = exporter
+        exporter.start()
+        log_event("metrics_started", json_path=json_path, prometheus_port=port)
+    
+    def stop_metrics_exporter(self):
+        if self.metrics_exporter is not None:
+            self.metrics_exporter.stop()
+            self.metrics_exporter = None
+    
+    def start_live_state(self):
+        """Legt den Shared-Memory-Block an (shared_state), vor dem Start der Engine"""
+        shared_config = CONFIG['shared_state']
+        if not shared_config['enabled']:
+            return
+        from live_state import LiveStatePublisher
+        publisher = LiveStatePublisher(shared_config['name'], len(self.banks), shared_config['ring_size'])
+        publisher.describe(self.banks)
+        publisher.publish(self.banks)
+        self.live_state = publisher
+        log_event("shared_state_started", name=shared_config['name'], banks=len(self.banks),
+                  ring_size=shared_config['ring_size'])
+    
+    def stop_live_state(self):
+        """Entfernt den Block - erst nach der Engine, die hineinschreibt"""
+        if self.live_state is not None:
+            self.live_state.close()
+            self.live_state = None
+    
+    def log_stats(self):
+        """Schreibt die aktuellen Statistiken als Log-Zeile"""
+        values = self.snapshot
+        log_event("stats",
+                  runtime=int(time.time() - self.start_time),
+                  engine_hz=self.engine.measured_rate,
+                  overruns=self.engine.scheduler.overruns,
+                  sent=values['osc_message_count'],
+                  suppressed=values['osc_suppressed_count'],
+                  coalesced=self.output.coalesced_count,
+                  packets_per_sec=values['osc_packets_per_sec'],
+                  bytes_per_sec=values['osc_bytes_per_sec'],
+                  send_errors=self.client.error_count,
+                  controllers=len(self.banks_by_id),
+                  **self.latency_fields())
+        if self.output_kind == 'fanout':
+            for stats in self.output.target_stats():
+                log_event("target_stats", name=stats['name'], address=stats['address'], state=stats['state'],
+                          packets_per_sec=stats['packets_per_sec'], transmitted=stats['transmitted'],
+                          errors=stats['errors'], error_pct=stats['error_rate'] * 100,
+                          dropped=stats['dropped'])
+    
+    def latency_fields(self):
+        """p99/max der wichtigsten Stufen für die Stats-Zeile (leer ohne Metrics)"""
+        if self.metrics is None:
+            return {}
+        fields = {}
+        for stage in ('tick', 'jitter', 'e2e'):
+            histogram = self.metrics.histograms.get(stage)
+            if histogram is not None and histogram.count:
+                fields[f"{stage}_p99_ms"] = f"{histogram.percentiles()[0.99]:.3f}"
+                fields[f"{stage}_max_ms"] = f"{histogram.max * 1000:.3f}"
+        return fields
+    
+    def run_headless(self, stats_interval=10.0):
+        """Hauptschleife ohne Display: gleiche Engine, Status nur als Log-Zeilen"""
+        log_event("starting", osc=self.osc_address,
+                  update_rate=CONFIG['controller']['update_rate'],
+                  bundle=self.output.bundle, banks=len(self.banks),
+                  output=self.output.mode if self.output_kind == 'direct' else "fader")
+        
+        try:
+            if self.replay is not None:
+                log_event("replay_started", records=len(self.replay.records), duration=self.replay.duration,
+                          speed=self.replay.speed, loop=self.replay.loop)
+            
+            # Die Engine sucht die Controller selbst (auch später per Hot-Plug)
+            self.start_live_state()
+            self.start_engine()
+            self.start_sdl()
+            self.start_metrics_exporter()
+            self.start_config_watcher()
+            last_stats = time.time()
+            last_wait_log = 0.0
+            
+            while self.running:
+                # Nur dieser Thread pumpt SDL, die Engine bekommt ihre Events weitergereicht
+                self.poll_headless_events(0.1)
+                
+                if not self.engine.is_alive():
+                    log_event("engine_stopped", level=logging.ERROR, error=str(self.engine.error))
+                    self.running = False
+                
+                self.report_startup()
+                if self.replay is None and not self.banks_by_id and time.time() - last_wait_log > 10:
+                    log_event("waiting_for_controller")
+                    last_wait_log = time.time()
+                
+                if stats_interval and time.time() - last_stats >= stats_interval:
+                    self.log_stats()
+                    last_stats = time.time()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.report_startup()
+            self.stop_config_watcher()
+            self.running = False     # beendet auch eine noch auf SDL wartende Controller-Suche
+            if self.engine:
+                self.engine.stop()
+                self.stop_metrics_exporter()
+                self.log_stats()
+            # Erst nach der Engine: Fan-out-Thread und Socket sauber beenden
+            self.client.close()
+            self.stop_live_state()
+            self.close_recorder()
+            if pygame is not None:
+                pygame.quit()
+            log_event("stopped")
+    
+    def report_startup(self):
+        """Gibt die Start-Zeitleiste einmal aus, sobald das erste Paket raus ist"""
+        startup = self.startup
+        if startup.reported or not startup.complete:
+            return
+        startup.reported = True
+        if self.headless:
+            log_event("startup", **startup.fields())
+        else:
+            print(f"⏱ Start: {startup.format()}")
     
     def run(self):
         """Hauptschleife"""
-        if not self.wait_for_controller():
-            return
+        if self.replay is not None:
+            print(f"▶ Wiedergabe: {len(self.replay.records)} Einträge, {self.replay.duration:.1f}s, {self.replay.speed:g}x")
         
-        print(f"\n✓ Controller verbunden: {self.joystick.get_name()}")
-        print(f"✓ Typ erkannt als: {self.controller_type}")
-        print(f"✓ Sende OSC an MA3 @ {self.osc_host}:{self.osc_port}")
-        print(f"✓ Deadzone: {int(CONFIG['controller']['deadzone']*100)}%")
-        print(f"✓ Smoothing: {int(CONFIG['controller']['smoothing']*100)}%")
-        print(f"✓ Fine Control: {'Aktiv (Rechter Stick)' if CONFIG['features']['use_right_stick_fine_control'] else 'Deaktiviert'}")
-        print(f"\n🎮 Bereit! UI läuft mit {CONFIG['controller']['update_rate']} Hz\n")
+        try:
+            # Sampling + OSC laufen im eigenen Thread und starten vor dem Fenster:
+            # Controller-Suche und erstes Paket warten nicht auf Display und Fonts
+            self.start_live_state()
+            self.start_engine()
+            self.start_sdl()
+            self.open_window()
+            self.start_metrics_exporter()
+            self.start_config_watcher()
         
-        while self.running:
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    self.running = False
-                elif event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE:
+            for bank in self.banks:
+                print(f"✓ {bank.name}: Page {bank.page}, Fader {bank.faders['pan']}-{bank.faders['fine_tilt']}")
+            print(f"✓ Sende OSC an MA3 @ {self.osc_address}")
+            if self.live_state is not None:
+                print(f"✓ Live-Werte im Shared Memory: {self.live_state.name} (python live_state.py --name {self.live_state.name})")
+            print(f"✓ Deadzone: {int(self.settings.controller.deadzone*100)}%")
+            print(f"✓ Glättung: {self.pipeline.stick_filter.describe()}")
+            print(f"✓ Fine Control: {'Aktiv (Rechter Stick)' if self.settings.features.use_fine else 'Deaktiviert'}")
+            print(f"\n🎮 Bereit! Engine läuft mit {CONFIG['controller']['update_rate']} Hz, UI mit {CONFIG['ui']['refresh_rate']} FPS\n")
+        
+            self.build_background()
+            metrics = self.metrics
+            frame_start = time.perf_counter()
+            frame_period = 1.0 / CONFIG['ui']['refresh_rate']
+            next_frame = frame_start
+            events = []
+        
+            while self.running:
+                # Joystick-Events gehen beim Pumpen an die Engine, hier bleibt der Rest
+                events.extend(self.pump_events())
+                for event in events:
+                    if event.type == pygame.QUIT:
+                        self.running = False
+                    elif event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE:
+                        self.running = False
+                    elif event.type == pygame.KEYDOWN and event.key == pygame.K_TAB:
+                        self.display_index = (self.display_index + 1) % len(self.banks)
+                    elif event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+                        self.show_overlay = not self.show_overlay
+                    elif event.type == pygame.KEYDOWN and event.key == pygame.K_F4 and metrics:
+                        metrics.reset()
+                    elif event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWRESTORED):
+                        self.invalidate_ui()
+                
+                if not self.engine.is_alive():
+                    print(f"\n⚠ Engine gestoppt: {self.engine.error}")
                     self.running = False
+                self.report_startup()
             
-            self.update_values()
-            self.draw_ui()
-            self.clock.tick(CONFIG['controller']['update_rate'])
-        
-        pygame.quit()
-        print("\n✓ Beendet.")
+                if __debug__ and metrics:
+                    draw_start = time.perf_counter()
+                self.draw_ui()
+                if __debug__ and metrics:
+                    # ui: Zeichnen + display.update, frame: Abstand der Frames (inkl. Warten auf den Takt)
+                    now = time.perf_counter()
+                    metrics.record('ui', now - draw_start)
+                    metrics.record('frame', now - frame_start)
+                    frame_start = now
+                # Bis zum nächsten Frame im Engine-Takt weiterpumpen (statt in clock.tick zu schlafen)
+                next_frame = max(next_frame + frame_period, time.perf_counter())
+                events = self.pump_until(next_frame)
+                self.clock.tick()   # nur noch für get_fps()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.stop_config_watcher()
+            self.running = False     # beendet auch eine noch auf SDL wartende Controller-Suche
+            if self.engine:
+                self.engine.stop()
+            self.stop_metrics_exporter()
+            self.client.close()
+            self.stop_live_state()
+            self.close_recorder()
+            if pygame is not None:
+                pygame.quit()
+            print("\n✓ Beendet.")
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="MA3 Controller Bridge v2.0")
+    parser.add_argument('--headless', action='store_true',
+                        help="Ohne Fenster laufen (SDL Dummy-Treiber), Status nur als Log-Zeilen")
+    parser.add_argument('--stats-interval', type=float, default=10.0,
+                        help="Sekunden zwischen Stats-Log-Zeilen im Headless-Modus (0 = aus)")
+    parser.add_argument('--cpu', type=int, default=None,
+                        help="Prozess auf diesen CPU-Kern pinnen (nur Linux)")
+    parser.add_argument('--record', metavar='DATEI',
+                        help="Controller-Eingaben aller Bänke in eine Aufnahme schreiben")
+    parser.add_argument('--replay', metavar='DATEI',
+                        help="Aufnahme statt Controller abspielen (gleicher OSC-Pfad)")
+    parser.add_argument('--replay-speed', type=float, default=1.0,
+                        help="Wiedergabe-Geschwindigkeit (1 = Originalzeit, 10 = zehnmal schneller)")
+    parser.add_argument('--replay-loop', action='store_true',
+                        help="Aufnahme endlos wiederholen")
+    parser.add_argument('--direct', choices=('relative', 'absolute'),
+                        help="Befehlsmodus: Pan/Tilt als MA3-Befehle statt über Fader und Plugin")
+    parser.add_argument('--fixture', type=int, default=None,
+                        help="Im Befehlsmodus nur dieses Fixture steuern (wie AssignFixture)")
+    return parser.parse_args()
 
 if __name__ == "__main__":
-    print("\n" + "="*60)
-    print("  MA3 Controller Bridge v2.0")
-    print("="*60 + "\n")
-    app = MA3ControllerUI()
-    app.run()
\ No newline at end of file
+    args = parse_args()
+    
+    if args.cpu is not None:
+        if hasattr(os, 'sched_setaffinity'):
+            os.sched_setaffinity(0, {args.cpu})
+        else:
+            print("⚠ --cpu wird auf diesem System nicht unterstützt")
+    
+    if args.direct:
+        CONFIG['direct']['enabled'] = True
+        CONFIG['direct']['mode'] = args.direct
+    if args.fixture is not None:
+        CONFIG['direct']['fixture'] = args.fixture
+    
+    recorder = stick_log.StickRecorder(args.record) if args.record else None
+    replay = None
+    if args.replay:
+        replay = stick_log.StickReplay(stick_log.load_stick_log(args.replay), args.replay_speed, args.replay_loop)
+    
+    if args.headless:
+        logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(message)s')
+        app = MA3ControllerUI(headless=True, recorder=recorder, replay=replay)
+        app.run_headless(args.stats_interval)
+    else:
+        print("\n" + "="*60)
+        print("  MA3 Controller Bridge v2.0")
+        print("="*60 + "\n")
+        app = MA3ControllerUI(recorder=recorder, replay=replay)
+        app.run()
\ No newline at end of file